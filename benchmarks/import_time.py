@@ -0,0 +1,118 @@
+"""
+Cold-start import time of prompter, per module, measured with ``python -X importtime``.
+
+Each run is a fresh interpreter that imports prompter and renders a local
+template (the path of a short-lived CLI job). Modules already loaded by a bare
+interpreter (``site`` and its dependencies) are left out, and the median of
+``--runs`` runs is reported.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget-ms 30 --forbid requests,yaml
+    python benchmarks/import_time.py --stmt "import prompter.llm_factory" --json out.json
+
+Exits with status 1 if the total exceeds ``--budget-ms`` or a ``--forbid``-den
+module gets imported, so it can run in CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RENDER_STMT = (
+    "import prompter; "
+    "prompter.PromptTemplateProcessor({path!r}).render({{'name': 'world'}})"
+)
+
+
+def parse_importtime(stderr: str):
+    """Return ``[(module, self_us, cumulative_us, depth)]`` from ``-X importtime`` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def run(stmt: str):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", stmt],
+        capture_output=True, text=True, env=env, cwd=ROOT,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"Benchmark statement failed:\n{proc.stderr}")
+    return parse_importtime(proc.stderr)
+
+
+def measure(stmt: str, runs: int):
+    """Median self/cumulative microseconds per module imported by ``stmt``, and the median total."""
+    baseline = {name for name, _, _, _ in run("pass")}
+    samples = {}
+    totals = []
+    for _ in range(runs):
+        total = 0
+        for name, self_us, cumulative_us, depth in run(stmt):
+            if name in baseline:
+                continue
+            samples.setdefault(name, ([], [], depth))
+            samples[name][0].append(self_us)
+            samples[name][1].append(cumulative_us)
+            total += self_us
+        totals.append(total)
+    modules = {
+        name: {"self_us": statistics.median(s), "cumulative_us": statistics.median(c), "depth": depth}
+        for name, (s, c, depth) in samples.items()
+    }
+    return modules, statistics.median(totals)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stmt", help="Statement to time (default: import prompter and render a local template)")
+    parser.add_argument("--runs", type=int, default=7, help="Fresh interpreters to run (default: 7)")
+    parser.add_argument("--top", type=int, default=25, help="Modules to list, slowest first (default: 25)")
+    parser.add_argument("--budget-ms", type=float, help="Fail if the total import time exceeds this")
+    parser.add_argument("--forbid", default="", help="Comma-separated modules that must not be imported")
+    parser.add_argument("--json", dest="json_path", help="Also write the per-module results to this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        template = os.path.join(tmp, "template.txt")
+        with open(template, "w", encoding="utf-8") as f:
+            f.write("Hello {{ name }}!\n")
+        stmt = args.stmt or RENDER_STMT.format(path=template)
+        modules, total_us = measure(stmt, args.runs)
+
+    print(f"{'self [ms]':>10} {'cumul [ms]':>11}  module")
+    ranked = sorted(modules.items(), key=lambda item: item[1]["self_us"], reverse=True)
+    for name, m in ranked[:args.top]:
+        print(f"{m['self_us'] / 1000:10.2f} {m['cumulative_us'] / 1000:11.2f}  {name}")
+    print(f"\n{len(modules)} modules, {total_us / 1000:.2f} ms total (median of {args.runs} runs)")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"stmt": stmt, "total_us": total_us, "modules": modules}, f, indent=2, sort_keys=True)
+
+    failed = False
+    forbidden = [name for name in args.forbid.split(",") if name]
+    for name in forbidden:
+        if name in modules:
+            print(f"FAIL: {name} was imported")
+            failed = True
+    if args.budget_ms is not None and total_us / 1000 > args.budget_ms:
+        print(f"FAIL: {total_us / 1000:.2f} ms exceeds the budget of {args.budget_ms} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
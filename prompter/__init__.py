@@ -1,3 +1,21 @@
-from .prompt_template_processor import PromptTemplateProcessor
+# Submodules are imported on first attribute access (PEP 562), so ``import prompter``
+# stays cheap for short-lived processes that only use part of the package.
+_LAZY = {
+    "PromptTemplateProcessor": "prompt_template_processor",
+}
 
 __all__ = ["PromptTemplateProcessor"]
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # __import__ rather than importlib.import_module, so -X importtime reports the module
+    value = getattr(__import__(f"{__name__}.{module}", fromlist=[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
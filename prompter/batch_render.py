@@ -0,0 +1,80 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List
+
+from .template_compiler import CompiledTemplate
+from .prompt_template_processor import render_context
+
+MODES = ('serial', 'thread', 'process')
+
+# Set once per worker process by _init_worker
+_worker_template = None
+
+
+def _init_worker(source: str):
+    global _worker_template
+    _worker_template = CompiledTemplate(source)
+
+
+def _render_chunk_in_worker(contexts: List[dict]) -> List[str]:
+    return [render_context(_worker_template, context) for context in contexts]
+
+
+def _render_chunk(compiled: CompiledTemplate, contexts: List[dict]) -> List[str]:
+    return [render_context(compiled, context) for context in contexts]
+
+
+def iter_chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    """Split ``iterable`` into lists of at most ``size`` items, lazily."""
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def render_many(
+    compiled: CompiledTemplate,
+    contexts: Iterable[dict],
+    workers: int = None,
+    chunksize: int = 256,
+    mode: str = None,
+) -> Iterator[str]:
+    """
+    Render ``compiled`` against every context in ``contexts``, in order.
+
+    See PromptTemplateProcessor.render_many for the meaning of the arguments.
+    """
+    if mode is None:
+        mode = 'process' if workers else 'serial'
+    if mode not in MODES:
+        raise ValueError(f"Unknown render mode '{mode}'. Expected one of: {', '.join(MODES)}")
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    if mode == 'serial':
+        return (render_context(compiled, context) for context in contexts)
+    return _render_pooled(compiled, contexts, workers or 1, chunksize, mode)
+
+
+def _render_pooled(compiled, contexts, workers, chunksize, mode):
+    if mode == 'thread':
+        executor = ThreadPoolExecutor(max_workers=workers)
+        submit = lambda chunk: executor.submit(_render_chunk, compiled, chunk)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(compiled.source,))
+        submit = lambda chunk: executor.submit(_render_chunk_in_worker, chunk)
+    max_pending = 2 * workers
+    pending = deque()
+    try:
+        for chunk in iter_chunks(contexts, chunksize):
+            pending.append(submit(chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
@@ -0,0 +1,314 @@
+"""
+Circuit breakers for provider calls.
+
+While a provider keeps failing, its breaker opens and calls fail at once with
+``CircuitOpenError`` instead of waiting out connect/read timeouts. After
+``open_seconds`` the breaker lets a few probe calls through (half-open); if
+they succeed it closes again, otherwise it reopens.
+
+Breakers are named and kept in a process-wide registry, so their state can be
+read for dashboards (``snapshot_all()``) and by fallback logic
+(``breaker.available``); ``RouterService`` skips backends whose breaker is open.
+
+Example:
+    service = CircuitBreakerService(get_llm_service(), get_breaker("openai", failure_rate=0.5))
+"""
+import inspect
+import threading
+import time
+import warnings
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .providers._base import ServiceWrapper
+from .retry import is_transient
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open."""
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Circuit '{name}' is open; retry in {retry_in:.1f}s.")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker.
+
+    The breaker opens when at least ``min_calls`` outcomes are in the window and
+    the share of failures among them reaches ``failure_rate``. The window holds
+    the last ``window`` outcomes, and with ``window_seconds`` only those that
+    are recent enough.
+
+    Args:
+        name (str): Name shown in snapshots and errors.
+        failure_rate (float): Failure share (0-1) that opens the circuit.
+        window (int): Number of recent outcomes considered.
+        window_seconds (float, optional): Maximum age of outcomes considered.
+        min_calls (int): Outcomes needed before the rate is evaluated.
+        open_seconds (float): Time the circuit stays open before probing.
+        half_open_probes (int): Probe calls allowed, and successes needed to close.
+        is_failure (callable): Decides whether an exception counts as a failure;
+            by default only transient errors (429, 5xx, timeouts, ...) do, so bad
+            requests do not open the circuit.
+    """
+    def __init__(
+        self,
+        name: str = "default",
+        failure_rate: float = 0.5,
+        window: int = 20,
+        window_seconds: float = None,
+        min_calls: int = 10,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 3,
+        is_failure: Callable[[BaseException], bool] = is_transient,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.is_failure = is_failure
+        self.listeners: List[Callable[["CircuitBreaker", str, str], None]] = []
+        self.opened = 0
+        self.rejected = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._outcomes = deque(maxlen=window)
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+
+    def _set_state(self, state: str):
+        # Called with the lock held; listeners run after it is released
+        old, self._state = self._state, state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            self.opened += 1
+        if state in (OPEN, HALF_OPEN):
+            self._probes = self._probe_successes = 0
+        if state == CLOSED:
+            self._outcomes.clear()
+        return old
+
+    def _notify(self, old: str, new: str):
+        if old != new:
+            for listener in list(self.listeners):
+                listener(self, old, new)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                return HALF_OPEN
+            return self._state
+
+    @property
+    def available(self) -> bool:
+        """True if a call would currently be let through (without reserving a probe)."""
+        with self._lock:
+            if self._state == OPEN:
+                return time.monotonic() - self._opened_at >= self.open_seconds
+            if self._state == HALF_OPEN:
+                return self._probes < self.half_open_probes
+            return True
+
+    def before_call(self):
+        """
+        Admit a call or raise ``CircuitOpenError``. Every admitted call must be
+        followed by ``on_success()`` or ``on_failure(exc)``.
+        """
+        changed = None
+        with self._lock:
+            now = time.monotonic()
+            if self._state == OPEN:
+                remaining = self.open_seconds - (now - self._opened_at)
+                if remaining > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.name, remaining)
+                changed = (self._set_state(HALF_OPEN), HALF_OPEN)
+            if self._state == HALF_OPEN:
+                if self._probes >= self.half_open_probes:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.name, 0.0)
+                self._probes += 1
+        if changed:
+            self._notify(*changed)
+
+    def on_success(self):
+        changed = None
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    changed = (self._set_state(CLOSED), CLOSED)
+            else:
+                self._outcomes.append((time.monotonic(), False))
+        if changed:
+            self._notify(*changed)
+
+    def on_failure(self, exc: BaseException):
+        if not self.is_failure(exc):
+            # Not the provider's fault: count it as a completed call
+            self.on_success()
+            return
+        changed = None
+        with self._lock:
+            now = time.monotonic()
+            if self._state == HALF_OPEN:
+                changed = (self._set_state(OPEN), OPEN)
+            elif self._state == CLOSED:
+                self._outcomes.append((now, True))
+                rate, calls = self._rate(now)
+                if calls >= self.min_calls and rate >= self.failure_rate:
+                    changed = (self._set_state(OPEN), OPEN)
+        if changed:
+            self._notify(*changed)
+
+    def _release(self):
+        # An admitted call ended without an outcome (e.g. cancelled): free its probe slot
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def _rate(self, now: float):
+        if self.window_seconds is not None:
+            while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+                self._outcomes.popleft()
+        calls = len(self._outcomes)
+        if not calls:
+            return 0.0, 0
+        return sum(1 for _, failed in self._outcomes if failed) / calls, calls
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        """Call ``fn()`` through the breaker."""
+        self.before_call()
+        try:
+            result = fn()
+        except Exception as e:
+            self.on_failure(e)
+            raise
+        except BaseException:
+            self._release()
+            raise
+        self.on_success()
+        return result
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async version of ``call``; ``fn`` returns an awaitable."""
+        self.before_call()
+        try:
+            result = await fn()
+        except Exception as e:
+            self.on_failure(e)
+            raise
+        except BaseException:
+            self._release()
+            raise
+        self.on_success()
+        return result
+
+    def reset(self):
+        """Force the circuit closed."""
+        with self._lock:
+            old = self._set_state(CLOSED)
+        self._notify(old, CLOSED)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state and counters, for dashboards."""
+        state = self.state
+        with self._lock:
+            rate, calls = self._rate(time.monotonic())
+            retry_in = max(0.0, self.open_seconds - (time.monotonic() - self._opened_at)) if state == OPEN else 0.0
+            return {
+                "name": self.name,
+                "state": state,
+                "failure_rate": rate,
+                "calls_in_window": calls,
+                "retry_in": retry_in,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+# Name -> every option the breaker was created with, defaults included
+_breaker_options: Dict[str, Dict[str, Any]] = {}
+_breakers_lock = threading.Lock()
+
+
+def _with_defaults(options: Dict[str, Any]) -> Dict[str, Any]:
+    params = inspect.signature(CircuitBreaker.__init__).parameters
+    return {key: options.get(key, p.default) for key, p in params.items() if key not in ("self", "name")}
+
+
+def get_breaker(name: str, **options) -> CircuitBreaker:
+    """
+    Return the process-wide breaker called ``name``, creating it with ``options`` on first use.
+
+    The first caller's options stay in effect: later calls passing different
+    ones (e.g. two config sections whose breakers share a name) get the
+    existing breaker and a ``RuntimeWarning``.
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, **options)
+            _breaker_options[name] = _with_defaults(options)
+            return breaker
+        existing = _breaker_options.get(name)
+    if options and existing is not None:
+        requested = _with_defaults(options)
+        changed = sorted(key for key in options if requested[key] != existing[key])
+        if changed:
+            warnings.warn(
+                f"Circuit breaker '{name}' already exists; ignoring different "
+                f"{', '.join(f'{key}={requested[key]!r} (kept {existing[key]!r})' for key in changed)}. "
+                "Give breakers with different settings distinct names.",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+    return breaker
+
+
+def snapshot_all() -> List[Dict[str, Any]]:
+    """Snapshots of every registered breaker."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [b.snapshot() for b in breakers]
+
+
+class CircuitBreakerService(ServiceWrapper):
+    """
+    Wraps a provider so calls go through ``breaker``.
+
+    Args:
+        service: The provider (or another wrapper) to call.
+        breaker (CircuitBreaker, optional): Defaults to a new breaker named after the service class.
+    """
+    def __init__(self, service, breaker: Optional[CircuitBreaker] = None):
+        super().__init__(service)
+        self.breaker = breaker if breaker is not None else CircuitBreaker(type(service).__name__)
+
+    def generate(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        return self.breaker.call(lambda: self.service.generate(prompt, result_object=result_object, **kwargs))
+
+    async def agenerate(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        return await self.breaker.acall(lambda: self.service.agenerate(prompt, result_object=result_object, **kwargs))
+
+    def generate_stream(self, prompt: str, *, result_object: type = None, **kwargs):
+        # Streams only fail fast; their outcome is not recorded
+        if not self.breaker.available:
+            self.breaker.before_call()
+        return self.service.generate_stream(prompt, result_object=result_object, **kwargs)
+
+    def agenerate_stream(self, prompt: str, *, result_object: type = None, **kwargs):
+        if not self.breaker.available:
+            self.breaker.before_call()
+        return self.service.agenerate_stream(prompt, result_object=result_object, **kwargs)
@@ -0,0 +1,257 @@
+import importlib
+import os
+import sys
+from itertools import repeat
+from numbers import Real
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional
+
+from .template_compiler import CompiledTemplate
+
+
+def _library(column) -> str:
+    return type(column).__module__.split('.', 1)[0]
+
+
+def _is_missing(value) -> bool:
+    # None, NaN and pandas.NA; NaT is not missing and renders as 'NaT', like str()
+    if value is None:
+        return True
+    if isinstance(value, Real):
+        return value != value
+    pd = sys.modules.get('pandas')
+    return pd is not None and value is pd.NA
+
+
+def _elements(column):
+    # The values the row path would see: NumPy scalars keep their width (str of
+    # a float32 is '0.1', not the widened '0.10000000149011612') and pandas
+    # yields Timestamps
+    library = _library(column)
+    if library == 'pyarrow':
+        if _is_floating(column.type):
+            return column.to_numpy(zero_copy_only=False)
+        return column.to_pylist()
+    if library == 'pandas' and getattr(column.dtype, 'kind', None) in ('f', 'c'):
+        return column.to_numpy()
+    return column
+
+
+def _is_floating(kind) -> bool:
+    import pyarrow as pa
+    return pa.types.is_floating(kind)
+
+
+def _column_strings(column) -> List[str]:
+    # Fallback for plain sequences (and columns of dates or mixed Python values)
+    return [v if type(v) is str else ('' if _is_missing(v) else str(v)) for v in _elements(column)]
+
+
+def _arrow_strings(column):
+    # Arrow string array with '' for missing values; pandas/NumPy columns are
+    # converted to Arrow first (zero-copy for numbers and Arrow-backed strings)
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    original = column
+    if _library(column) != 'pyarrow':
+        try:
+            column = pa.array(column, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return pa.array(_column_strings(original), type=pa.string())
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks()
+    if pa.types.is_dictionary(column.type):
+        column = column.dictionary_decode()
+    kind = column.type
+    if pa.types.is_string(kind) or pa.types.is_large_string(kind) or pa.types.is_integer(kind):
+        return pc.fill_null(pc.cast(column, pa.string()), '')
+    if pa.types.is_floating(kind):
+        # NumPy formats each float at its own width as str() does (Arrow
+        # writes 1.0 as '1'); nulls become NaN and render empty
+        values = column.to_numpy(zero_copy_only=False)
+        return pc.if_else(pc.is_nan(pa.array(values)), '', pa.array(values.astype(str), type=pa.string()))
+    # Dates, booleans and objects are formatted from the original values
+    return pa.array(_column_strings(original), type=pa.string())
+
+
+def _has_arrow() -> bool:
+    try:
+        importlib.import_module('pyarrow.compute')
+    except ImportError:
+        return False
+    return True
+
+
+def _resolve_sources(compiled: CompiledTemplate, available, mapping: Optional[Mapping[str, str]], constants: Optional[Mapping[str, Any]]) -> Dict[str, str]:
+    mapping = mapping or {}
+    constants = constants or {}
+    sources = {}
+    missing = []
+    for name in compiled.names:
+        if name in constants:
+            continue
+        column = mapping.get(name, name)
+        if column not in available:
+            missing.append(f"{name} -> {column}")
+        sources[name] = column
+    if missing:
+        raise ValueError(f"No column for placeholders: {', '.join(missing)}")
+    return sources
+
+
+def render_columns(
+    compiled: CompiledTemplate,
+    columns: Mapping[str, Any],
+    mapping: Mapping[str, str] = None,
+    constants: Mapping[str, Any] = None,
+) -> List[str]:
+    """
+    Render one prompt per row from column arrays, without building row dicts.
+
+    Each placeholder is filled from the column of the same name, or from
+    ``mapping[placeholder]`` if given; ``constants`` fills placeholders that are
+    the same for every row. A column is converted to strings once, then every
+    row is produced by joining literal segments and column values. Arrow,
+    pandas and NumPy columns are converted to Arrow and joined with Arrow
+    compute kernels when pyarrow is installed; plain sequences are joined row
+    by row. Values are formatted as ``str()`` formats each element at its own
+    dtype (a float32 ``0.1`` renders as ``0.1``, a pandas datetime as its
+    Timestamp), and missing values (None, NaN, null, ``pandas.NA``) render as
+    an empty string; ``NaT`` renders as ``NaT``.
+
+    Args:
+        compiled (CompiledTemplate): The compiled template.
+        columns: Mapping of column name to an array-like (list, NumPy array,
+            pandas Series, pyarrow Array or ChunkedArray). All columns must have
+            the same length.
+        mapping (dict, optional): Placeholder name -> column name.
+        constants (dict, optional): Placeholder name -> value used for every row.
+
+    Returns:
+        list of str: One rendered prompt per row.
+
+    Raises:
+        ValueError: If a placeholder has neither a column nor a constant, or
+            the columns differ in length.
+    """
+    return _to_list(_render(compiled, columns, mapping, constants))
+
+
+def _to_list(rendered) -> List[str]:
+    if isinstance(rendered, list):
+        return rendered
+    convert = getattr(rendered, 'to_pylist', None) or rendered.tolist
+    return convert()
+
+
+def _render(compiled: CompiledTemplate, columns: Mapping[str, Any], mapping, constants):
+    # Returns an Arrow StringArray for Arrow/pandas/NumPy columns (if pyarrow is
+    # installed), and a list otherwise
+    sources = _resolve_sources(compiled, columns, mapping, constants)
+    constants = constants or {}
+    if not sources:
+        # Nothing varies per row; there is no row count to infer
+        raise ValueError("At least one placeholder must be filled from a column.")
+    libraries = {_library(columns[column]) for column in sources.values()}
+    vectorized = libraries <= {'pyarrow', 'pandas', 'numpy'} and _has_arrow()
+    if vectorized:
+        converted = {name: _arrow_strings(columns[column]) for name, column in sources.items()}
+    else:
+        converted = {name: _column_strings(columns[column]) for name, column in sources.items()}
+    lengths = {len(values) for values in converted.values()}
+    if len(lengths) > 1:
+        raise ValueError(f"Columns have different lengths: {sorted(lengths)}")
+    by_index = {p.index: p.name for p in compiled.placeholders}
+    parts = []
+    for i, part in enumerate(compiled.parts):
+        name = by_index.get(i)
+        if name is None:
+            parts.append(part)
+        elif name in converted:
+            parts.append(converted[name])
+        else:
+            value = constants[name]
+            parts.append(part if value is None else str(value))
+    if vectorized:
+        import pyarrow.compute as pc
+        # Literal parts are broadcast as scalars; the join runs in Arrow's C++ kernels
+        return pc.binary_join_element_wise(*parts, '')
+    return [''.join(row) for row in zip(*(repeat(p) if isinstance(p, str) else p for p in parts))]
+
+
+def render_table(
+    compiled: CompiledTemplate,
+    data,
+    mapping: Mapping[str, str] = None,
+    constants: Mapping[str, Any] = None,
+    output: str = 'prompt',
+):
+    """
+    Render every row of a pyarrow Table/RecordBatch, pandas DataFrame or dict of arrays.
+
+    Returns a ``pyarrow.StringArray`` for Arrow input, a ``pandas.Series`` named
+    ``output`` (sharing the frame's index) for pandas input, and a list of
+    strings otherwise.
+    """
+    module = type(data).__module__.split('.', 1)[0]
+    if module == 'pyarrow':
+        columns = {name: data.column(name) for name in data.column_names}
+        return _arrow_result(_render(compiled, columns, mapping, constants))
+    if module == 'pandas':
+        import pandas as pd
+        columns = {name: data[name] for name in data.columns}
+        rendered = _render(compiled, columns, mapping, constants)
+        if not isinstance(rendered, list):
+            rendered = rendered.to_numpy(zero_copy_only=False)
+        return pd.Series(rendered, index=data.index, name=output, dtype=object)
+    return render_columns(compiled, data, mapping, constants)
+
+
+def iter_render_batches(
+    compiled: CompiledTemplate,
+    source,
+    batch_size: int = 65536,
+    mapping: Mapping[str, str] = None,
+    constants: Mapping[str, Any] = None,
+) -> Iterator[Any]:
+    """
+    Render a Parquet or Arrow file batch by batch, yielding a pyarrow StringArray per batch.
+
+    ``source`` is a path to a ``.parquet`` file or an Arrow IPC (``.arrow``,
+    ``.feather``) file, or any iterable of ``pyarrow.RecordBatch``. Files are
+    memory-mapped and only the columns the template needs are read, so memory
+    use depends on the batch size (``batch_size`` for Parquet, the file's own
+    record batches for Arrow IPC), not on the size of the file.
+    """
+    from .providers._import_utils import require_package
+    pa = require_package('pyarrow')
+    mapping = mapping or {}
+    constants = constants or {}
+    needed = sorted({mapping.get(name, name) for name in compiled.names if name not in constants})
+    if isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        if path.endswith('.parquet'):
+            pq = require_package('pyarrow', import_name='pyarrow.parquet')
+            batches = pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=batch_size, columns=needed)
+        else:
+            batches = _iter_ipc_batches(pa, path)
+    else:
+        batches = source
+    for batch in batches:
+        columns = {name: batch.column(name) for name in batch.schema.names if name in needed}
+        yield _arrow_result(_render(compiled, columns, mapping, constants))
+
+
+def _arrow_result(rendered):
+    import pyarrow as pa
+    if isinstance(rendered, pa.ChunkedArray):
+        return rendered.combine_chunks()
+    if isinstance(rendered, pa.Array):
+        return rendered
+    return pa.array(_to_list(rendered), type=pa.string())
+
+
+def _iter_ipc_batches(pa, path: str) -> Iterable[Any]:
+    with pa.memory_map(path, 'r') as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i)
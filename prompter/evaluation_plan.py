@@ -0,0 +1,89 @@
+import weakref
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+# Signatures are cached per function object and dropped with it
+_parameters_cache = weakref.WeakKeyDictionary()
+
+
+def get_parameters(func) -> Tuple[Tuple[str, bool], ...]:
+    """
+    Return ``(name, required)`` for each named parameter of ``func``, cached per function.
+
+    Bound methods are cached through their underlying function, so a method
+    looked up afresh on every render still hits the cache.
+    """
+    target = getattr(func, '__func__', func)
+    try:
+        return _parameters_cache[target][1 if target is not func else 0:]
+    except (KeyError, TypeError):
+        pass
+    # inspect is slow to import and only needed when the context has callables
+    import inspect
+    params = tuple(
+        (p.name, p.default is p.empty)
+        for p in inspect.signature(target).parameters.values()
+        if p.kind not in (p.VAR_POSITIONAL, p.VAR_KEYWORD)
+    )
+    try:
+        _parameters_cache[target] = params
+    except TypeError:
+        # Not weak-referenceable (e.g. some builtins); skip caching
+        pass
+    return params[1 if target is not func else 0:]
+
+
+class EvaluationPlan:
+    """
+    Resolves context values for one render.
+
+    Each callable is evaluated at most once, however many placeholders or
+    other callables use it. A callable whose parameter names another callable
+    in the context receives that callable's result, so dependencies are
+    evaluated first; a dependency cycle raises ``ValueError``.
+
+    Args:
+        context (Mapping): The render context.
+        strict (bool): Raise ``ValueError`` when a callable has required
+            parameters missing from the context.
+
+    Example:
+        plan = EvaluationPlan({'docs': fetch_docs, 'summary': lambda docs: docs[:100]})
+        plan.value('summary')   # calls fetch_docs() once, then the lambda
+    """
+    def __init__(self, context: Mapping[str, Any], strict: bool = True):
+        self.context = context
+        self.strict = strict
+        self.order: List[str] = []
+        self._resolved: Dict[str, Any] = {}
+        self._active: List[str] = []
+
+    def value(self, name: str) -> Any:
+        """Return the resolved value of ``name`` (``None`` if it is not in the context)."""
+        if name in self._resolved:
+            return self._resolved[name]
+        value = self.context.get(name)
+        if callable(value):
+            if name in self._active:
+                cycle = self._active[self._active.index(name):] + [name]
+                raise ValueError(f"Circular dependency between context callables: {' -> '.join(cycle)}")
+            self._active.append(name)
+            try:
+                kwargs = {}
+                missing = []
+                for param, required in get_parameters(value):
+                    if param in self.context:
+                        kwargs[param] = self.value(param)
+                    elif required:
+                        missing.append(param)
+                if missing and self.strict:
+                    raise ValueError(f"Missing required parameters for function '{name}': {', '.join(missing)}")
+                value = value(**kwargs)
+            finally:
+                self._active.pop()
+            self.order.append(name)
+        self._resolved[name] = value
+        return value
+
+    def resolve(self, names: Iterable[str]) -> Dict[str, Any]:
+        """Resolve every name in ``names`` and return them as a dict."""
+        return {name: self.value(name) for name in names}
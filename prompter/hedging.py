@@ -0,0 +1,236 @@
+"""
+Hedged requests: cut tail latency by racing a duplicate against slow calls.
+
+If a call has not returned after the chosen percentile of recently observed
+latencies, ``HedgedService`` sends the same request again (to the same
+provider or an alternate) and returns whichever succeeds first. Hedges are
+limited to a fraction of all calls, so the extra cost stays bounded.
+
+Example:
+    service = HedgedService(get_llm_service(), percentile=95, budget=0.05)
+"""
+import asyncio
+import math
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from .providers._base import ServiceWrapper
+
+
+class LatencyTracker:
+    """
+    Sliding window of recent latencies, in seconds.
+
+    Args:
+        window (int): Number of samples kept.
+    """
+    def __init__(self, window: int = 1000):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Return the ``p``-th percentile (nearest rank), or None without samples."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        rank = max(1, math.ceil(p / 100.0 * len(samples)))
+        return samples[rank - 1]
+
+
+# Threads for sync hedged calls, shared by every HedgedService. Idle threads are
+# reused and new ones started up to the limit, so calls only queue beyond it.
+MAX_WORKERS = 512
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="prompter-hedge")
+    return _executor
+
+
+class _Attempt:
+    # One request run on the shared executor; puts itself on ``done`` when finished.
+    # ``on_success`` receives its latency, timed from when it started running.
+    def __init__(self, fn, prompt, result_object, kwargs, done: "queue.SimpleQueue", on_success=None):
+        self.result = None
+        self.error = None
+
+        def run():
+            started = time.monotonic()
+            try:
+                self.result = fn(prompt, result_object=result_object, **kwargs)
+            except BaseException as e:
+                self.error = e
+            else:
+                if on_success is not None:
+                    on_success(time.monotonic() - started)
+            done.put(self)
+        _get_executor().submit(run)
+
+
+class HedgedService(ServiceWrapper):
+    """
+    Wraps a provider so slow calls are hedged with a duplicate request.
+
+    Args:
+        service: The provider (or another wrapper) to call.
+        alternate (optional): Service that receives the hedged request; defaults to ``service``.
+        percentile (float): Latency percentile after which a call is hedged.
+        budget (float): Maximum fraction of calls that may be hedged.
+        min_samples (int): Samples needed before the percentile is trusted.
+        initial_delay (float, optional): Hedge delay until ``min_samples`` latencies are
+            known; None disables hedging until then.
+        min_delay (float): Lower bound on the hedge delay, in seconds.
+
+    The latency window holds the primary request's latency, also when the
+    hedge answers first, so the percentile tracks the provider rather than the
+    hedged calls. With ``generate`` requests run on a shared pool of up to
+    ``MAX_WORKERS`` threads, timed from when each starts running; the losing
+    request cannot be interrupted, so it finishes in the background, where its
+    latency is recorded and its result discarded. With ``agenerate`` the
+    loser is cancelled, and a primary cancelled this way is recorded with the
+    time it had run (a lower bound).
+
+    Attributes:
+        calls (int): Calls made.
+        hedged (int): Calls that sent a hedge.
+        hedge_wins (int): Hedged calls answered by the hedge.
+    """
+    def __init__(
+        self,
+        service,
+        alternate=None,
+        percentile: float = 95.0,
+        budget: float = 0.1,
+        min_samples: int = 20,
+        initial_delay: float = None,
+        min_delay: float = 0.05,
+    ):
+        super().__init__(service)
+        self.alternate = alternate if alternate is not None else service
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.latency = LatencyTracker()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None if no hedge should be sent."""
+        if len(self.latency) < self.min_samples:
+            delay = self.initial_delay
+        else:
+            delay = self.latency.percentile(self.percentile)
+        if delay is None:
+            return None
+        return max(self.min_delay, delay)
+
+    def _start(self) -> Optional[float]:
+        with self._lock:
+            self.calls += 1
+        return self.hedge_delay()
+
+    def _may_hedge(self) -> bool:
+        with self._lock:
+            if self.hedged + 1 > self.budget * self.calls:
+                return False
+            self.hedged += 1
+            return True
+
+    def _finish(self, started: float, hedge_won: bool):
+        self.latency.record(time.monotonic() - started)
+        if hedge_won:
+            self._hedge_won()
+
+    def _hedge_won(self):
+        with self._lock:
+            self.hedge_wins += 1
+
+    def generate(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        delay = self._start()
+        started = time.monotonic()
+        if delay is None:
+            result = self.service.generate(prompt, result_object=result_object, **kwargs)
+            self._finish(started, False)
+            return result
+        done = queue.SimpleQueue()
+        primary = _Attempt(self.service.generate, prompt, result_object, kwargs, done, self.latency.record)
+        try:
+            finished = done.get(timeout=delay)
+        except queue.Empty:
+            finished = None
+        if finished is None and self._may_hedge():
+            _Attempt(self.alternate.generate, prompt, result_object, kwargs, done)
+            pending = 2
+        else:
+            pending = 1
+        error = None
+        while pending:
+            if finished is None:
+                finished = done.get()
+            pending -= 1
+            if finished.error is None:
+                # The primary records its own latency, even after losing
+                if finished is not primary:
+                    self._hedge_won()
+                return finished.result
+            if error is None or finished is primary:
+                error = finished.error
+            finished = None
+        raise error
+
+    async def agenerate(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        delay = self._start()
+        started = time.monotonic()
+        primary = asyncio.ensure_future(self.service.agenerate(prompt, result_object=result_object, **kwargs))
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait([primary], timeout=delay)
+                if not done and self._may_hedge():
+                    return await self._race(primary, started, prompt, result_object, kwargs)
+            result = await primary
+        except BaseException:
+            primary.cancel()
+            raise
+        self._finish(started, False)
+        return result
+
+    async def _race(self, primary, started, prompt, result_object, kwargs):
+        hedge = asyncio.ensure_future(self.alternate.agenerate(prompt, result_object=result_object, **kwargs))
+        pending = {primary, hedge}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self._finish(started, task is hedge)
+                        return task.result()
+                    if error is None or task is primary:
+                        error = task.exception()
+            raise error
+        finally:
+            # The loser (or both, if the caller was cancelled) is cancelled
+            for task in pending:
+                task.cancel()
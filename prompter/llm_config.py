@@ -4,6 +4,15 @@
 config = {
     # Set the provider you want to use
     "provider": "openai",  # e.g. "openai", "azure", "bedrock", "anthropic", "ai21", "mistral", "meta", "groq", "cohere", "google", "local", "replicate", "ibm", "mosaicml", "perplexity", "bard", "huggingface"
+    # Or set "provider": "router" to spread calls over several of the providers below
+    # "router": {
+    #     "pool": [
+    #         {"provider": "openai", "model": "gpt-4", "weight": 2},
+    #         {"provider": "anthropic"},
+    #         {"provider": "groq"},
+    #     ],
+    #     "drain_seconds": 30,
+    # },
 
     # OpenAI (ChatGPT, GPT-4, GPT-3.5, etc.)
     "openai": {
@@ -89,7 +98,19 @@ config = {
         "endpoint_url": "http://localhost:8000",
         "model": "llama-3",
         "temperature": 0.7,
-        "max_tokens": 1024
+        "max_tokens": 1024,
+        # Optional for any provider: keep-alive pool size and request timeout
+        # "transport": {"pool_connections": 10, "pool_maxsize": 10, "timeout": 60.0}
+        # Optional for any provider: serve repeated identical calls from a cache
+        # "cache": {"backend": "sqlite", "path": "~/.cache/prompter/responses.db", "ttl": 86400, "bypass_nondeterministic": False}
+        # Optional for any provider: client-side requests/tokens per minute, shared by all processes using shared_dir
+        # "rate_limit": {"rpm": 60, "tpm": 100000, "shared_dir": "/tmp/prompter-rate-limits", "headroom": 0.95}
+        # Optional for any provider: retry 429/5xx/timeouts with jittered backoff
+        # "retry": {"max_attempts": 5, "base_delay": 0.5, "max_delay": 30, "max_elapsed": 120}
+        # Optional for any provider: fail fast while the provider keeps failing
+        # "circuit_breaker": {"failure_rate": 0.5, "window": 20, "min_calls": 10, "open_seconds": 30, "half_open_probes": 3}
+        # Optional for any provider: resend calls slower than the p95 latency, for at most 5% of calls
+        # "hedge": {"percentile": 95, "budget": 0.05}
     },
     # Replicate (API for many open models)
     "replicate": {
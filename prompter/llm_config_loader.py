@@ -1,7 +1,12 @@
 import os
-import yaml
-import configparser
-from typing import Dict, Any
+import time
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# Mtime resolution to distrust (FAT has 2s; most filesystems are far finer)
+_RACY_NS = 2_000_000_000
 
 
 def load_llm_config(config_path: str = None) -> Dict[str, Any]:
@@ -11,6 +16,7 @@ def load_llm_config(config_path: str = None) -> Dict[str, Any]:
     """
     # 1. Try INI
     if config_path and config_path.endswith('.ini') and os.path.exists(config_path):
+        import configparser
         parser = configparser.ConfigParser()
         parser.read(config_path)
         config = {s: dict(parser.items(s)) for s in parser.sections()}
@@ -35,7 +41,170 @@ def load_llm_config(config_path: str = None) -> Dict[str, Any]:
 
     # 3. Try YAML
     if config_path and config_path.endswith(('.yaml', '.yml')) and os.path.exists(config_path):
+        import yaml
         with open(config_path) as f:
             return yaml.safe_load(f)
 
     raise FileNotFoundError("No valid LLM config found in INI, ENV, or YAML.")
+
+
+class LLMConfig:
+    """
+    A loaded LLM config that is parsed once and reloaded only when it changes.
+
+    ``get()`` returns the current config dict; it re-parses only when the config
+    file changed or after ``mark_stale()`` (e.g. from the SIGHUP handler). A
+    change is detected by the file's ``st_mtime_ns``, size and inode; while the
+    mtime is within two seconds of the last read (where a coarse mtime could
+    hide a rewrite) the content hash is compared too. ENV variables are re-read
+    on every reload, so a config taken only from ENV changes only on
+    ``mark_stale()``/``reload()``. The config is swapped in as a whole, so a
+    reader never sees half of an old and half of a new config; treat it as
+    read-only.
+
+    By default the file is stat-ed on every ``get()`` (a syscall, no parsing).
+    With ``check_interval`` set, it is checked at most that often, so a change
+    can be seen up to ``check_interval`` seconds late.
+
+    If a reload fails (say, the file is being rewritten), the previous config is
+    kept, the error is stored in ``last_error`` and the reload is retried on the
+    next check.
+
+    Args:
+        config_path (str, optional): INI or YAML file, as for ``load_llm_config``.
+        check_interval (float): Minimum seconds between two file checks.
+
+    Attributes:
+        version (int): Incremented on every reload that changed the config.
+        listeners (list): Called as ``listener(old, new)`` after such a reload.
+    """
+    def __init__(self, config_path: str = None, check_interval: float = 0.0):
+        self.config_path = config_path
+        self.check_interval = check_interval
+        self.listeners: List[Callable[[Dict[str, Any], Dict[str, Any]], None]] = []
+        self.last_error: Optional[Exception] = None
+        self._stale = False
+        self._checked = 0.0
+        self._signature = None
+        self._digest = None
+        self._verified_ns = 0
+        self._snapshot = (0, None)
+        self._lock = threading.Lock()
+        self.reload()
+
+    @property
+    def version(self) -> int:
+        return self._snapshot[0]
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.config_path)
+        except (OSError, TypeError):
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _file_digest(self) -> Optional[bytes]:
+        try:
+            with open(self.config_path, "rb") as f:
+                return hashlib.sha256(f.read()).digest()
+        except (OSError, TypeError):
+            return None
+
+    def _changed(self) -> bool:
+        signature = self._file_signature()
+        if signature != self._signature:
+            return True
+        if signature is None or signature[0] < self._verified_ns - _RACY_NS:
+            return False
+        # The file may have been rewritten within the mtime resolution
+        if self._file_digest() != self._digest:
+            return True
+        self._verified_ns = time.time_ns()
+        return False
+
+    def mark_stale(self):
+        """Reload on the next ``get()``. Safe to call from a signal handler."""
+        self._stale = True
+
+    def snapshot(self) -> Tuple[int, Dict[str, Any]]:
+        """Return ``(version, config)``, reloading first if the config changed."""
+        now = time.monotonic()
+        if self._stale or now - self._checked >= self.check_interval:
+            self._checked = now
+            if self._stale or self._changed():
+                self.reload()
+        return self._snapshot
+
+    def get(self) -> Dict[str, Any]:
+        """Return the current config dict."""
+        return self.snapshot()[1]
+
+    def reload(self) -> bool:
+        """Re-read the config now; returns True if it changed."""
+        with self._lock:
+            self._stale = False
+            self._checked = time.monotonic()
+            signature = self._file_signature()
+            digest = self._file_digest()
+            verified_ns = time.time_ns()
+            try:
+                config = load_llm_config(self.config_path)
+            except Exception as e:
+                if self._snapshot[1] is None:
+                    raise
+                self.last_error = e
+                return False
+            self.last_error = None
+            self._signature = signature
+            self._digest = digest
+            self._verified_ns = verified_ns
+            version, old = self._snapshot
+            if config == old:
+                return False
+            self._snapshot = (version + 1, config)
+        if old is not None:
+            for listener in list(self.listeners):
+                listener(old, config)
+        return True
+
+
+_configs: Dict[Optional[str], LLMConfig] = {}
+_configs_lock = threading.Lock()
+
+
+def get_config(config_path: str = None) -> LLMConfig:
+    """Return the process-wide ``LLMConfig`` for ``config_path``, loading it on first use."""
+    config = _configs.get(config_path)
+    if config is None:
+        with _configs_lock:
+            config = _configs.get(config_path)
+            if config is None:
+                config = _configs[config_path] = LLMConfig(config_path)
+    return config
+
+
+def clear_config_cache():
+    """Forget every loaded ``LLMConfig``."""
+    with _configs_lock:
+        _configs.clear()
+
+
+def install_sighup_handler() -> bool:
+    """
+    Reload every loaded config on SIGHUP (``kill -HUP <pid>``), as well as on
+    mtime changes. Must be called from the main thread; returns False where
+    SIGHUP does not exist (Windows).
+    """
+    import signal
+    if not hasattr(signal, "SIGHUP"):
+        return False
+    previous = signal.getsignal(signal.SIGHUP)
+
+    def handler(signum, frame):
+        # Only flag the configs: reloading here could deadlock on a held lock
+        for config in list(_configs.values()):
+            config.mark_stale()
+        if callable(previous):
+            previous(signum, frame)
+    signal.signal(signal.SIGHUP, handler)
+    return True
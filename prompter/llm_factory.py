@@ -1,9 +1,13 @@
 
 import os
+import json
+import hashlib
 import importlib
-from prompter.llm_config_loader import load_llm_config
+import threading
+from prompter.llm_config_loader import LLMConfig, clear_config_cache, get_config, load_llm_config
+from prompter.providers._base import BaseLLMService, ServiceWrapper
 
-class LLMService:
+class LLMService(BaseLLMService):
     def generate(self, prompt: str, **kwargs) -> str:
         raise NotImplementedError
 
@@ -29,42 +33,282 @@ class LocalLLMService(LLMService):
         pass
 
 
-def get_llm_service(config_path: str = None) -> LLMService:
+# Entry point group for third-party providers, e.g. in a plugin's pyproject.toml:
+#   [project.entry-points."prompter.providers"]
+#   acme = "acme_prompter:AcmeService"
+ENTRY_POINT_GROUP = "prompter.providers"
+
+# Class names of built-in providers, found in prompter.providers.<name>_service
+SPECIAL_CLASS_NAMES = {
+    "openai": "OpenAIService",
+    "azure": "AzureOpenAIService",
+    "bedrock": "BedrockService",
+    "cohere": "CohereService",
+    "ai21": "AI21Service",
+    "anthropic": "AnthropicService",
+    "mistral": "MistralService",
+    "meta": "MetaLlamaService",
+    "google": "GoogleVertexAIService",
+    "ibm": "IBMWatsonService",
+    "huggingface": "HuggingFaceService",
+    "local": "LocalLLMService",
+    "groq": "GroqService",
+    "replicate": "ReplicateService",
+    "mosaicml": "MosaicMLService",
+    "perplexity": "PerplexityService",
+    "bard": "BardService",
+}
+
+
+def _entry_points(group: str):
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python 3.7
+        try:
+            from importlib_metadata import entry_points
+        except ImportError:
+            return []
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        return list(eps.select(group=group))
+    return list(eps.get(group, []))
+
+
+class ProviderRegistry:
+    """
+    Maps provider names to service classes, resolving each name once.
+
+    Lookup order: classes added with ``register()``, then entry points in the
+    ``prompter.providers`` group (scanned once, on first miss), then the
+    built-in ``prompter.providers.<name>_service`` modules.
+    """
+    def __init__(self, group: str = ENTRY_POINT_GROUP):
+        self.group = group
+        self._registered = {}
+        self._resolved = {}
+        self._entry_points = None
+        self._lock = threading.RLock()
+
+    def register(self, name: str, provider_class):
+        """Make ``provider_class`` available as ``provider: <name>``."""
+        with self._lock:
+            self._registered[name] = provider_class
+            self._resolved.pop(name, None)
+
+    def unregister(self, name: str):
+        with self._lock:
+            self._registered.pop(name, None)
+            self._resolved.pop(name, None)
+
+    def entry_points(self) -> dict:
+        if self._entry_points is None:
+            with self._lock:
+                if self._entry_points is None:
+                    self._entry_points = {ep.name: ep for ep in _entry_points(self.group)}
+        return self._entry_points
+
+    def names(self) -> list:
+        """Every provider name that can be resolved without guessing."""
+        return sorted(set(SPECIAL_CLASS_NAMES) | set(self.entry_points()) | set(self._registered))
+
+    def resolve(self, name: str):
+        """
+        Return the service class for ``name``.
+
+        Raises:
+            ImportError: If no class can be found for ``name``.
+        """
+        provider_class = self._registered.get(name) or self._resolved.get(name)
+        if provider_class is not None:
+            return provider_class
+        with self._lock:
+            entry_point = self.entry_points().get(name)
+            if entry_point is not None:
+                provider_class = entry_point.load()
+            else:
+                provider_class = self._import_builtin(name)
+            self._resolved[name] = provider_class
+        return provider_class
+
+    @staticmethod
+    def _import_builtin(provider: str):
+        module_name = f"prompter.providers.{provider}_service"
+        # Guess class name: handle special cases for capitalization (e.g., OpenAI, Cohere, AI21, etc.)
+        def to_camel(s):
+            return ''.join(word.capitalize() for word in s.split('_'))
+        class_name = SPECIAL_CLASS_NAMES.get(provider, to_camel(provider) + "Service")
+        try:
+            module = importlib.import_module(module_name)
+            return getattr(module, class_name)
+        except (ImportError, AttributeError) as e:
+            raise ImportError(f"Could not import provider class {class_name} from {module_name}: {e}")
+
+    def clear(self):
+        """Forget resolved classes and the entry point scan (registered classes are kept)."""
+        with self._lock:
+            self._resolved.clear()
+            self._entry_points = None
+
+
+registry = ProviderRegistry()
+_instances = {}
+# LLMConfig -> key of the instance its current version uses
+_owners = {}
+_latest = {}
+_instances_lock = threading.Lock()
+
+
+def get_llm_service(config_path: str = None, cached: bool = True, live: bool = False) -> LLMService:
     """
     Dynamically load the LLM service provider class from the providers directory based on config.
+
+    With ``provider: router``, returns a ``RouterService`` over the pool described
+    in the ``router`` section (see ``prompter.router``).
+
+    The config is parsed once and reloaded when its file changes (see
+    ``LLMConfig``), and services are cached by a hash of their config section, so
+    repeated calls with the same config return the same instance (pass
+    ``cached=False`` for a freshly loaded one, or call ``clear_cache()``).
+    When a reload changes a section, the instance built from the old version is
+    dropped from the cache (callers still holding it can keep using it).
+    ``LLM_*`` environment variables are read when the config is (re)loaded: a
+    config taken from them alone changes only on SIGHUP (with
+    ``install_sighup_handler()``) or ``get_config(path).reload()``.
+
+    With ``live=True``, returns a ``ReloadingService`` that follows config
+    reloads, so rotated keys or new models take effect without a restart.
     """
-    config = load_llm_config(config_path)
+    if live:
+        return ReloadingService(get_config(config_path))
+    if not cached:
+        config = load_llm_config(config_path)
+        return _build_service(_provider_of(config), config)
+    config = get_config(config_path)
+    version, snapshot = config.snapshot()
+    # Until the config reloads, skip hashing its section again
+    latest = _latest.get(config_path)
+    if latest is not None and latest[0] is config and latest[1] == version:
+        return latest[2]
+    service = _service_for(snapshot, config)
+    _latest[config_path] = (config, version, service)
+    return service
+
+
+def _provider_of(config: dict) -> str:
     provider = config.get("provider")
     if not provider:
         raise ValueError("No provider specified in config.")
-    provider_config = config.get(provider, {})
-    module_name = f"prompter.providers.{provider}_service"
-    # Guess class name: handle special cases for capitalization (e.g., OpenAI, Cohere, AI21, etc.)
-    SPECIAL_CLASS_NAMES = {
-        "openai": "OpenAIService",
-        "cohere": "CohereService",
-        "ai21": "AI21Service",
-        "anthropic": "AnthropicService",
-        "mistral": "MistralService",
-        "meta": "MetaLlamaService",
-        "google": "GoogleVertexAIService",
-        "ibm": "IBMWatsonService",
-        "huggingface": "HuggingFaceService",
-        "local": "LocalLLMService",
-        "groq": "GroqService",
-        "replicate": "ReplicateService",
-        "mosaicml": "MosaicMLService",
-        "perplexity": "PerplexityService",
-        "bard": "BardService",
-    }
-    def to_camel(s):
-        return ''.join(word.capitalize() for word in s.split('_'))
-    class_name = SPECIAL_CLASS_NAMES.get(provider, to_camel(provider) + "Service")
+    return provider
+
+
+def _service_for(config: dict, owner: LLMConfig = None) -> LLMService:
+    provider = _provider_of(config)
+    # A router depends on several sections, so its key covers the whole config
+    section = config if provider == "router" else config.get(provider, {})
+    key = _config_key(provider, section)
+    with _instances_lock:
+        service = _instances.get(key)
+        if service is None:
+            service = _instances[key] = _build_service(provider, config)
+        if owner is not None:
+            # Release the instance of the owner's previous version once no
+            # loaded config uses it, so reloads do not accumulate services
+            previous = _owners.get(owner)
+            _owners[owner] = key
+            if previous is not None and previous != key and previous not in _owners.values():
+                _instances.pop(previous, None)
+    return service
+
+
+def _build_service(provider: str, config: dict) -> LLMService:
+    if provider == "router":
+        from prompter.router import RouterService
+        return RouterService.from_config(config)
+    return create_service(provider, config.get(provider, {}))
+
+
+def _config_key(provider: str, section) -> str:
+    blob = json.dumps([provider, section], sort_keys=True, default=repr)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
 
-    try:
-        module = importlib.import_module(module_name)
-        provider_class = getattr(module, class_name)
-    except (ImportError, AttributeError) as e:
-        raise ImportError(f"Could not import provider class {class_name} from {module_name}: {e}")
 
-    return provider_class(**provider_config)
+def clear_cache():
+    """Forget loaded configs, cached service instances and resolved provider classes."""
+    with _instances_lock:
+        _instances.clear()
+        _owners.clear()
+        _latest.clear()
+    registry.clear()
+    clear_config_cache()
+
+
+class ReloadingService(ServiceWrapper):
+    """
+    Calls the service built from the current version of ``config``.
+
+    Each call picks up the service once, so it runs entirely against either the
+    old or the new config. Unchanged config sections map to the same cached
+    instance, so their caches, rate limiters and breakers survive a reload.
+
+    Args:
+        config (LLMConfig): The config to follow.
+    """
+    def __init__(self, config: LLMConfig):
+        self.config = config
+        self._current = (None, None)
+
+    @property
+    def service(self) -> LLMService:
+        version, config = self.config.snapshot()
+        current_version, service = self._current
+        if current_version != version:
+            service = _service_for(config, self.config)
+            self._current = (version, service)
+        return service
+
+
+def create_service(provider: str, provider_config: dict) -> LLMService:
+    """
+    Build the service for ``provider`` from its config section, wrapped with any
+    cache/rate_limit/retry/hedge layers the section enables.
+    """
+    provider_config = dict(provider_config or {})
+    # Optional connection pool settings, e.g. {"pool_maxsize": 50, "timeout": 30}
+    transport = provider_config.pop("transport", None)
+    if transport:
+        from prompter.providers._transport import configure
+        configure(provider, **transport)
+    # Optional response cache, e.g. {"backend": "sqlite", "path": "responses.db", "ttl": 86400}
+    cache = provider_config.pop("cache", None)
+    # Optional client-side limits, e.g. {"rpm": 500, "tpm": 90000, "shared_dir": "/tmp/prompter-rl"}
+    rate_limit = provider_config.pop("rate_limit", None)
+    # Optional retries of transient failures, e.g. {"max_attempts": 5, "max_elapsed": 120}
+    retry = provider_config.pop("retry", None)
+    # Optional circuit breaker, e.g. {"failure_rate": 0.5, "window": 20, "open_seconds": 30}
+    circuit_breaker = provider_config.pop("circuit_breaker", None)
+    # Optional hedging of slow calls, e.g. {"percentile": 95, "budget": 0.05}
+    hedge = provider_config.pop("hedge", None)
+    provider_class = registry.resolve(provider)
+    service = provider_class(**provider_config)
+    if rate_limit:
+        from prompter.rate_limit import RateLimitedService, configure_rate_limit
+        service = RateLimitedService(service, configure_rate_limit(provider, **rate_limit))
+    if circuit_breaker:
+        from prompter.circuit_breaker import CircuitBreakerService, get_breaker
+        # Checked before waiting on the rate limiter; CircuitOpenError is not retried
+        options = {} if circuit_breaker is True else dict(circuit_breaker)
+        name = options.pop("name", f"{provider}:{provider_config.get('model') or provider_config.get('deployment') or ''}".rstrip(':'))
+        service = CircuitBreakerService(service, get_breaker(name, **options))
+    if retry:
+        from prompter.retry import RetryingService, RetryPolicy
+        # Every retry goes through the rate limiter again
+        service = RetryingService(service, RetryPolicy(**({} if retry is True else retry)))
+    if hedge:
+        from prompter.hedging import HedgedService
+        service = HedgedService(service, **({} if hedge is True else hedge))
+    if cache:
+        from prompter.response_cache import CachedService, cache_from_config
+        cache = dict(cache)
+        bypass = cache.pop("bypass_nondeterministic", False)
+        service = CachedService(service, cache_from_config(cache), bypass_nondeterministic=bypass)
+    return service
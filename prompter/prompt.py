@@ -1,53 +1,104 @@
 import os
-from typing import Callable, Dict, Any
+import functools
+from types import MappingProxyType
+from typing import Callable, Dict, Any, Mapping, Union
+
+from .template_compiler import DEFAULT_CHUNK_SIZE, CompiledTemplate, is_stream
+from .evaluation_plan import EvaluationPlan
+
+
+def _parse_sections(template: str) -> Dict[str, str]:
+    # Simple parser: sections are lines starting with a keyword and ':'
+    sections = {}
+    current = None
+    lines = template.splitlines()
+    for line in lines:
+        if ':' in line:
+            key, val = line.split(':', 1)
+            key = key.strip().lower()
+            sections[key] = val.strip()
+            current = key
+        elif current:
+            sections[current] += '\n' + line
+    return sections
+
+
+class ParsedTemplate:
+    """
+    Immutable, shareable result of parsing a prompt template.
+
+    Holds the template source, its sections and its compiled form. Instances
+    are shared between every ``Prompt`` built from the same source text.
+    """
+    __slots__ = ('source', 'sections', 'compiled')
+
+    def __init__(self, source: str):
+        object.__setattr__(self, 'source', source)
+        object.__setattr__(self, 'sections', MappingProxyType(_parse_sections(source)))
+        object.__setattr__(self, 'compiled', CompiledTemplate(source))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ParsedTemplate is immutable")
+
+    def __repr__(self):
+        return f"ParsedTemplate(names={self.compiled.names!r})"
+
+
+@functools.lru_cache(maxsize=512)
+def parse_template(template: str) -> ParsedTemplate:
+    """Return the shared ParsedTemplate for ``template``, parsing it on first use."""
+    return ParsedTemplate(template)
+
 
 class Prompt:
-    def __init__(self, template: str):
-        self.template = template
-        self.sections = self._parse_sections(template)
+    # Instances only hold the bound values; the parsed template is shared
+    __slots__ = ('_parsed', 'values')
+
+    def __init__(self, template: Union[str, ParsedTemplate]):
+        self._parsed = template if isinstance(template, ParsedTemplate) else parse_template(template)
         self.values = {}
 
+    @property
+    def template(self) -> str:
+        return self._parsed.source
+
+    @property
+    def sections(self) -> Mapping[str, str]:
+        return self._parsed.sections
+
+    @property
+    def parsed(self) -> ParsedTemplate:
+        return self._parsed
+
     @classmethod
-    def load_template(cls, rel_path: str, base_dir: str = None):
+    def load_template(cls, rel_path: str, base_dir: str = None, cache=None):
         """
         Load a prompt from a template file by relative path (without extension).
         Example: load_template('summarization/summarization')
+
+        Templates are served from the process-wide TemplateCache unless another
+        ``cache`` is given.
         """
+        from .template_cache import default_cache
         base_dir = base_dir or os.path.join(os.path.dirname(__file__), '..', 'templates')
         path = os.path.join(base_dir, rel_path + '.prompt')
-        with open(path, 'r', encoding='utf-8') as f:
-            template = f.read()
-        return cls(template)
+        cache = cache if cache is not None else default_cache
+        return cls(cache.get(path))
 
     @classmethod
-    def from_type(cls, type_: str, base_dir: str = None):
+    def from_type(cls, type_: str, base_dir: str = None, cache=None):
         """
         Create a prompt object by template type, using the default template for that type.
         """
+        from .template_cache import default_cache
+        cache = cache if cache is not None else default_cache
         base_dir = base_dir or os.path.join(os.path.dirname(__file__), '..', 'templates')
         # Use the first .prompt file found in the type folder
         type_dir = os.path.join(base_dir, type_)
-        for fname in os.listdir(type_dir):
-            if fname.endswith('.prompt'):
-                with open(os.path.join(type_dir, fname), 'r', encoding='utf-8') as f:
-                    template = f.read()
-                return cls(template)
-        raise FileNotFoundError(f"No .prompt file found for type '{type_}' in '{type_dir}'")
-
-    def _parse_sections(self, template: str) -> Dict[str, str]:
-        # Simple parser: sections are lines starting with a keyword and ':'
-        sections = {}
-        current = None
-        lines = template.splitlines()
-        for line in lines:
-            if ':' in line:
-                key, val = line.split(':', 1)
-                key = key.strip().lower()
-                sections[key] = val.strip()
-                current = key
-            elif current:
-                sections[current] += '\n' + line
-        return sections
+        path = cache.find(type_dir, '.prompt')
+        if path is None:
+            raise FileNotFoundError(f"No .prompt file found for type '{type_}' in '{type_dir}'")
+        return cls(cache.get(path))
 
     def set(self, section: str, value: Any):
         self.values[section.lower()] = value
@@ -131,18 +182,32 @@ class Prompt:
     def output(self, value: str):
         return self.set('output', value)
 
+    def _resolve(self) -> Dict[str, Any]:
+        # Callables get the values matching their parameter names, each evaluated once
+        plan = EvaluationPlan(self.values, strict=False)
+        resolved = {}
+        for k in self._parsed.compiled.names:
+            if k not in self.values:
+                continue
+            value = plan.value(k)
+            resolved[k] = value if is_stream(value) else str(value)
+        return resolved
+
     def render(self):
-        import inspect
-        result = self.template
-        for k, v in self.values.items():
-            value = v
-            if callable(v):
-                sig = inspect.signature(v)
-                # Pass context values as kwargs if function expects them
-                kwargs = {kk: vv for kk, vv in self.values.items() if kk in sig.parameters}
-                value = v(**kwargs) if kwargs else v()
-            result = result.replace(f"{{{{{k}}}}}", str(value))
-        return result
+        # Resolve only the placeholders the template uses, then fill them in one pass
+        return self._parsed.compiled.render(self._resolve())
+
+    def iter_render(self, chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: str = None):
+        """
+        Yield the rendered prompt in chunks; file-like and iterator values are streamed.
+        """
+        return self._parsed.compiled.iter_render(self._resolve(), chunk_size, encoding)
+
+    def render_to(self, writer, chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: str = None) -> int:
+        """
+        Write the rendered prompt to ``writer`` chunk by chunk and return the amount written.
+        """
+        return self._parsed.compiled.render_to(writer, self._resolve(), chunk_size, encoding)
 
 # Example usage:
 # prompt = Prompt.load_template('summarization', 'summarization')
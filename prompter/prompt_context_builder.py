@@ -1,6 +1,129 @@
+import threading
+from collections.abc import Mapping, MutableMapping
+
+
+def _format_bullets(items):
+    return '\n'.join(f"- {item}" for item in items)
+
+
+def _is_item_list(value):
+    # Lists, tuples, generators and other iterables of items; not text, dicts or files
+    return (
+        hasattr(value, '__iter__')
+        and not isinstance(value, (str, bytes, Mapping))
+        and not hasattr(value, 'read')
+    )
+
+
+class LazyValue:
+    """
+    A context value that is formatted only when a template consumes it.
+
+    ``items`` may be any iterable, including a one-shot generator; it is not
+    touched until ``get()`` is first called, and the formatted string is
+    memoized for later calls. Concurrent callers wait for one formatting run.
+    """
+    __slots__ = ('_items', '_formatter', '_value', '_done', '_lock')
+
+    def __init__(self, items, formatter=_format_bullets):
+        self._items = items
+        self._formatter = formatter
+        self._value = None
+        self._done = False
+        self._lock = threading.Lock()
+
+    @property
+    def items(self):
+        """The unformatted items (materialized to a list if they were a generator)."""
+        if not isinstance(self._items, (list, tuple)):
+            with self._lock:
+                if not isinstance(self._items, (list, tuple)):
+                    self._items = list(self._items)
+        return self._items
+
+    @property
+    def formatter(self):
+        return self._formatter
+
+    def get(self):
+        if not self._done:
+            items = self.items
+            with self._lock:
+                if not self._done:
+                    self._value = self._formatter(items)
+                    self._done = True
+        return self._value
+
+    def __repr__(self):
+        return f"LazyValue({'formatted' if self._done else 'pending'})"
+
+
+class FormattedItems(str):
+    """
+    An item list formatted by ``PromptContextBuilder.build()``.
+
+    It is the formatted string, and also keeps the ``items`` and ``formatter``
+    it came from so that ``render_within_budget`` can trim it item by item.
+    Copies and pickles are plain strings.
+    """
+    def __new__(cls, text, items=(), formatter=_format_bullets):
+        self = super().__new__(cls, text)
+        self.items = list(items)
+        self.formatter = formatter
+        return self
+
+    def __reduce__(self):
+        return (str, (str(self),))
+
+
+class PromptContext(MutableMapping):
+    """
+    Context mapping returned by ``PromptContextBuilder.build_lazy()``.
+
+    Behaves like a dict, but values stored as ``LazyValue`` are formatted on
+    first access and the result is memoized, so a key that no template
+    references is never formatted, and one rendered by several templates is
+    formatted once. It is not a ``dict``: use ``dict(ctx)`` where one is
+    required (e.g. ``json.dumps``). Copies and pickles hold formatted values.
+    """
+    def __init__(self, data=None):
+        self._data = dict(data or {})
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        if isinstance(value, LazyValue):
+            return value.get()
+        return value
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def raw(self, key):
+        """Return the stored value for ``key`` without formatting it."""
+        return self._data[key]
+
+    def __reduce__(self):
+        return (PromptContext, (dict(self),))
+
+    def __repr__(self):
+        return f"PromptContext({self._data!r})"
+
+
 class PromptContextBuilder:
     def __init__(self):
-        self._context = {}
+        self._context = PromptContext()
 
     def set(self, key, value):
         if key in self._context:
@@ -9,10 +132,34 @@ class PromptContextBuilder:
         return self
 
     def build(self):
+        """
+        Return the context as a plain dict, formatting item lists now (as
+        ``FormattedItems`` strings).
+        """
+        context = {}
+        for key in self._context:
+            value = self._context.raw(key)
+            if isinstance(value, LazyValue):
+                value = FormattedItems(value.get(), value.items, value.formatter)
+            context[key] = value
+        return context
+
+    def build_lazy(self):
+        """
+        Return the context as a ``PromptContext``, formatting item lists only
+        when a template uses them. ``render_within_budget`` can trim such lists
+        item by item.
+        """
         return self._context
 
     def _format_bullets(self, items):
-        return '\n'.join(f"- {item}" for item in items)
+        return _format_bullets(items)
+
+    def _set_items(self, key, text):
+        # Item lists are kept lazy and formatted as bullets only when rendered
+        if _is_item_list(text):
+            return self.set(key, LazyValue(text, self._format_bullets))
+        return self.set(key, text)
 
     def text(self, text):
         return self.set('text', text)
@@ -23,36 +170,24 @@ class PromptContextBuilder:
     def instruction(self, text):
         return self.set('instruction', text)
     def examples(self, text):
-        if isinstance(text, list):
-            return self.set('examples', self._format_bullets(text))
-        return self.set('examples', text)
+        return self._set_items('examples', text)
     def role(self, text):
         return self.set('role', text)
     def retrieved_docs(self, text):
-        if isinstance(text, list):
-            return self.set('retrieved_docs', self._format_bullets(text))
-        return self.set('retrieved_docs', text)
+        return self._set_items('retrieved_docs', text)
     def question(self, text):
         return self.set('question', text)
     def answer(self, text):
         return self.set('answer', text)
     def persona(self, text):
-        if isinstance(text, list):
-            return self.set('persona', self._format_bullets(text))
-        return self.set('persona', text)
+        return self._set_items('persona', text)
     def history(self, text):
-        if isinstance(text, list):
-            return self.set('history', self._format_bullets(text))
-        return self.set('history', text)
+        return self._set_items('history', text)
     def user_input(self, text):
         return self.set('user_input', text)
     def input_data(self, text):
-        if isinstance(text, list):
-            return self.set('input_data', self._format_bullets(text))
-        return self.set('input_data', text)
+        return self._set_items('input_data', text)
     def transformation(self, text):
         return self.set('transformation', text)
     def output(self, text):
-        if isinstance(text, list):
-            return self.set('output', self._format_bullets(text))
-        return self.set('output', text)
+        return self._set_items('output', text)
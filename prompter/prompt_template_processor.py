@@ -1,38 +1,57 @@
-import re
-import inspect
-from typing import Callable, Dict, Optional, Union
+from typing import Callable, Dict, Iterable, Iterator, Tuple, Union
+
+from .template_compiler import DEFAULT_CHUNK_SIZE, CompiledTemplate, Placeholder
+from .evaluation_plan import EvaluationPlan, get_parameters
+
+
+def resolve_value(key, context):
+    """
+    Resolve the context value for placeholder ``key``.
+
+    Callables are invoked with the context entries matching their parameter
+    names. Returns ``None`` when the key has no value.
+    """
+    return EvaluationPlan(context).value(key)
 
 
 def replacer(match, context):
-    key = match.group(1)
-    value = context.get(key)
-    if callable(value):
-        sig = inspect.signature(value)
-        kwargs = {k: v for k, v in context.items() if k in sig.parameters}
-        missing = [p for p in sig.parameters if p not in kwargs and sig.parameters[p].default is inspect.Parameter.empty]
-        if missing:
-            raise ValueError(f"Missing required parameters for function '{key}': {', '.join(missing)}")
-        return value(**kwargs)
+    value = resolve_value(match.group(1), context)
     return str(value) if value is not None else match.group(0)
 
 
-import importlib.resources
-import requests
+def resolve_context(compiled: CompiledTemplate, context) -> Dict[str, object]:
+    """
+    Resolve the value of every placeholder in ``compiled`` from ``context``.
+
+    One EvaluationPlan is shared by all placeholders, so each callable runs
+    at most once per render, after the callables it depends on.
+    """
+    return EvaluationPlan(context).resolve(compiled.names)
+
+
+def render_context(compiled: CompiledTemplate, context) -> str:
+    """Render ``compiled`` against one context dict."""
+    return compiled.render(resolve_context(compiled, context))
+
+
 import os
 
 class PromptTemplateProcessor:
-    def __init__(self, template_name: str, package: str = None, url: str = None):
+    def __init__(self, template_name: str, package: str = None, url: str = None, fetcher=None):
         """
         Load a template from a file path, package resource, or URL.
         - template_name: The template file name or path.
         - package: If provided, loads from the given package using importlib.resources.
         - url: If provided, downloads the template from the given URL.
+        - fetcher: TemplateFetcher used for URLs; defaults to the shared, disk-cached one.
         """
         if url:
-            response = requests.get(url)
-            response.raise_for_status()
-            self.template = response.text
+            if fetcher is None:
+                from .template_fetcher import get_default_fetcher
+                fetcher = get_default_fetcher()
+            self.template = fetcher.fetch(url)
         elif package:
+            import importlib.resources
             with importlib.resources.open_text(package, template_name) as f:
                 self.template = f.read()
         else:
@@ -41,11 +60,144 @@ class PromptTemplateProcessor:
             with open(template_name, 'r', encoding='utf-8') as f:
                 self.template = f.read()
 
+    @property
+    def template(self) -> str:
+        return self._compiled.source
+
+    @template.setter
+    def template(self, value: str):
+        # Compile once per template text; render only fills slots
+        self._compiled = CompiledTemplate(value)
+
+    @property
+    def compiled(self) -> CompiledTemplate:
+        """The compiled form of the template (literal segments and placeholder slots)."""
+        return self._compiled
+
+    @property
+    def placeholders(self) -> Tuple[Placeholder, ...]:
+        """Every placeholder occurrence, with its name and source position."""
+        return self._compiled.placeholders
+
+    @property
+    def placeholder_names(self) -> Tuple[str, ...]:
+        """Distinct placeholder names, in order of first appearance."""
+        return self._compiled.names
+
+    def validate(self, context: Dict[str, Union[str, Callable[[], str]]]) -> None:
+        """
+        Check that ``context`` can fill every placeholder, without rendering.
+
+        Callables are not invoked; only their required parameters are checked.
+
+        Raises:
+            ValueError: If placeholders or callable parameters are missing.
+        """
+        missing = self._compiled.missing(context)
+        if missing:
+            raise ValueError(f"Missing values for placeholders: {', '.join(missing)}")
+        for name in self._compiled.names:
+            value = context[name]
+            if callable(value):
+                params = [p for p, required in get_parameters(value) if required and p not in context]
+                if params:
+                    raise ValueError(f"Missing required parameters for function '{name}': {', '.join(params)}")
+
     def render(self, context: Dict[str, Union[str, Callable[[], str]]]) -> str:
-        rendered = re.sub(r'{{\s*(\w+)\s*}}', lambda m: replacer(m, context), self.template)
         # Optionally, parse sections like 'Context:', 'Instruction:'
         # If you want to support heading-based parsing, add logic here
-        return rendered
+        return render_context(self._compiled, context)
+
+    def iter_render(self, context: Dict[str, object], chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: str = None) -> Iterator:
+        """
+        Yield the rendered prompt in chunks instead of returning one string.
+
+        Context values may be file-like objects or iterators of strings; they are
+        read piece by piece and never joined, so peak memory stays bounded by
+        ``chunk_size`` rather than by the size of the largest value. With
+        ``encoding``, bytes are yielded, e.g. for a streaming HTTP request body.
+        """
+        return self._compiled.iter_render(resolve_context(self._compiled, context), chunk_size, encoding)
+
+    def render_to(self, writer, context: Dict[str, object], chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: str = None) -> int:
+        """
+        Stream the rendered prompt into ``writer`` (a file or anything with ``write``).
+
+        Returns the number of characters (or bytes, with ``encoding``) written.
+        """
+        return self._compiled.render_to(writer, resolve_context(self._compiled, context), chunk_size, encoding)
+
+    def render_within_budget(
+        self,
+        context: Dict[str, object],
+        budget: int,
+        priorities: Dict[str, int],
+        count_tokens: Callable[[str], int] = None,
+        trim_from: Dict[str, str] = None,
+    ) -> str:
+        """
+        Render the prompt trimmed to fit a token budget.
+
+        Sections named in ``priorities`` are trimmed item by item, lowest
+        priority first (e.g. ``{'retrieved_docs': 0, 'history': 1}``); all
+        other sections are kept intact. ``history`` loses its oldest items first.
+        See ``prompter.token_budget.render_within_budget`` for details.
+
+        Raises:
+            ValueError: If the prompt cannot fit in ``budget``.
+        """
+        from .token_budget import render_within_budget
+        return render_within_budget(self._compiled, context, budget, priorities, count_tokens=count_tokens, trim_from=trim_from)
+
+    def render_many(
+        self,
+        contexts: Iterable[Dict[str, Union[str, Callable[[], str]]]],
+        workers: int = None,
+        chunksize: int = 256,
+        mode: str = None,
+    ) -> Iterator[str]:
+        """
+        Render the template against many contexts, yielding results in input order.
+
+        Args:
+            contexts: Any iterable of context dicts, including unbounded generators.
+            workers (int, optional): Number of worker threads or processes.
+            chunksize (int): Number of contexts sent to a worker at a time.
+            mode (str, optional): 'serial', 'thread' or 'process'. Defaults to
+                'serial' without ``workers`` and 'process' with them.
+
+        In process mode the template is sent once to each worker, and contexts
+        must be picklable (no lambdas). At most ``2 * workers`` chunks are in
+        flight, so memory stays bounded however long ``contexts`` is.
+        """
+        from .batch_render import render_many
+        return render_many(self._compiled, contexts, workers=workers, chunksize=chunksize, mode=mode)
+
+    def render_columns(self, data, mapping: Dict[str, str] = None, constants: Dict[str, object] = None, output: str = 'prompt'):
+        """
+        Render one prompt per row of columnar data.
+
+        Args:
+            data: A pyarrow Table/RecordBatch, a pandas DataFrame, or a dict of
+                column arrays (lists or NumPy arrays).
+            mapping (dict, optional): Placeholder name -> column name, when they differ.
+            constants (dict, optional): Placeholder name -> value shared by every row.
+            output (str): Name of the returned pandas Series.
+
+        Returns:
+            A pyarrow StringArray, a pandas Series or a list of strings, matching the input type.
+        """
+        from .columnar import render_table
+        return render_table(self._compiled, data, mapping=mapping, constants=constants, output=output)
+
+    def iter_render_batches(self, source, batch_size: int = 65536, mapping: Dict[str, str] = None, constants: Dict[str, object] = None):
+        """
+        Render a memory-mapped Parquet/Arrow file (or iterable of RecordBatches) in row batches.
+
+        Yields one pyarrow StringArray of rendered prompts per batch.
+        """
+        from .columnar import iter_render_batches
+        return iter_render_batches(self._compiled, source, batch_size=batch_size, mapping=mapping, constants=constants)
 
 # Usage example:
 # processor = PromptTemplateProcessor('my_template.txt')
@@ -0,0 +1,236 @@
+import asyncio
+import functools
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+
+class BatchResult(NamedTuple):
+    """
+    Outcome of one prompt in a batch.
+
+    Attributes:
+        index (int): Position of the prompt in the input.
+        result: The value returned by ``generate`` (None if it failed).
+        error (Exception, optional): The exception raised for this prompt, if any.
+    """
+    index: int
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _result_objects(prompts: Sequence[str], result_object) -> List[Optional[type]]:
+    # A single type applies to every prompt; a list/tuple gives one per prompt
+    if isinstance(result_object, (list, tuple)):
+        if len(result_object) != len(prompts):
+            raise ValueError(f"Got {len(result_object)} result objects for {len(prompts)} prompts.")
+        return list(result_object)
+    return [result_object] * len(prompts)
+
+
+def _call(service, index: int, prompt: str, result_object, kwargs) -> BatchResult:
+    try:
+        return BatchResult(index, service.generate(prompt, result_object=result_object, **kwargs))
+    except Exception as e:
+        return BatchResult(index, error=e)
+
+
+async def _acall(service, index: int, prompt: str, result_object, kwargs) -> BatchResult:
+    try:
+        return BatchResult(index, await service.agenerate(prompt, result_object=result_object, **kwargs))
+    except Exception as e:
+        return BatchResult(index, error=e)
+
+
+def generate_as_completed(service, prompts: Iterable[str], concurrency: int = 8, result_object=None, **kwargs) -> Iterator[BatchResult]:
+    """
+    Run ``service.generate`` over ``prompts`` with at most ``concurrency`` calls in flight.
+
+    Yields a ``BatchResult`` per prompt as soon as it finishes, so the order
+    follows completion, not input. Failures are reported in ``error`` and
+    do not stop the batch.
+    """
+    prompts = list(prompts)
+    result_objects = _result_objects(prompts, result_object)
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    items = iter(enumerate(prompts))
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = set()
+        for index, prompt in items:
+            pending.add(executor.submit(_call, service, index, prompt, result_objects[index], kwargs))
+            if len(pending) >= concurrency:
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                for index, prompt in items:
+                    pending.add(executor.submit(_call, service, index, prompt, result_objects[index], kwargs))
+                    break
+
+
+def generate_batch(service, prompts: Iterable[str], concurrency: int = 8, result_object=None, **kwargs) -> List[BatchResult]:
+    """
+    Run ``service.generate`` over ``prompts`` concurrently and return results in input order.
+
+    See ``BaseLLMService.generate_batch``.
+    """
+    prompts = list(prompts)
+    results: List[Optional[BatchResult]] = [None] * len(prompts)
+    for item in generate_as_completed(service, prompts, concurrency, result_object, **kwargs):
+        results[item.index] = item
+    return results
+
+
+async def agenerate_as_completed(service, prompts: Iterable[str], concurrency: int = 8, result_object=None, **kwargs) -> AsyncIterator[BatchResult]:
+    """Async version of ``generate_as_completed``, running ``service.agenerate`` as tasks."""
+    prompts = list(prompts)
+    result_objects = _result_objects(prompts, result_object)
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    items = iter(enumerate(prompts))
+    pending = set()
+    try:
+        for index, prompt in items:
+            pending.add(asyncio.ensure_future(_acall(service, index, prompt, result_objects[index], kwargs)))
+            if len(pending) >= concurrency:
+                break
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+                for index, prompt in items:
+                    pending.add(asyncio.ensure_future(_acall(service, index, prompt, result_objects[index], kwargs)))
+                    break
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def agenerate_batch(service, prompts: Iterable[str], concurrency: int = 8, result_object=None, **kwargs) -> List[BatchResult]:
+    """Async version of ``generate_batch``."""
+    prompts = list(prompts)
+    results: List[Optional[BatchResult]] = [None] * len(prompts)
+    async for item in agenerate_as_completed(service, prompts, concurrency, result_object, **kwargs):
+        results[item.index] = item
+    return results
+
+
+class BaseLLMService:
+    """
+    Common interface of all providers.
+
+    Subclasses implement ``generate`` (and ideally a native ``agenerate``);
+    batch helpers are built on top of those two methods.
+    """
+    def generate(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        raise NotImplementedError
+
+    async def agenerate(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        # Fallback for providers without a native async client
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self.generate, prompt, result_object=result_object, **kwargs))
+
+    def generate_stream(self, prompt: str, *, result_object: type = None, **kwargs):
+        """Stream the response as text deltas; see the providers that support it."""
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming.")
+
+    def agenerate_stream(self, prompt: str, *, result_object: type = None, **kwargs):
+        """Async version of ``generate_stream``."""
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming.")
+
+    def generate_batch(
+        self,
+        prompts: Iterable[str],
+        concurrency: int = 8,
+        result_object: Union[type, Sequence[type]] = None,
+        **kwargs
+    ) -> List[BatchResult]:
+        """
+        Generate responses for many independent prompts concurrently.
+
+        Args:
+            prompts: The prompts to send.
+            concurrency (int): Maximum number of requests in flight.
+            result_object (type or list, optional): One result type for every
+                prompt, or a list with one entry (type or None) per prompt.
+            **kwargs: Additional parameters passed to every ``generate`` call.
+
+        Returns:
+            list of BatchResult: One per prompt, in input order. A failed prompt
+            has ``ok == False`` and its exception in ``error``; the rest of the
+            batch is unaffected.
+        """
+        return generate_batch(self, prompts, concurrency, result_object, **kwargs)
+
+    def generate_as_completed(
+        self,
+        prompts: Iterable[str],
+        concurrency: int = 8,
+        result_object: Union[type, Sequence[type]] = None,
+        **kwargs
+    ) -> Iterator[BatchResult]:
+        """
+        Like ``generate_batch``, but yield each BatchResult as soon as it completes.
+
+        Use ``BatchResult.index`` to match results to prompts.
+        """
+        return generate_as_completed(self, prompts, concurrency, result_object, **kwargs)
+
+    async def agenerate_batch(
+        self,
+        prompts: Iterable[str],
+        concurrency: int = 8,
+        result_object: Union[type, Sequence[type]] = None,
+        **kwargs
+    ) -> List[BatchResult]:
+        """Async version of ``generate_batch``, using ``agenerate``."""
+        return await agenerate_batch(self, prompts, concurrency, result_object, **kwargs)
+
+    def agenerate_as_completed(
+        self,
+        prompts: Iterable[str],
+        concurrency: int = 8,
+        result_object: Union[type, Sequence[type]] = None,
+        **kwargs
+    ) -> AsyncIterator[BatchResult]:
+        """Async version of ``generate_as_completed``."""
+        return agenerate_as_completed(self, prompts, concurrency, result_object, **kwargs)
+
+
+class ServiceWrapper(BaseLLMService):
+    """
+    Base of services that wrap another service (caches, limiters, retries, ...).
+
+    Every call is passed to ``service`` unless a subclass overrides it, and
+    attributes the wrapper lacks (``model``, ``temperature``, ...) are read
+    from ``service``, so wrappers can be stacked in any order.
+
+    Args:
+        service: The provider (or another wrapper) to call.
+    """
+    def __init__(self, service):
+        self.service = service
+
+    def __getattr__(self, name):
+        # Only reached for missing attributes; ``service`` itself may be missing
+        # before __init__ has run (e.g. while copying or unpickling)
+        if name == "service" or name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.service, name)
+
+    def generate(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        return self.service.generate(prompt, result_object=result_object, **kwargs)
+
+    async def agenerate(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        return await self.service.agenerate(prompt, result_object=result_object, **kwargs)
+
+    def generate_stream(self, prompt: str, *, result_object: type = None, **kwargs):
+        return self.service.generate_stream(prompt, result_object=result_object, **kwargs)
+
+    def agenerate_stream(self, prompt: str, *, result_object: type = None, **kwargs):
+        return self.service.agenerate_stream(prompt, result_object=result_object, **kwargs)
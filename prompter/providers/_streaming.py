@@ -0,0 +1,236 @@
+"""
+Helpers for streamed completions.
+
+Provider responses arrive either as server-sent events (``data: {...}``
+lines, ended by ``data: [DONE]``) or as newline-delimited JSON; both are
+turned into plain text deltas, wrapped in a ``TextStream`` that keeps the
+aggregated text for ``result_object`` mapping.
+"""
+import json
+import time
+from typing import Any, AsyncIterator, Iterable, Iterator, Optional
+
+from ._response_mapper import map_llm_response
+
+_SSE_FIELDS = ("event:", "id:", "retry:")
+
+
+def parse_line(line) -> Optional[Any]:
+    """
+    Decode one SSE or NDJSON line.
+
+    Returns the decoded JSON event (or the raw payload if it is not JSON),
+    None for lines that carry no data, and ``StopIteration`` for ``[DONE]``.
+    """
+    if isinstance(line, bytes):
+        line = line.decode("utf-8")
+    line = line.strip()
+    if not line or line.startswith(":") or line.startswith(_SSE_FIELDS):
+        return None
+    if line.startswith("data:"):
+        line = line[5:].strip()
+    if line == "[DONE]":
+        return StopIteration
+    try:
+        return json.loads(line)
+    except ValueError:
+        return line
+
+
+def extract_delta(event) -> str:
+    """
+    Return the text carried by one streamed event ('' if there is none).
+
+    Understands OpenAI-style chat and completion chunks (as dicts or SDK
+    objects), Anthropic ``content_block_delta`` events, and the flat
+    ``text``/``response``/``output``/``token`` chunks of local servers.
+    """
+    if isinstance(event, str):
+        return event
+    if not isinstance(event, dict):
+        # SDK objects: Anthropic events expose .delta.text, OpenAI chunks .choices
+        delta = getattr(event, "delta", None)
+        text = getattr(delta, "text", None)
+        if isinstance(text, str):
+            return text
+        choices = getattr(event, "choices", None)
+        if choices:
+            delta = getattr(choices[0], "delta", None)
+            return getattr(delta, "content", None) or ""
+        return ""
+    choices = event.get("choices")
+    if choices:
+        choice = choices[0]
+        delta = choice.get("delta")
+        if delta is not None:
+            return delta.get("content") or ""
+        return choice.get("text") or ""
+    delta = event.get("delta")
+    if isinstance(delta, dict):
+        return delta.get("text") or ""
+    for key in ("text", "response", "output"):
+        if isinstance(event.get(key), str):
+            return event[key]
+    token = event.get("token")
+    if isinstance(token, dict):
+        return token.get("text") or ""
+    return ""
+
+
+def iter_deltas(lines: Iterable) -> Iterator[str]:
+    """Yield the non-empty text deltas from SSE/NDJSON ``lines``."""
+    for line in lines:
+        event = parse_line(line)
+        if event is StopIteration:
+            return
+        if event is not None:
+            text = extract_delta(event)
+            if text:
+                yield text
+
+
+async def aiter_deltas(lines: AsyncIterator) -> AsyncIterator[str]:
+    """Async version of ``iter_deltas``."""
+    async for line in lines:
+        event = parse_line(line)
+        if event is StopIteration:
+            return
+        if event is not None:
+            text = extract_delta(event)
+            if text:
+                yield text
+
+
+def iter_event_deltas(events: Iterable) -> Iterator[str]:
+    """Yield the non-empty text deltas from already decoded SDK stream events."""
+    for event in events:
+        text = extract_delta(event)
+        if text:
+            yield text
+
+
+async def aiter_event_deltas(events: AsyncIterator) -> AsyncIterator[str]:
+    """Async version of ``iter_event_deltas``."""
+    async for event in events:
+        text = extract_delta(event)
+        if text:
+            yield text
+
+
+class _StreamState:
+    def __init__(self, result_object):
+        self.result_object = result_object
+        self.started = None
+        self.first_token_at = None
+        self.finished = False
+        self._chunks = []
+
+    def _begin(self):
+        # The request goes out on the first iteration, so the clock starts there
+        if self.started is None:
+            self.started = time.perf_counter()
+
+    def add(self, delta: str):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self._chunks.append(delta)
+
+    @property
+    def text(self) -> str:
+        """The text received so far (all of it once the stream is exhausted)."""
+        return "".join(self._chunks)
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        """Seconds from the request to the first delta, or None before it arrives."""
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started
+
+
+class TextStream(_StreamState):
+    """
+    Iterator over the text deltas of a streamed completion.
+
+    The request is sent when iteration starts. Every delta is also kept, so
+    after the stream ends ``text`` holds the full completion and ``result()``
+    maps it like ``generate`` would.
+
+    Example:
+        stream = service.generate_stream(prompt)
+        for delta in stream:
+            print(delta, end="", flush=True)
+        print(stream.time_to_first_token)
+    """
+    def __init__(self, deltas: Iterator[str], result_object: type = None):
+        super().__init__(result_object)
+        self._deltas = deltas
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        self._begin()
+        try:
+            delta = next(self._deltas)
+        except StopIteration:
+            self.finished = True
+            raise
+        self.add(delta)
+        return delta
+
+    def close(self):
+        """Stop the stream early and release its connection."""
+        close = getattr(self._deltas, "close", None)
+        if close is not None:
+            close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def result(self):
+        """Consume the rest of the stream and return the mapped result (str or ``result_object``)."""
+        for _ in self:
+            pass
+        return map_llm_response({"text": self.text}, self.result_object)
+
+
+class AsyncTextStream(_StreamState):
+    """Async version of ``TextStream``, iterated with ``async for``."""
+    def __init__(self, deltas: AsyncIterator[str], result_object: type = None):
+        super().__init__(result_object)
+        self._deltas = deltas
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        self._begin()
+        try:
+            delta = await self._deltas.__anext__()
+        except StopAsyncIteration:
+            self.finished = True
+            raise
+        self.add(delta)
+        return delta
+
+    async def aclose(self):
+        """Stop the stream early and release its connection."""
+        close = getattr(self._deltas, "aclose", None)
+        if close is not None:
+            await close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def result(self):
+        """Consume the rest of the stream and return the mapped result (str or ``result_object``)."""
+        async for _ in self:
+            pass
+        return map_llm_response({"text": self.text}, self.result_object)
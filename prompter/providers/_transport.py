@@ -0,0 +1,304 @@
+"""
+Shared, long-lived HTTP sessions and SDK clients for all providers.
+
+Each provider gets one ``requests.Session`` with its own keep-alive
+connection pool, and SDK clients are built once per provider and key, so
+generations reuse TCP/TLS connections instead of setting them up per call.
+
+Sessions and clients are created lazily under a lock and are dropped in a
+forked child (via ``os.register_at_fork``, with a pid check as a fallback),
+so gunicorn-style pre-fork workers never share sockets with their parent.
+"""
+import os
+import asyncio
+import weakref
+import threading
+from typing import Any, Callable, Dict, Hashable, List
+
+from ._import_utils import require_package
+
+DEFAULT_SETTINGS = {
+    "pool_connections": 10,
+    "pool_maxsize": 10,
+    "timeout": 60.0,
+}
+
+_lock = threading.RLock()
+_pid = os.getpid()
+_sessions: Dict[str, Any] = {}
+_clients: Dict[tuple, Any] = {}
+_settings: Dict[str, Dict[str, Any]] = {}
+_response_hooks: Dict[str, List[Callable[[Any], None]]] = {}
+# Async clients are bound to the event loop that created them
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, Any]]" = weakref.WeakKeyDictionary()
+
+
+def configure(provider: str = None, *, pool_connections: int = None, pool_maxsize: int = None, timeout: float = None):
+    """
+    Set connection pool sizes and the request timeout for one provider, or the default for all.
+
+    Args:
+        provider (str, optional): Provider name (e.g. 'local'); None changes the defaults.
+        pool_connections (int, optional): Number of host pools kept per session.
+        pool_maxsize (int, optional): Maximum keep-alive connections per host.
+        timeout (float, optional): Connect/read timeout in seconds.
+
+    Existing sessions affected by the change are replaced on next use.
+    """
+    changes = {k: v for k, v in (("pool_connections", pool_connections), ("pool_maxsize", pool_maxsize), ("timeout", timeout)) if v is not None}
+    with _lock:
+        if provider is None:
+            DEFAULT_SETTINGS.update(changes)
+            _sessions.clear()
+            _async_clients.clear()
+        else:
+            _settings.setdefault(provider, {}).update(changes)
+            _sessions.pop(provider, None)
+            for clients in list(_async_clients.values()):
+                clients.pop(("http", provider), None)
+
+
+def get_settings(provider: str) -> Dict[str, Any]:
+    """Return the effective transport settings for ``provider``."""
+    return dict(DEFAULT_SETTINGS, **_settings.get(provider, {}))
+
+
+def reset():
+    """Forget every session and client (they are rebuilt on next use)."""
+    global _pid
+    with _lock:
+        _sessions.clear()
+        _clients.clear()
+        _async_clients.clear()
+        _pid = os.getpid()
+
+
+def _check_pid():
+    # Fallback for forks that bypass os.register_at_fork hooks
+    if os.getpid() != _pid:
+        reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset)
+
+
+def add_response_hook(provider: str, hook: Callable[[Any], None]):
+    """
+    Call ``hook(response)`` for every HTTP response of ``provider``, before its status is checked.
+
+    Used by the rate limiter to read rate-limit headers (including from 429s).
+    """
+    with _lock:
+        _response_hooks.setdefault(provider, []).append(hook)
+
+
+def remove_response_hook(provider: str, hook: Callable[[Any], None]):
+    with _lock:
+        hooks = _response_hooks.get(provider, [])
+        if hook in hooks:
+            hooks.remove(hook)
+
+
+def _run_hooks(provider: str, response):
+    for hook in _response_hooks.get(provider, ()):
+        hook(response)
+
+
+def _session_hook(route: Callable[[Any], str]):
+    # requests calls response hooks with extra keyword arguments; returning None keeps the response
+    def hook(response, *args, **kwargs):
+        _run_hooks(route(response), response)
+    return hook
+
+
+def _client_hooks(provider: str, asynchronous: bool = False) -> Dict[str, list]:
+    if asynchronous:
+        async def hook(response):
+            _run_hooks(provider, response)
+    else:
+        def hook(response):
+            _run_hooks(provider, response)
+    return {"response": [hook]}
+
+
+def get_session(provider: str, route: Callable[[Any], str] = None):
+    """
+    Return the shared ``requests.Session`` for ``provider``, creating it on first use.
+
+    Every response of the session, including those of SDKs that are handed
+    the session, is passed to the hooks added with ``add_response_hook``.
+
+    Args:
+        provider (str): Provider name.
+        route (callable, optional): Maps a response to the provider whose hooks
+            it feeds, for sessions shared by several providers; defaults to
+            ``provider``. Only used when the session is created.
+
+    Raises:
+        ImportError: If ``requests`` is not installed.
+    """
+    requests = require_package('requests', extra='requests')
+    _check_pid()
+    session = _sessions.get(provider)
+    if session is not None:
+        return session
+    with _lock:
+        session = _sessions.get(provider)
+        if session is None:
+            settings = get_settings(provider)
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=settings["pool_connections"],
+                pool_maxsize=settings["pool_maxsize"],
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.hooks["response"].append(_session_hook(route or (lambda response: provider)))
+            _sessions[provider] = session
+    return session
+
+
+def get_client(provider: str, key: Hashable, factory: Callable[[], Any]):
+    """
+    Return a long-lived SDK client for ``provider``, building it with ``factory`` on first use.
+
+    ``key`` distinguishes clients of the same provider (typically the API key
+    and endpoint), so services with different credentials never share one.
+    """
+    _check_pid()
+    cache_key = (provider, key)
+    client = _clients.get(cache_key)
+    if client is not None:
+        return client
+    with _lock:
+        client = _clients.get(cache_key)
+        if client is None:
+            client = factory()
+            _clients[cache_key] = client
+    return client
+
+
+def new_http_client(provider: str):
+    """
+    Build an ``httpx.Client`` with the provider's pool settings whose responses
+    feed the hooks added with ``add_response_hook``, for SDKs that accept one.
+
+    Raises:
+        ImportError: If ``httpx`` is not installed.
+    """
+    httpx = require_package('httpx', extra='httpx')
+    settings = get_settings(provider)
+    limits = httpx.Limits(max_connections=settings["pool_maxsize"], max_keepalive_connections=settings["pool_maxsize"])
+    return httpx.Client(limits=limits, timeout=settings["timeout"], event_hooks=_client_hooks(provider))
+
+
+def new_async_http_client(provider: str):
+    """Async version of ``new_http_client``, building an ``httpx.AsyncClient``."""
+    httpx = require_package('httpx', extra='httpx')
+    settings = get_settings(provider)
+    limits = httpx.Limits(max_connections=settings["pool_maxsize"], max_keepalive_connections=settings["pool_maxsize"])
+    return httpx.AsyncClient(limits=limits, timeout=settings["timeout"], event_hooks=_client_hooks(provider, asynchronous=True))
+
+
+def post_json(provider: str, url: str, *, headers: Dict[str, str] = None, json: Any = None, timeout: float = None):
+    """
+    POST ``json`` to ``url`` through the provider's pooled session and return the decoded JSON body.
+
+    Raises:
+        requests.HTTPError: If the response status is an error.
+    """
+    session = get_session(provider)
+    response = session.post(url, headers=headers, json=json, timeout=timeout or get_settings(provider)["timeout"])
+    response.raise_for_status()
+    return response.json()
+
+
+def stream_lines(provider: str, url: str, *, headers: Dict[str, str] = None, json: Any = None, timeout: float = None):
+    """
+    POST ``json`` to ``url`` and yield the response body line by line as it arrives.
+
+    The connection goes back to the provider's pool when the generator is
+    exhausted or closed.
+
+    Raises:
+        requests.HTTPError: If the response status is an error.
+    """
+    session = get_session(provider)
+    with session.post(url, headers=headers, json=json, timeout=timeout or get_settings(provider)["timeout"], stream=True) as response:
+        response.raise_for_status()
+        # Decode per line as UTF-8: without a charset, requests would assume
+        # ISO-8859-1 for text/event-stream and garble non-ASCII tokens
+        for line in response.iter_lines():
+            yield line.decode("utf-8")
+
+
+def _loop_clients() -> Dict[tuple, Any]:
+    _check_pid()
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.get(loop)
+    if clients is None:
+        clients = _async_clients[loop] = {}
+    return clients
+
+
+def get_async_http_client(provider: str):
+    """
+    Return the shared ``httpx.AsyncClient`` for ``provider`` in the running event loop.
+
+    Raises:
+        ImportError: If ``httpx`` is not installed.
+    """
+    clients = _loop_clients()
+    client = clients.get(("http", provider))
+    if client is None:
+        client = clients[("http", provider)] = new_async_http_client(provider)
+    return client
+
+
+def get_async_client(provider: str, key: Hashable, factory: Callable[[], Any]):
+    """Like ``get_client``, for async SDK clients: one client per provider, key and event loop."""
+    clients = _loop_clients()
+    cache_key = ("sdk", provider, key)
+    client = clients.get(cache_key)
+    if client is None:
+        client = clients[cache_key] = factory()
+    return client
+
+
+async def apost_json(provider: str, url: str, *, headers: Dict[str, str] = None, json: Any = None, timeout: float = None):
+    """
+    Async version of ``post_json``, using the provider's pooled ``httpx.AsyncClient``.
+
+    Raises:
+        httpx.HTTPStatusError: If the response status is an error.
+    """
+    client = get_async_http_client(provider)
+    response = await client.post(url, headers=headers, json=json, timeout=timeout or get_settings(provider)["timeout"])
+    response.raise_for_status()
+    return response.json()
+
+
+async def aclose():
+    """Close the async clients created in the running event loop (call before the loop ends)."""
+    clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        close = getattr(client, "aclose", None) or getattr(client, "close", None)
+        if close is not None:
+            result = close()
+            if asyncio.iscoroutine(result):
+                await result
+
+
+async def astream_lines(provider: str, url: str, *, headers: Dict[str, str] = None, json: Any = None, timeout: float = None):
+    """
+    Async version of ``stream_lines``, using the provider's pooled ``httpx.AsyncClient``.
+
+    Raises:
+        httpx.HTTPStatusError: If the response status is an error.
+    """
+    client = get_async_http_client(provider)
+    async with client.stream("POST", url, headers=headers, json=json, timeout=timeout or get_settings(provider)["timeout"]) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            yield line
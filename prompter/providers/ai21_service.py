@@ -1,4 +1,7 @@
-class AI21Service:
+from ._base import BaseLLMService
+
+
+class AI21Service(BaseLLMService):
     """
     AI21 Labs Jurassic provider.
 
@@ -16,6 +19,26 @@ class AI21Service:
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+    def _build_request(self, prompt: str, result_object: type, kwargs: dict):
+        # Returns (url, headers, payload) shared by generate and agenerate
+        api_url = f"https://api.ai21.com/studio/v1/{self.model}/complete"
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        payload = {"prompt": prompt, "numResults": 1, "maxTokens": self.max_tokens, "temperature": self.temperature}
+        payload.update(kwargs)
+        # If result_object is provided, instruct the LLM to return JSON
+        if result_object is not None:
+            if hasattr(result_object, '__annotations__'):
+                fields = ', '.join(f'"{k}": <{v.__name__}>' for k, v in result_object.__annotations__.items())
+                schema = f'{{{fields}}}'
+            else:
+                schema = str(result_object)
+            payload["prompt"] = f"{prompt}\nReturn the result as a JSON object matching this schema: {schema}"
+        return api_url, headers, payload
+
+    def _parse_result(self, result):
+        # AI21 returns completions[0]["data"]["text"] as the main output
+        return {"text": result["completions"][0]["data"]["text"]}
+
     def generate(
         self,
         prompt: str,
@@ -34,24 +57,34 @@ class AI21Service:
         Returns:
             str or result_object: The LLM response as a string, or an instance of result_object if provided.
         """
-        from ._import_utils import require_package
         from ._response_mapper import map_llm_response
-        requests = require_package('requests', extra='requests')
-        api_url = f"https://api.ai21.com/studio/v1/{self.model}/complete"
-        headers = {"Authorization": f"Bearer {self.api_key}"}
-        payload = {"prompt": prompt, "numResults": 1, "maxTokens": self.max_tokens, "temperature": self.temperature}
-        payload.update(kwargs)
-        # If result_object is provided, instruct the LLM to return JSON
-        if result_object is not None:
-            if hasattr(result_object, '__annotations__'):
-                fields = ', '.join(f'"{k}": <{v.__name__}>' for k, v in result_object.__annotations__.items())
-                schema = f'{{{fields}}}'
-            else:
-                schema = str(result_object)
-            payload["prompt"] = f"{prompt}\nReturn the result as a JSON object matching this schema: {schema}"
-        response = requests.post(api_url, headers=headers, json=payload)
-        response.raise_for_status()
-        result = response.json()
-        # AI21 returns completions[0]["data"]["text"] as the main output
-        result = {"text": result["completions"][0]["data"]["text"]}
+        from ._transport import post_json
+        url, headers, payload = self._build_request(prompt, result_object, kwargs)
+        result = post_json('ai21', url, headers=headers, json=payload)
+        result = self._parse_result(result)
+        return map_llm_response(result, result_object)
+
+    async def agenerate(
+        self,
+        prompt: str,
+        *,
+        result_object: type = None,
+        **kwargs
+    ) -> str:
+        """
+        Asynchronously generate a response from AI21 Labs Jurassic.
+
+        Args:
+            prompt (str): The prompt to send to the LLM.
+            result_object (type, optional): If provided, instructs the LLM to return a JSON matching this schema and parses the result into the object.
+            **kwargs: Additional parameters for the LLM API.
+
+        Returns:
+            str or result_object: The LLM response as a string, or an instance of result_object if provided.
+        """
+        from ._response_mapper import map_llm_response
+        from ._transport import apost_json
+        url, headers, payload = self._build_request(prompt, result_object, kwargs)
+        result = await apost_json('ai21', url, headers=headers, json=payload)
+        result = self._parse_result(result)
         return map_llm_response(result, result_object)
@@ -1,4 +1,7 @@
-class AnthropicService:
+from ._base import BaseLLMService
+
+
+class AnthropicService(BaseLLMService):
     """
     Anthropic Claude provider (direct API).
 
@@ -16,6 +19,30 @@ class AnthropicService:
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+    def _build_request(self, prompt: str, result_object: type, kwargs: dict) -> dict:
+        # Returns the messages.create parameters shared by generate and agenerate
+        # If result_object is provided, instruct the LLM to return JSON
+        user_content = prompt
+        if result_object is not None:
+            if hasattr(result_object, '__annotations__'):
+                fields = ', '.join(f'"{k}": <{v.__name__}>' for k, v in result_object.__annotations__.items())
+                schema = f'{{{fields}}}'
+            else:
+                schema = str(result_object)
+            user_content = f"{prompt}\nReturn the result as a JSON object matching this schema: {schema}"
+        return dict(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+            messages=[{"role": "user", "content": user_content}],
+            **kwargs
+        )
+
+    def _parse_result(self, response) -> dict:
+        # Anthropic returns content[0].text as the main output
+        content = response.content[0].text if hasattr(response.content[0], 'text') else str(response.content[0])
+        return {"text": content}
+
     def generate(
         self,
         prompt: str,
@@ -36,25 +63,96 @@ class AnthropicService:
         """
         from ._import_utils import require_package
         from ._response_mapper import map_llm_response
+        from ._transport import get_client, new_http_client
         anthropic = require_package('anthropic', extra='anthropic')
-        client = anthropic.Anthropic(api_key=self.api_key)
-        # If result_object is provided, instruct the LLM to return JSON
-        user_content = prompt
-        if result_object is not None:
-            if hasattr(result_object, '__annotations__'):
-                fields = ', '.join(f'"{k}": <{v.__name__}>' for k, v in result_object.__annotations__.items())
-                schema = f'{{{fields}}}'
-            else:
-                schema = str(result_object)
-            user_content = f"{prompt}\nReturn the result as a JSON object matching this schema: {schema}"
-        response = client.messages.create(
-            model=self.model,
-            max_tokens=self.max_tokens,
-            temperature=self.temperature,
-            messages=[{"role": "user", "content": user_content}],
-            **kwargs
-        )
-        # Anthropic returns content[0].text as the main output
-        content = response.content[0].text if hasattr(response.content[0], 'text') else str(response.content[0])
-        result = {"text": content}
-        return map_llm_response(result, result_object)
+        client = get_client('anthropic', self.api_key, lambda: anthropic.Anthropic(api_key=self.api_key, http_client=new_http_client('anthropic')))
+        response = client.messages.create(**self._build_request(prompt, result_object, kwargs))
+        return map_llm_response(self._parse_result(response), result_object)
+
+    async def agenerate(
+        self,
+        prompt: str,
+        *,
+        result_object: type = None,
+        **kwargs
+    ) -> str:
+        """
+        Asynchronously generate a response from Anthropic Claude.
+
+        Args:
+            prompt (str): The prompt to send to the LLM.
+            result_object (type, optional): If provided, instructs the LLM to return a JSON matching this schema and parses the result into the object.
+            **kwargs: Additional parameters for the LLM API.
+
+        Returns:
+            str or result_object: The LLM response as a string, or an instance of result_object if provided.
+        """
+        from ._import_utils import require_package
+        from ._response_mapper import map_llm_response
+        from ._transport import get_async_client, new_async_http_client
+        anthropic = require_package('anthropic', extra='anthropic')
+        client = get_async_client('anthropic', self.api_key, lambda: anthropic.AsyncAnthropic(api_key=self.api_key, http_client=new_async_http_client('anthropic')))
+        response = await client.messages.create(**self._build_request(prompt, result_object, kwargs))
+        return map_llm_response(self._parse_result(response), result_object)
+
+    def generate_stream(
+        self,
+        prompt: str,
+        *,
+        result_object: type = None,
+        **kwargs
+    ):
+        """
+        Stream a response from Anthropic Claude, yielding text deltas as they arrive.
+
+        Args:
+            prompt (str): The prompt to send to the LLM.
+            result_object (type, optional): If provided, instructs the LLM to return a JSON matching this schema; ``result()`` parses the streamed text into the object.
+            **kwargs: Additional parameters for the LLM API.
+
+        Returns:
+            TextStream: Iterator of text deltas. ``text`` holds everything received so far and ``result()`` returns the complete response.
+        """
+        from ._import_utils import require_package
+        from ._streaming import TextStream, iter_event_deltas
+        from ._transport import get_client, new_http_client
+        anthropic = require_package('anthropic', extra='anthropic')
+        client = get_client('anthropic', self.api_key, lambda: anthropic.Anthropic(api_key=self.api_key, http_client=new_http_client('anthropic')))
+        params = self._build_request(prompt, result_object, kwargs)
+
+        def deltas():
+            # Text arrives in content_block_delta events; the response is closed when the stream ends
+            with client.messages.create(stream=True, **params) as events:
+                yield from iter_event_deltas(events)
+        return TextStream(deltas(), result_object)
+
+    def agenerate_stream(
+        self,
+        prompt: str,
+        *,
+        result_object: type = None,
+        **kwargs
+    ):
+        """
+        Asynchronously stream a response from Anthropic Claude, yielding text deltas as they arrive.
+
+        Args:
+            prompt (str): The prompt to send to the LLM.
+            result_object (type, optional): If provided, instructs the LLM to return a JSON matching this schema; ``result()`` parses the streamed text into the object.
+            **kwargs: Additional parameters for the LLM API.
+
+        Returns:
+            AsyncTextStream: Iterator of text deltas. ``text`` holds everything received so far and ``result()`` returns the complete response.
+        """
+        from ._import_utils import require_package
+        from ._streaming import AsyncTextStream, aiter_event_deltas
+        from ._transport import get_async_client, new_async_http_client
+        anthropic = require_package('anthropic', extra='anthropic')
+        client = get_async_client('anthropic', self.api_key, lambda: anthropic.AsyncAnthropic(api_key=self.api_key, http_client=new_async_http_client('anthropic')))
+        params = self._build_request(prompt, result_object, kwargs)
+
+        async def deltas():
+            async with await client.messages.create(stream=True, **params) as events:
+                async for delta in aiter_event_deltas(events):
+                    yield delta
+        return AsyncTextStream(deltas(), result_object)
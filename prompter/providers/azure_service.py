@@ -1,4 +1,7 @@
-class AzureOpenAIService:
+from ._base import BaseLLMService
+
+
+class AzureOpenAIService(BaseLLMService):
     """
     Azure OpenAI provider.
 
@@ -22,6 +25,30 @@ class AzureOpenAIService:
         self.api_version = api_version
         self.temperature = temperature
         self.max_tokens = max_tokens
+    def _build_request(self, prompt: str, result_object: type, kwargs: dict) -> dict:
+        # ChatCompletion parameters, including this service's credentials and endpoint
+        params = {
+            "engine": self.deployment,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "api_key": self.api_key,
+            "api_type": "azure",
+            "api_base": self.endpoint,
+        }
+        if self.api_version:
+            params["api_version"] = self.api_version
+        params.update(kwargs)
+        # If result_object is provided, instruct the LLM to return JSON
+        if result_object is not None:
+            if hasattr(result_object, '__annotations__'):
+                fields = ', '.join(f'"{k}": <{v.__name__}>' for k, v in result_object.__annotations__.items())
+                schema = f'{{{fields}}}'
+            else:
+                schema = str(result_object)
+            params["messages"][0]["content"] = f"{prompt}\nReturn the result as a JSON object matching this schema: {schema}"
+        return params
+
     def generate(
         self,
         prompt: str,
@@ -40,30 +67,91 @@ class AzureOpenAIService:
         Returns:
             str or result_object: The LLM response as a string, or an instance of result_object if provided.
         """
-        from ._import_utils import require_package
         from ._response_mapper import map_llm_response
-        openai = require_package('openai', extra='openai')
-        openai.api_type = "azure"
-        openai.api_key = self.api_key
-        openai.api_base = self.endpoint
-        if self.api_version:
-            openai.api_version = self.api_version
-        params = {
-            "engine": self.deployment,
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": self.temperature,
-            "max_tokens": self.max_tokens,
-        }
-        params.update(kwargs)
-        # If result_object is provided, instruct the LLM to return JSON
-        if result_object is not None:
-            if hasattr(result_object, '__annotations__'):
-                fields = ', '.join(f'"{k}": <{v.__name__}>' for k, v in result_object.__annotations__.items())
-                schema = f'{{{fields}}}'
-            else:
-                schema = str(result_object)
-            params["messages"][0]["content"] = f"{prompt}\nReturn the result as a JSON object matching this schema: {schema}"
-        response = openai.ChatCompletion.create(**params)
+        from .openai_service import load_openai
+        openai = load_openai()
+        response = openai.ChatCompletion.create(**self._build_request(prompt, result_object, kwargs))
         # Azure OpenAI returns choices[0]["message"]["content"] as the main output
         result = {"text": response["choices"][0]["message"]["content"]}
         return map_llm_response(result, result_object)
+
+    async def agenerate(
+        self,
+        prompt: str,
+        *,
+        result_object: type = None,
+        **kwargs
+    ) -> str:
+        """
+        Asynchronously generate a response from Azure OpenAI.
+
+        Args:
+            prompt (str): The prompt to send to the LLM.
+            result_object (type, optional): If provided, instructs the LLM to return a JSON matching this schema and parses the result into the object.
+            **kwargs: Additional parameters for the LLM API.
+
+        Returns:
+            str or result_object: The LLM response as a string, or an instance of result_object if provided.
+        """
+        from ._response_mapper import map_llm_response
+        from .openai_service import load_openai
+        openai = load_openai()
+        response = await openai.ChatCompletion.acreate(**self._build_request(prompt, result_object, kwargs))
+        result = {"text": response["choices"][0]["message"]["content"]}
+        return map_llm_response(result, result_object)
+
+    def generate_stream(
+        self,
+        prompt: str,
+        *,
+        result_object: type = None,
+        **kwargs
+    ):
+        """
+        Stream a response from Azure OpenAI, yielding text deltas as they arrive.
+
+        Args:
+            prompt (str): The prompt to send to the LLM.
+            result_object (type, optional): If provided, instructs the LLM to return a JSON matching this schema; ``result()`` parses the streamed text into the object.
+            **kwargs: Additional parameters for the LLM API.
+
+        Returns:
+            TextStream: Iterator of text deltas. ``text`` holds everything received so far and ``result()`` returns the complete response.
+        """
+        from ._streaming import TextStream, iter_event_deltas
+        from .openai_service import load_openai
+        openai = load_openai()
+        params = self._build_request(prompt, result_object, kwargs)
+
+        def deltas():
+            # Chunks carry the new text in choices[0]["delta"]["content"]
+            yield from iter_event_deltas(openai.ChatCompletion.create(stream=True, **params))
+        return TextStream(deltas(), result_object)
+
+    def agenerate_stream(
+        self,
+        prompt: str,
+        *,
+        result_object: type = None,
+        **kwargs
+    ):
+        """
+        Asynchronously stream a response from Azure OpenAI, yielding text deltas as they arrive.
+
+        Args:
+            prompt (str): The prompt to send to the LLM.
+            result_object (type, optional): If provided, instructs the LLM to return a JSON matching this schema; ``result()`` parses the streamed text into the object.
+            **kwargs: Additional parameters for the LLM API.
+
+        Returns:
+            AsyncTextStream: Iterator of text deltas. ``text`` holds everything received so far and ``result()`` returns the complete response.
+        """
+        from ._streaming import AsyncTextStream, aiter_event_deltas
+        from .openai_service import load_openai
+        openai = load_openai()
+        params = self._build_request(prompt, result_object, kwargs)
+
+        async def deltas():
+            async for delta in aiter_event_deltas(await openai.ChatCompletion.acreate(stream=True, **params)):
+                yield delta
+        return AsyncTextStream(deltas(), result_object)
@@ -1,4 +1,7 @@
-class BedrockService:
+from ._base import BaseLLMService
+
+
+class BedrockService(BaseLLMService):
     """
     Amazon Bedrock provider (Anthropic, AI21, Cohere, etc.).
 
@@ -46,3 +49,25 @@ class BedrockService:
         boto3 = require_package('boto3', extra='boto3')
         # This is a placeholder; actual Bedrock usage may require more setup
         raise NotImplementedError("Amazon Bedrock integration requires project-specific setup. See documentation.")
+
+    async def agenerate(
+        self,
+        prompt: str,
+        *,
+        result_object: type = None,
+        **kwargs
+    ) -> str:
+        """
+        Asynchronously generate a response from Amazon Bedrock.
+
+        Args:
+            prompt (str): The prompt to send to the LLM.
+            result_object (type, optional): If provided, instructs the LLM to return a JSON matching this schema and parses the result into the object.
+            **kwargs: Additional parameters for the LLM API.
+
+        Returns:
+            str or result_object: The LLM response as a string, or an instance of result_object if provided.
+        """
+        from ._import_utils import require_package
+        require_package('boto3', extra='boto3')
+        raise NotImplementedError("Amazon Bedrock integration requires project-specific setup. See documentation.")
@@ -1,4 +1,7 @@
-class CohereService:
+from ._base import BaseLLMService
+
+
+class CohereService(BaseLLMService):
     """
     Cohere provider.
 
@@ -36,8 +39,9 @@ class CohereService:
         """
         from ._import_utils import require_package
         from ._response_mapper import map_llm_response
+        from ._transport import get_client, new_http_client
         cohere = require_package('cohere', extra='cohere')
-        client = cohere.Client(self.api_key)
+        client = get_client('cohere', self.api_key, lambda: cohere.Client(self.api_key, httpx_client=new_http_client('cohere')))
         response = client.generate(
             model=self.model,
             prompt=prompt,
@@ -48,3 +52,36 @@ class CohereService:
         # Cohere returns generations[0].text as the main output
         result = {"text": response.generations[0].text}
         return map_llm_response(result, result_object)
+
+    async def agenerate(
+        self,
+        prompt: str,
+        *,
+        result_object: type = None,
+        **kwargs
+    ) -> str:
+        """
+        Asynchronously generate a response from Cohere.
+
+        Args:
+            prompt (str): The prompt to send to the LLM.
+            result_object (type, optional): If provided, instructs the LLM to return a JSON matching this schema and parses the result into the object.
+            **kwargs: Additional parameters for the LLM API.
+
+        Returns:
+            str or result_object: The LLM response as a string, or an instance of result_object if provided.
+        """
+        from ._import_utils import require_package
+        from ._response_mapper import map_llm_response
+        from ._transport import get_async_client, new_async_http_client
+        cohere = require_package('cohere', extra='cohere')
+        client = get_async_client('cohere', self.api_key, lambda: cohere.AsyncClient(self.api_key, httpx_client=new_async_http_client('cohere')))
+        response = await client.generate(
+            model=self.model,
+            prompt=prompt,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            **kwargs
+        )
+        result = {"text": response.generations[0].text}
+        return map_llm_response(result, result_object)
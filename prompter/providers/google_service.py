@@ -1,4 +1,7 @@
-class GoogleVertexAIService:
+from ._base import BaseLLMService
+
+
+class GoogleVertexAIService(BaseLLMService):
     """
     Google Vertex AI (Gemini, PaLM) provider.
 
@@ -47,3 +50,25 @@ class GoogleVertexAIService:
         # This is a placeholder; actual Vertex AI usage may require more setup
         # and authentication via environment variables or service account
         raise NotImplementedError("Google Vertex AI integration requires project-specific setup. See documentation.")
+
+    async def agenerate(
+        self,
+        prompt: str,
+        *,
+        result_object: type = None,
+        **kwargs
+    ) -> str:
+        """
+        Asynchronously generate a response from Google Vertex AI (Gemini, PaLM).
+
+        Args:
+            prompt (str): The prompt to send to the LLM.
+            result_object (type, optional): If provided, instructs the LLM to return a JSON matching this schema and parses the result into the object.
+            **kwargs: Additional parameters for the LLM API.
+
+        Returns:
+            str or result_object: The LLM response as a string, or an instance of result_object if provided.
+        """
+        from ._import_utils import require_package
+        require_package('google.cloud.aiplatform', import_name='google.cloud.aiplatform', extra='google-cloud-aiplatform')
+        raise NotImplementedError("Google Vertex AI integration requires project-specific setup. See documentation.")
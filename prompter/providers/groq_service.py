@@ -1,4 +1,7 @@
-class GroqService:
+from ._base import BaseLLMService
+
+
+class GroqService(BaseLLMService):
     """
     Groq provider (fast Llama, etc.).
 
@@ -16,6 +19,22 @@ class GroqService:
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+    def _build_request(self, prompt: str, result_object: type, kwargs: dict):
+        # Returns (url, headers, payload) shared by generate and agenerate
+        api_url = f"https://api.groq.com/v1/generate"
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        payload = {"prompt": prompt, "model": self.model, "temperature": self.temperature, "max_tokens": self.max_tokens}
+        payload.update(kwargs)
+        # If result_object is provided, instruct the LLM to return JSON
+        if result_object is not None:
+            if hasattr(result_object, '__annotations__'):
+                fields = ', '.join(f'"{k}": <{v.__name__}>' for k, v in result_object.__annotations__.items())
+                schema = f'{{{fields}}}'
+            else:
+                schema = str(result_object)
+            payload["prompt"] = f"{prompt}\nReturn the result as a JSON object matching this schema: {schema}"
+        return api_url, headers, payload
+
     def generate(
         self,
         prompt: str,
@@ -34,22 +53,80 @@ class GroqService:
         Returns:
             str or result_object: The LLM response as a string, or an instance of result_object if provided.
         """
-        from ._import_utils import require_package
         from ._response_mapper import map_llm_response
-        requests = require_package('requests', extra='requests')
-        api_url = f"https://api.groq.com/v1/generate"
-        headers = {"Authorization": f"Bearer {self.api_key}"}
-        payload = {"prompt": prompt, "model": self.model, "temperature": self.temperature, "max_tokens": self.max_tokens}
-        payload.update(kwargs)
-        # If result_object is provided, instruct the LLM to return JSON
-        if result_object is not None:
-            if hasattr(result_object, '__annotations__'):
-                fields = ', '.join(f'"{k}": <{v.__name__}>' for k, v in result_object.__annotations__.items())
-                schema = f'{{{fields}}}'
-            else:
-                schema = str(result_object)
-            payload["prompt"] = f"{prompt}\nReturn the result as a JSON object matching this schema: {schema}"
-        response = requests.post(api_url, headers=headers, json=payload)
-        response.raise_for_status()
-        result = response.json()
+        from ._transport import post_json
+        url, headers, payload = self._build_request(prompt, result_object, kwargs)
+        result = post_json('groq', url, headers=headers, json=payload)
+        return map_llm_response(result, result_object)
+
+    async def agenerate(
+        self,
+        prompt: str,
+        *,
+        result_object: type = None,
+        **kwargs
+    ) -> str:
+        """
+        Asynchronously generate a response from Groq.
+
+        Args:
+            prompt (str): The prompt to send to the LLM.
+            result_object (type, optional): If provided, instructs the LLM to return a JSON matching this schema and parses the result into the object.
+            **kwargs: Additional parameters for the LLM API.
+
+        Returns:
+            str or result_object: The LLM response as a string, or an instance of result_object if provided.
+        """
+        from ._response_mapper import map_llm_response
+        from ._transport import apost_json
+        url, headers, payload = self._build_request(prompt, result_object, kwargs)
+        result = await apost_json('groq', url, headers=headers, json=payload)
         return map_llm_response(result, result_object)
+
+    def generate_stream(
+        self,
+        prompt: str,
+        *,
+        result_object: type = None,
+        **kwargs
+    ):
+        """
+        Stream a response from Groq, yielding text deltas as they arrive.
+
+        Args:
+            prompt (str): The prompt to send to the LLM.
+            result_object (type, optional): If provided, instructs the LLM to return a JSON matching this schema; ``result()`` parses the streamed text into the object.
+            **kwargs: Additional parameters for the LLM API.
+
+        Returns:
+            TextStream: Iterator of text deltas. ``text`` holds everything received so far and ``result()`` returns the complete response.
+        """
+        from ._streaming import TextStream, iter_deltas
+        from ._transport import stream_lines
+        url, headers, payload = self._build_request(prompt, result_object, kwargs)
+        payload["stream"] = True
+        return TextStream(iter_deltas(stream_lines('groq', url, headers=headers, json=payload)), result_object)
+
+    def agenerate_stream(
+        self,
+        prompt: str,
+        *,
+        result_object: type = None,
+        **kwargs
+    ):
+        """
+        Asynchronously stream a response from Groq, yielding text deltas as they arrive.
+
+        Args:
+            prompt (str): The prompt to send to the LLM.
+            result_object (type, optional): If provided, instructs the LLM to return a JSON matching this schema; ``result()`` parses the streamed text into the object.
+            **kwargs: Additional parameters for the LLM API.
+
+        Returns:
+            AsyncTextStream: Iterator of text deltas. ``text`` holds everything received so far and ``result()`` returns the complete response.
+        """
+        from ._streaming import AsyncTextStream, aiter_deltas
+        from ._transport import astream_lines
+        url, headers, payload = self._build_request(prompt, result_object, kwargs)
+        payload["stream"] = True
+        return AsyncTextStream(aiter_deltas(astream_lines('groq', url, headers=headers, json=payload)), result_object)
@@ -1,9 +1,11 @@
 import inspect
-from ._import_utils import require_package
+from ._base import BaseLLMService
 from ._response_mapper import map_llm_response
+from ._streaming import AsyncTextStream, TextStream, aiter_deltas, iter_deltas
+from ._transport import apost_json, astream_lines, post_json, stream_lines
 
 
-class LocalLLMService:
+class LocalLLMService(BaseLLMService):
     """
     Local LLM provider (Ollama, vLLM, etc.).
 
@@ -22,6 +24,21 @@ class LocalLLMService:
         self.temperature = temperature
         self.max_tokens = max_tokens
 
+    def _build_request(self, prompt: str, result_object: type, kwargs: dict):
+        # Returns (url, headers, payload) shared by generate and agenerate
+        payload = {"prompt": prompt, **kwargs}
+        if self.model:
+            payload["model"] = self.model
+        # If result_object is provided, instruct the LLM to return JSON
+        if result_object is not None:
+            if hasattr(result_object, '__annotations__'):
+                fields = ', '.join(f'"{k}": <{v.__name__}>' for k, v in result_object.__annotations__.items())
+                schema = f'{{{fields}}}'
+            else:
+                schema = str(result_object)
+            payload["prompt"] = f"{prompt}\nReturn the result as a JSON object matching this schema: {schema}"
+        return self.endpoint_url, None, payload
+
     def generate(
         self,
         prompt: str,
@@ -40,19 +57,72 @@ class LocalLLMService:
         Returns:
             str or result_object: The LLM response as a string, or an instance of result_object if provided.
         """
-        requests = require_package('requests', extra='requests')
-        payload = {"prompt": prompt, **kwargs}
-        if self.model:
-            payload["model"] = self.model
-        # If result_object is provided, instruct the LLM to return JSON
-        if result_object is not None:
-            if hasattr(result_object, '__annotations__'):
-                fields = ', '.join(f'"{k}": <{v.__name__}>' for k, v in result_object.__annotations__.items())
-                schema = f'{{{fields}}}'
-            else:
-                schema = str(result_object)
-            payload["prompt"] = f"{prompt}\nReturn the result as a JSON object matching this schema: {schema}"
-        response = requests.post(self.endpoint_url, json=payload)
-        response.raise_for_status()
-        result = response.json()
+        url, headers, payload = self._build_request(prompt, result_object, kwargs)
+        result = post_json('local', url, headers=headers, json=payload)
         return map_llm_response(result, result_object)
+
+    async def agenerate(
+        self,
+        prompt: str,
+        *,
+        result_object: type = None,
+        **kwargs
+    ) -> str:
+        """
+        Asynchronously generate a response from the local LLM.
+
+        Args:
+            prompt (str): The prompt to send to the LLM.
+            result_object (type, optional): If provided, instructs the LLM to return a JSON matching this schema and parses the result into the object.
+            **kwargs: Additional parameters for the LLM API.
+
+        Returns:
+            str or result_object: The LLM response as a string, or an instance of result_object if provided.
+        """
+        url, headers, payload = self._build_request(prompt, result_object, kwargs)
+        result = await apost_json('local', url, headers=headers, json=payload)
+        return map_llm_response(result, result_object)
+
+    def generate_stream(
+        self,
+        prompt: str,
+        *,
+        result_object: type = None,
+        **kwargs
+    ):
+        """
+        Stream a response from the local LLM, yielding text deltas as they arrive.
+
+        Args:
+            prompt (str): The prompt to send to the LLM.
+            result_object (type, optional): If provided, instructs the LLM to return a JSON matching this schema; ``result()`` parses the streamed text into the object.
+            **kwargs: Additional parameters for the LLM API.
+
+        Returns:
+            TextStream: Iterator of text deltas. ``text`` holds everything received so far and ``result()`` returns the complete response.
+        """
+        url, headers, payload = self._build_request(prompt, result_object, kwargs)
+        payload["stream"] = True
+        return TextStream(iter_deltas(stream_lines('local', url, headers=headers, json=payload)), result_object)
+
+    def agenerate_stream(
+        self,
+        prompt: str,
+        *,
+        result_object: type = None,
+        **kwargs
+    ):
+        """
+        Asynchronously stream a response from the local LLM, yielding text deltas as they arrive.
+
+        Args:
+            prompt (str): The prompt to send to the LLM.
+            result_object (type, optional): If provided, instructs the LLM to return a JSON matching this schema; ``result()`` parses the streamed text into the object.
+            **kwargs: Additional parameters for the LLM API.
+
+        Returns:
+            AsyncTextStream: Iterator of text deltas. ``text`` holds everything received so far and ``result()`` returns the complete response.
+        """
+        url, headers, payload = self._build_request(prompt, result_object, kwargs)
+        payload["stream"] = True
+        return AsyncTextStream(aiter_deltas(astream_lines('local', url, headers=headers, json=payload)), result_object)
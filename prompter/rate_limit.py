@@ -0,0 +1,362 @@
+"""
+Client-side rate limiting per provider.
+
+A ``RateLimiter`` holds a requests-per-minute and a tokens-per-minute token
+bucket. Each call reserves one request and its estimated tokens (prompt
+estimate plus ``max_tokens``) and sleeps until the reservation is covered, so
+concurrent callers are spaced out evenly instead of bursting into 429s.
+
+Limiters are shared per provider by every thread of the process
+(``get_limiter``), and optionally by every process on the host through a
+file-locked bucket (``shared_dir``, POSIX only). Where the provider's HTTP
+responses carry rate-limit headers, the buckets adopt the server's limits and
+remaining quota.
+
+Configured per provider in ``llm_config``:
+
+    "openai": {..., "rate_limit": {"rpm": 500, "tpm": 90000, "shared_dir": "/tmp/prompter-rl"}}
+"""
+import asyncio
+import os
+import re
+import struct
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional
+
+from .providers._base import ServiceWrapper
+from .token_budget import estimate_tokens
+
+_STATE = struct.Struct("dd")
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at ``rate`` tokens per minute.
+
+    ``reserve`` always succeeds and may leave the bucket in debt; the caller
+    then waits for the returned number of seconds. Queued callers are thereby
+    served in order at exactly the refill rate.
+
+    Args:
+        rate (float): Tokens added per minute.
+        capacity (float, optional): Maximum stored tokens (burst size); defaults to ``rate``.
+    """
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _load(self):
+        return self._tokens, self._updated
+
+    def _store(self, tokens: float, updated: float):
+        self._tokens, self._updated = tokens, updated
+
+    def _locked(self):
+        return self._lock
+
+    def _refill(self, tokens: float, updated: float, now: float) -> float:
+        return min(self.capacity, tokens + (now - updated) * self.rate / 60.0)
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` tokens and return how many seconds to wait before using them."""
+        with self._locked():
+            now = self._now()
+            tokens = self._refill(*self._load(), now) - amount
+            self._store(tokens, now)
+        return 0.0 if tokens >= 0 else -tokens * 60.0 / self.rate
+
+    def set_rate(self, rate: float, capacity: float = None):
+        """Change the refill rate (and burst size), keeping the stored tokens."""
+        with self._locked():
+            now = self._now()
+            tokens = self._refill(*self._load(), now)
+            self.rate = float(rate)
+            self.capacity = float(capacity if capacity is not None else rate)
+            self._store(min(tokens, self.capacity), now)
+
+    def close(self):
+        pass
+
+    def update(self, limit: float = None, remaining: float = None):
+        """Adopt a limit and/or remaining quota reported by the provider."""
+        with self._locked():
+            now = self._now()
+            tokens = self._refill(*self._load(), now)
+            if limit:
+                self.rate = self.capacity = float(limit)
+            if remaining is not None:
+                # Stay under the server's view of the quota, including our own in-flight debt
+                tokens = min(tokens, float(remaining))
+            self._store(tokens, now)
+
+    @property
+    def available(self) -> float:
+        with self._locked():
+            return self._refill(*self._load(), self._now())
+
+    def _now(self) -> float:
+        return time.monotonic()
+
+
+class _FileLock:
+    def __init__(self, bucket):
+        self.bucket = bucket
+
+    def __enter__(self):
+        import fcntl
+        self.bucket._lock.acquire()
+        fcntl.flock(self.bucket._fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc):
+        import fcntl
+        fcntl.flock(self.bucket._fd, fcntl.LOCK_UN)
+        self.bucket._lock.release()
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    ``TokenBucket`` whose state lives in a small file, locked with ``flock``, so
+    every process on the host that opens the same path shares one budget.
+
+    Uses wall-clock time, since monotonic clocks are not comparable across processes.
+    """
+    def __init__(self, path: str, rate: float, capacity: float = None):
+        super().__init__(rate, capacity)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        with self._locked():
+            if os.fstat(self._fd).st_size < _STATE.size:
+                self._store(self.capacity, self._now())
+
+    def _locked(self):
+        return _FileLock(self)
+
+    def _now(self) -> float:
+        return time.time()
+
+    def _load(self):
+        data = os.pread(self._fd, _STATE.size, 0)
+        if len(data) < _STATE.size:
+            return self.capacity, self._now()
+        return _STATE.unpack(data)
+
+    def _store(self, tokens: float, updated: float):
+        os.pwrite(self._fd, _STATE.pack(tokens, updated), 0)
+
+    def close(self):
+        """Close the state file; the bucket must not be used afterwards."""
+        fd, self._fd = self._fd, None
+        if fd is not None:
+            os.close(fd)
+
+    def __del__(self):
+        try:
+            self.close()
+        except (AttributeError, OSError):
+            pass
+
+
+# Header names used by OpenAI/Groq/Mistral-style and Anthropic APIs
+_HEADER = re.compile(r"^(?:x-ratelimit|anthropic-ratelimit)-(?:(limit|remaining)-(requests|tokens)|(requests|tokens)-(limit|remaining))$")
+
+# Header resources whose limit is not per minute, by provider: Groq reports
+# requests per day (and tokens per minute), so its request limit must not be
+# adopted as the requests-per-minute rate
+_NOT_PER_MINUTE = {
+    "groq": frozenset({"requests"}),
+}
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limiter for one provider.
+
+    Args:
+        rpm (float, optional): Requests per minute; None leaves requests unlimited.
+        tpm (float, optional): Tokens per minute; None leaves tokens unlimited.
+        shared_dir (str, optional): Directory for file-locked buckets shared by
+            all processes on the host.
+        name (str): Provider name, used for the shared bucket file names.
+        headroom (float): Fraction of the quota to use, e.g. 0.95 to keep a margin.
+    """
+    def __init__(self, rpm: float = None, tpm: float = None, shared_dir: str = None, name: str = "default", headroom: float = 1.0):
+        self.name = name
+        self.waited = 0.0
+        self.settings = None
+        self.requests: Optional[TokenBucket] = None
+        self.tokens: Optional[TokenBucket] = None
+        self._lock = threading.Lock()
+        self.configure(rpm, tpm, shared_dir, headroom)
+
+    def configure(self, rpm: float = None, tpm: float = None, shared_dir: str = None, headroom: float = 1.0):
+        """
+        Apply new limits in place, so services already holding this limiter
+        follow them. Buckets keep their stored tokens unless ``shared_dir`` changes.
+        """
+        settings = (rpm, tpm, shared_dir, headroom)
+        with self._lock:
+            if settings == self.settings:
+                return
+            relocate = self.settings is not None and shared_dir != self.settings[2]
+            self.headroom = headroom
+            self.requests = self._bucket(self.requests, rpm, shared_dir, f"{self.name}.requests", relocate)
+            self.tokens = self._bucket(self.tokens, tpm, shared_dir, f"{self.name}.tokens", relocate)
+            self.settings = settings
+
+    def _bucket(self, bucket, limit, shared_dir, filename, relocate) -> Optional[TokenBucket]:
+        if bucket is not None and (not limit or relocate):
+            bucket.close()
+            bucket = None
+        if not limit:
+            return None
+        if bucket is not None:
+            bucket.set_rate(limit * self.headroom)
+            return bucket
+        if shared_dir:
+            return FileTokenBucket(os.path.join(os.path.expanduser(shared_dir), filename), limit * self.headroom)
+        return TokenBucket(limit * self.headroom)
+
+    def close(self):
+        """Close the shared bucket files, if any."""
+        with self._lock:
+            for bucket in (self.requests, self.tokens):
+                if bucket is not None:
+                    bucket.close()
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Reserve one request and ``tokens`` tokens; return the seconds to wait."""
+        wait = 0.0
+        if self.requests is not None:
+            wait = self.requests.reserve(1)
+        if self.tokens is not None and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        self.waited += wait
+        return wait
+
+    def acquire(self, tokens: int = 0):
+        """Block until one request with ``tokens`` tokens fits in the budget."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 0):
+        """Async version of ``acquire``."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def observe_headers(self, headers: Mapping[str, str]):
+        """
+        Update the buckets from rate-limit response headers, if present.
+
+        A limit replaces the bucket's per-minute rate unless the provider
+        reports that resource over another window (see ``_NOT_PER_MINUTE``);
+        the remaining quota always caps the stored tokens.
+        """
+        found: Dict[str, Dict[str, float]] = {}
+        for name, value in headers.items():
+            match = _HEADER.match(name.lower())
+            if not match:
+                continue
+            kind = match.group(1) or match.group(4)
+            resource = match.group(2) or match.group(3)
+            try:
+                found.setdefault(resource, {})[kind] = float(value)
+            except ValueError:
+                pass
+        other_window = _NOT_PER_MINUTE.get(self.name, ())
+        for resource, values in found.items():
+            bucket = self.requests if resource == "requests" else self.tokens
+            if bucket is not None:
+                limit = values.get("limit") if resource not in other_window else None
+                bucket.update(limit * self.headroom if limit else None, values.get("remaining"))
+
+    def observe_response(self, response: Any):
+        """Transport response hook: read headers from a requests/httpx response."""
+        headers = getattr(response, "headers", None)
+        if headers:
+            self.observe_headers(headers)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def configure_rate_limit(provider: str, rpm: float = None, tpm: float = None, shared_dir: str = None, headroom: float = 1.0) -> RateLimiter:
+    """
+    Return the process-wide limiter for ``provider``, creating it and hooking it
+    to the transport on first use.
+
+    Later calls (another service of the provider, a config reload, a router
+    member) get the same limiter, so one provider quota is never split; if
+    their settings differ, the limiter is reconfigured in place.
+
+    Returns:
+        RateLimiter: The limiter, also returned by ``get_limiter(provider)``.
+    """
+    from .providers._transport import add_response_hook
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = _limiters[provider] = RateLimiter(rpm, tpm, shared_dir, name=provider, headroom=headroom)
+            add_response_hook(provider, limiter.observe_response)
+            return limiter
+    limiter.configure(rpm, tpm, shared_dir, headroom)
+    return limiter
+
+
+def get_limiter(provider: str) -> Optional[RateLimiter]:
+    """Return the limiter configured for ``provider``, or None."""
+    return _limiters.get(provider)
+
+
+class RateLimitedService(ServiceWrapper):
+    """
+    Wraps a provider so every call first waits for room in ``limiter``.
+
+    The token cost of a call is ``count_tokens(prompt)`` plus its
+    ``max_tokens`` (from kwargs or the provider's settings).
+
+    Args:
+        service: The provider (or another wrapper) to call.
+        limiter (RateLimiter): Usually ``get_limiter(provider)``, shared by all services of that provider.
+        count_tokens (callable, optional): Tokenizer; defaults to ``estimate_tokens``.
+    """
+    def __init__(self, service, limiter: RateLimiter, count_tokens=None):
+        super().__init__(service)
+        self.limiter = limiter
+        self.count_tokens = count_tokens or estimate_tokens
+
+    def _cost(self, prompt: str, kwargs: dict) -> int:
+        max_tokens = kwargs.get("max_tokens", getattr(self.service, "max_tokens", None)) or 0
+        return self.count_tokens(prompt) + int(max_tokens)
+
+    def generate(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        self.limiter.acquire(self._cost(prompt, kwargs))
+        return self.service.generate(prompt, result_object=result_object, **kwargs)
+
+    async def agenerate(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        await self.limiter.aacquire(self._cost(prompt, kwargs))
+        return await self.service.agenerate(prompt, result_object=result_object, **kwargs)
+
+    def generate_stream(self, prompt: str, *, result_object: type = None, **kwargs):
+        self.limiter.acquire(self._cost(prompt, kwargs))
+        return self.service.generate_stream(prompt, result_object=result_object, **kwargs)
+
+    def agenerate_stream(self, prompt: str, *, result_object: type = None, **kwargs):
+        from .providers._streaming import AsyncTextStream
+        cost = self._cost(prompt, kwargs)
+
+        async def deltas():
+            # Waits on first iteration, like the request itself
+            await self.limiter.aacquire(cost)
+            async for delta in self.service.agenerate_stream(prompt, result_object=result_object, **kwargs):
+                yield delta
+        return AsyncTextStream(deltas(), result_object)
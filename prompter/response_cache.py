@@ -0,0 +1,395 @@
+"""
+Caching of provider responses.
+
+``CachedService`` wraps any provider and answers repeated calls from a cache
+instead of the network. Entries are keyed on the provider class, model,
+endpoint, rendered prompt, temperature, max_tokens, extra kwargs and the
+``result_object`` schema. ``MemoryCache`` pickles values; ``SQLiteCache``
+stores JSON unless told to pickle. Both compress with zlib.
+
+Example:
+    service = CachedService(get_llm_service(), SQLiteCache("~/.cache/prompter/responses.db", ttl=86400))
+    service.generate(prompt)   # network
+    service.generate(prompt)   # cache
+"""
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Mapping, Optional
+
+from .providers._base import ServiceWrapper
+
+# Returned by cache backends on a miss (None is a valid cached value)
+MISSING = object()
+
+
+def _dumps(value: Any) -> bytes:
+    return zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _loads(data: bytes) -> Any:
+    return pickle.loads(zlib.decompress(data))
+
+
+def _json_dumps(value: Any) -> bytes:
+    text = json.dumps(value)
+    if json.loads(text) != value:
+        # e.g. tuples (read back as lists) or non-string dict keys
+        raise ValueError(f"{type(value).__name__} value does not survive a JSON round trip")
+    return zlib.compress(text.encode("utf-8"))
+
+
+def _json_loads(data: bytes) -> Any:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+_SERIALIZERS = {"json": (_json_dumps, _json_loads), "pickle": (_dumps, _loads)}
+
+# Provider attributes that select the server or deployment answering a call
+_ENDPOINT_ATTRIBUTES = (
+    "endpoint_url", "endpoint", "base_url", "deployment", "api_version",
+    "region", "location", "project", "project_id",
+)
+
+
+def unwrap(service):
+    """Return the provider behind any chain of wrappers that expose ``.service``."""
+    inner = getattr(service, "service", None)
+    while inner is not None and hasattr(inner, "generate"):
+        service, inner = inner, getattr(inner, "service", None)
+    return service
+
+
+def schema_signature(result_object) -> Optional[str]:
+    """Describe ``result_object`` by its qualified name and field types, so schema changes change the key."""
+    if result_object is None:
+        return None
+    name = f"{getattr(result_object, '__module__', '')}.{getattr(result_object, '__qualname__', repr(result_object))}"
+    annotations = getattr(result_object, "__annotations__", None)
+    if annotations:
+        fields = ",".join(f"{k}:{getattr(v, '__name__', repr(v))}" for k, v in annotations.items())
+        return f"{name}({fields})"
+    return name
+
+
+def make_cache_key(service, prompt: str, result_object: type = None, kwargs: Mapping[str, Any] = None) -> str:
+    """
+    Return the cache key of one ``generate`` call as a hex SHA-256 digest.
+
+    Temperature and max_tokens come from ``kwargs`` when given there, and from
+    the provider's settings otherwise, so an explicit default and an implicit
+    one share an entry. Endpoint settings (``base_url``, ``endpoint_url``,
+    ``deployment``, ``region``, ...) are part of the key, so services of one
+    class pointed at different servers never share answers.
+    """
+    provider = unwrap(service)
+    kwargs = dict(kwargs or {})
+    endpoint = {name: getattr(provider, name, None) for name in _ENDPOINT_ATTRIBUTES}
+    parts = {
+        "provider": f"{type(provider).__module__}.{type(provider).__qualname__}",
+        "model": getattr(provider, "model", None) or getattr(provider, "deployment", None) or getattr(provider, "model_id", None),
+        "endpoint": {name: value for name, value in endpoint.items() if value is not None},
+        "prompt": prompt,
+        "temperature": kwargs.pop("temperature", getattr(provider, "temperature", None)),
+        "max_tokens": kwargs.pop("max_tokens", getattr(provider, "max_tokens", None)),
+        "kwargs": kwargs,
+        "schema": schema_signature(result_object),
+    }
+    blob = json.dumps(parts, sort_keys=True, default=repr).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()
+
+
+class MemoryCache:
+    """
+    In-process LRU cache.
+
+    Args:
+        maxsize (int): Maximum number of entries.
+        ttl (float, optional): Seconds an entry stays valid; None keeps it until evicted.
+        max_bytes (int, optional): Maximum total size of the compressed values.
+    """
+    def __init__(self, maxsize: int = 1024, ttl: float = None, max_bytes: int = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._bytes = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        """Return the cached value for ``key``, or ``MISSING``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.time() - entry[1] > self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return _loads(entry[0])
+
+    def set(self, key: str, value: Any):
+        data = _dumps(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (data, time.time())
+            self._bytes += len(data)
+            while self._entries and (
+                len(self._entries) > self.maxsize
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        data, _ = self._entries.pop(key)
+        self._bytes -= len(data)
+
+    def delete(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """
+    On-disk cache in a SQLite database, shared by every process that opens the same file.
+
+    Least recently used entries are evicted once ``max_entries`` or
+    ``max_bytes`` is exceeded. The entry count and total size are kept up to
+    date by triggers, so a write does not scan the table.
+
+    Values are stored as JSON, so only responses that read back unchanged
+    (text, numbers, and lists and string-keyed dicts of them) are cached;
+    anything else, such as tuples, dicts with other keys or result objects,
+    is passed through uncached rather than stored altered. With
+    ``serializer="pickle"`` any picklable value is cached, but loading a row
+    runs pickle on it: anyone who can write the database file can then run
+    code in every process that reads it. Only use pickle for a file in a
+    directory no other user can write.
+
+    Args:
+        path (str): Database file; created with its directory if missing.
+        ttl (float, optional): Seconds an entry stays valid; None keeps it until evicted.
+        max_entries (int, optional): Maximum number of entries.
+        max_bytes (int, optional): Maximum total size of the compressed values.
+        serializer (str): 'json' (default) or 'pickle'.
+    """
+    def __init__(self, path: str, ttl: float = None, max_entries: int = 100000, max_bytes: int = None,
+                 serializer: str = "json"):
+        if serializer not in _SERIALIZERS:
+            raise ValueError(f"Unknown serializer '{serializer}'; expected 'json' or 'pickle'.")
+        self.serializer = serializer
+        self._dump, self._load = _SERIALIZERS[serializer]
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+        with self._transaction():
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS totals ("
+                "id INTEGER PRIMARY KEY CHECK (id = 0), entries INTEGER NOT NULL, bytes INTEGER NOT NULL)"
+            )
+            # Counts rows already present in a database written by an older version
+            self._conn.execute(
+                "INSERT OR IGNORE INTO totals SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            )
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_added AFTER INSERT ON responses BEGIN "
+                "UPDATE totals SET entries = entries + 1, bytes = bytes + NEW.size WHERE id = 0; END"
+            )
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS responses_removed AFTER DELETE ON responses BEGIN "
+                "UPDATE totals SET entries = entries - 1, bytes = bytes - OLD.size WHERE id = 0; END"
+            )
+
+    @contextmanager
+    def _transaction(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def get(self, key: str) -> Any:
+        """Return the cached value for ``key``, or ``MISSING``."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return MISSING
+            try:
+                value = self._load(row[0])
+            except (ValueError, pickle.UnpicklingError, zlib.error):
+                # Written with another serializer or corrupted; treat as a miss
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return MISSING
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any):
+        try:
+            data = self._dump(value)
+        except (TypeError, ValueError):
+            # Not representable as JSON (e.g. a result_object instance)
+            return
+        now = time.time()
+        with self._lock, self._transaction():
+            # DELETE + INSERT rather than INSERT OR REPLACE, which skips delete triggers
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.execute(
+                "INSERT INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now),
+            )
+            self._evict()
+
+    def _totals(self):
+        return self._conn.execute("SELECT entries, bytes FROM totals WHERE id = 0").fetchone()
+
+    def _evict(self):
+        if self.ttl is not None:
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+        entries, total = self._totals()
+        if self.max_entries is not None and entries > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                (entries - self.max_entries,),
+            )
+            total = self._totals()[1]
+        if self.max_bytes is not None and total > self.max_bytes:
+            # Walks the least recently used rows only until enough space is freed
+            doomed = []
+            rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed")
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                doomed.append((key,))
+                total -= size
+            rows.close()
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self):
+        self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._totals()[0]
+
+
+class CachedService(ServiceWrapper):
+    """
+    Wraps a provider so that repeated identical calls are answered from ``cache``.
+
+    Args:
+        service: The provider (or another wrapper) to call on a miss.
+        cache: A ``MemoryCache``, ``SQLiteCache`` or any object with
+            ``get(key)`` returning ``MISSING`` on a miss and ``set(key, value)``.
+            Defaults to a new ``MemoryCache``.
+        bypass_nondeterministic (bool): If True, calls with temperature > 0 skip
+            the cache, so sampled outputs stay fresh. Off by default.
+
+    Other attributes (``model``, ``generate_stream``, ...) are forwarded to
+    ``service``; streamed responses are not cached.
+    """
+    def __init__(self, service, cache=None, bypass_nondeterministic: bool = False):
+        super().__init__(service)
+        self.cache = cache if cache is not None else MemoryCache()
+        self.bypass_nondeterministic = bypass_nondeterministic
+
+    def _key(self, prompt: str, result_object: type, kwargs: dict) -> Optional[str]:
+        if self.bypass_nondeterministic:
+            temperature = kwargs.get("temperature", getattr(unwrap(self.service), "temperature", None))
+            if temperature:
+                return None
+        return make_cache_key(self.service, prompt, result_object, kwargs)
+
+    def generate(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        key = self._key(prompt, result_object, kwargs)
+        if key is not None:
+            value = self.cache.get(key)
+            if value is not MISSING:
+                return value
+        value = self.service.generate(prompt, result_object=result_object, **kwargs)
+        if key is not None:
+            self.cache.set(key, value)
+        return value
+
+    async def agenerate(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        key = self._key(prompt, result_object, kwargs)
+        if key is not None:
+            value = self.cache.get(key)
+            if value is not MISSING:
+                return value
+        value = await self.service.agenerate(prompt, result_object=result_object, **kwargs)
+        if key is not None:
+            self.cache.set(key, value)
+        return value
+
+
+def cache_from_config(config: Mapping[str, Any]):
+    """
+    Build a cache backend from a provider config's ``cache`` section.
+
+    Example:
+        {"backend": "sqlite", "path": "~/.cache/prompter/responses.db", "ttl": 86400}
+
+    Add ``"serializer": "pickle"`` to cache result objects in SQLite; see
+    ``SQLiteCache`` for when that is safe.
+    """
+    config = dict(config)
+    backend = config.pop("backend", "memory")
+    if backend == "memory":
+        return MemoryCache(**config)
+    if backend == "sqlite":
+        return SQLiteCache(**config)
+    raise ValueError(f"Unknown cache backend '{backend}'; expected 'memory' or 'sqlite'.")
@@ -0,0 +1,211 @@
+"""
+Retries for transient provider failures.
+
+``RetryPolicy`` retries calls that fail with 408/425/429/5xx responses,
+timeouts or dropped connections, waiting with decorrelated jitter between
+attempts (or for the server's ``Retry-After``), and gives up when the
+attempt limit or the total time budget is reached.
+
+Errors are classified by status code and exception class name, so requests,
+httpx and the provider SDKs are handled without importing any of them.
+
+Example:
+    service = RetryingService(get_llm_service(), RetryPolicy(max_attempts=6, max_elapsed=60))
+"""
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Optional
+
+from .providers._base import ServiceWrapper
+
+TRANSIENT_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504, 529})
+
+# Exception class names (anywhere in the MRO) that signal a transient network problem
+TRANSIENT_ERRORS = frozenset({
+    "TimeoutError", "ConnectionError", "Timeout", "ReadTimeout", "ConnectTimeout",
+    "TimeoutException", "ConnectError", "ReadError", "RemoteProtocolError",
+    "ChunkedEncodingError", "ProtocolError", "APIConnectionError", "APITimeoutError",
+    "RateLimitError", "ServiceUnavailableError", "InternalServerError", "OverloadedError",
+})
+
+
+def status_of(exc: BaseException) -> Optional[int]:
+    """Return the HTTP status carried by ``exc`` (requests, httpx, SDK errors), if any."""
+    response = getattr(exc, "response", None)
+    for status in (
+        getattr(response, "status_code", None),
+        getattr(exc, "status_code", None),
+        getattr(exc, "http_status", None),
+    ):
+        if isinstance(status, int):
+            return status
+    return None
+
+
+def _headers_of(exc: BaseException):
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        headers = getattr(exc, "headers", None)
+    return headers or {}
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Return the delay in seconds requested by a ``Retry-After`` (or ``retry-after-ms``) header, if any."""
+    headers = _headers_of(exc)
+    try:
+        value = headers.get("retry-after-ms")
+        if value is not None:
+            return max(0.0, float(value) / 1000.0)
+        value = headers.get("retry-after")
+    except AttributeError:
+        return None
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def is_transient(exc: BaseException) -> bool:
+    """True for errors worth retrying: throttling, server errors, timeouts and connection resets."""
+    status = status_of(exc)
+    if status is not None:
+        return status in TRANSIENT_STATUS
+    return any(cls.__name__ in TRANSIENT_ERRORS for cls in type(exc).__mro__)
+
+
+def _reason(exc: BaseException) -> str:
+    status = status_of(exc)
+    return str(status) if status is not None else type(exc).__name__
+
+
+class RetryPolicy:
+    """
+    Retry with decorrelated-jitter backoff.
+
+    Each wait is drawn from ``uniform(base_delay, 3 * previous wait)`` and capped
+    at ``max_delay``; a ``Retry-After`` header overrides it. A retry that would
+    end after ``max_elapsed`` seconds is not attempted and the last error is raised.
+
+    Args:
+        max_attempts (int): Total attempts, including the first.
+        base_delay (float): Minimum wait in seconds.
+        max_delay (float): Maximum wait between two attempts.
+        max_elapsed (float, optional): Time budget in seconds for all attempts and waits.
+        retry_on (callable): Predicate deciding whether an exception is retryable.
+
+    Attributes:
+        metrics (Counter): ``calls``, ``retries``, ``gave_up``, ``succeeded_after_retry``
+            and ``retry:<status or exception>`` counts.
+    """
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        max_elapsed: float = 120.0,
+        retry_on: Callable[[BaseException], bool] = is_transient,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_elapsed = max_elapsed
+        self.retry_on = retry_on
+        self.metrics = Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, *names: str):
+        with self._lock:
+            for name in names:
+                self.metrics[name] += 1
+
+    def next_delay(self, previous: float) -> float:
+        """Return the next jittered wait after a wait of ``previous`` seconds."""
+        return min(self.max_delay, random.uniform(self.base_delay, max(self.base_delay, previous * 3)))
+
+    def _plan(self, exc: BaseException, attempt: int, previous: float, started: float) -> Optional[float]:
+        # Returns the wait before the next attempt, or None to give up
+        if attempt >= self.max_attempts or not self.retry_on(exc):
+            return None
+        delay = retry_after(exc)
+        if delay is None:
+            delay = self.next_delay(previous)
+        if self.max_elapsed is not None and time.monotonic() - started + delay > self.max_elapsed:
+            return None
+        return delay
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        """Call ``fn()`` until it succeeds or the policy gives up."""
+        self._count("calls")
+        started = time.monotonic()
+        delay = self.base_delay
+        attempt = 1
+        while True:
+            try:
+                result = fn()
+            except Exception as e:
+                delay = self._plan(e, attempt, delay, started)
+                if delay is None:
+                    self._count("gave_up")
+                    raise
+                self._count("retries", f"retry:{_reason(e)}")
+                time.sleep(delay)
+                attempt += 1
+                continue
+            if attempt > 1:
+                self._count("succeeded_after_retry")
+            return result
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async version of ``call``; ``fn`` returns an awaitable."""
+        self._count("calls")
+        started = time.monotonic()
+        delay = self.base_delay
+        attempt = 1
+        while True:
+            try:
+                result = await fn()
+            except Exception as e:
+                delay = self._plan(e, attempt, delay, started)
+                if delay is None:
+                    self._count("gave_up")
+                    raise
+                self._count("retries", f"retry:{_reason(e)}")
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            if attempt > 1:
+                self._count("succeeded_after_retry")
+            return result
+
+
+class RetryingService(ServiceWrapper):
+    """
+    Wraps a provider so ``generate``/``agenerate`` are retried according to ``policy``.
+
+    Streams are not retried, since deltas may already have been consumed.
+
+    Args:
+        service: The provider (or another wrapper) to call.
+        policy (RetryPolicy, optional): Defaults to ``RetryPolicy()``.
+    """
+    def __init__(self, service, policy: RetryPolicy = None):
+        super().__init__(service)
+        self.policy = policy if policy is not None else RetryPolicy()
+
+    def generate(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        return self.policy.call(lambda: self.service.generate(prompt, result_object=result_object, **kwargs))
+
+    async def agenerate(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        return await self.policy.acall(lambda: self.service.agenerate(prompt, result_object=result_object, **kwargs))
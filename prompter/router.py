@@ -0,0 +1,326 @@
+"""
+Latency-aware routing across several configured providers.
+
+``RouterService`` has the usual ``generate``/``agenerate`` interface and
+sends each call to one backend of a weighted pool. The choice favours
+backends with a low EWMA latency and error rate; a backend whose error rate
+or latency gets too high is drained (receives no traffic) for a while, and
+comes back when the drain expires or a health check passes. Backends whose
+circuit breaker is open are skipped too. A failed call is retried once on
+another backend. Only transport errors, 429s and 5xx count as failures; a
+client error such as a 400 is raised at once, since it would fail anywhere.
+
+Configured through ``llm_config`` with ``provider: router``:
+
+    provider: router
+    router:
+      pool:
+        - {provider: openai, model: gpt-4o, weight: 2}
+        - {provider: groq, model: llama-3-70b}
+        - {provider: anthropic}
+      drain_seconds: 30
+    openai: {api_key: ..., ...}
+    groq: {api_key: ..., ...}
+    anthropic: {api_key: ..., ...}
+"""
+import asyncio
+import random
+import statistics
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from .circuit_breaker import CircuitOpenError
+from .providers._base import BaseLLMService
+from .retry import is_transient
+
+
+def _is_failure(exc: BaseException) -> bool:
+    # The backend's fault (and worth another backend), not the request's
+    return isinstance(exc, CircuitOpenError) or is_transient(exc)
+
+
+class Backend:
+    """
+    One routable service and its live statistics.
+
+    Args:
+        name (str): Label used in ``snapshot()``.
+        service: The provider (or wrapper) to call.
+        weight (float): Relative share of traffic when all backends perform alike.
+    """
+    def __init__(self, name: str, service, weight: float = 1.0):
+        self.name = name
+        self.service = service
+        self.weight = weight
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.samples = 0
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.drained_until = 0.0
+        self.drain_reason: Optional[str] = None
+
+    def draining(self, now: float = None) -> bool:
+        return self.drained_until > (time.monotonic() if now is None else now)
+
+    @property
+    def breaker(self):
+        """The circuit breaker of the service (or any wrapper it is in), if it has one."""
+        return getattr(self.service, "breaker", None)
+
+    def available(self, now: float = None) -> bool:
+        breaker = self.breaker
+        return not self.draining(now) and (breaker is None or breaker.available)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "weight": self.weight,
+            "latency": self.latency,
+            "error_rate": self.error_rate,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "draining": self.draining(),
+            "drain_reason": self.drain_reason if self.draining() else None,
+            "circuit": self.breaker.state if self.breaker is not None else None,
+        }
+
+
+class RouterService(BaseLLMService):
+    """
+    Spreads calls over a weighted pool of backends.
+
+    A backend's share is ``weight * (1 - error_rate)**2 / latency``, with the
+    pool's median latency standing in until the backend has been measured.
+
+    Args:
+        backends (list of Backend): The pool.
+        alpha (float): EWMA smoothing factor for latency and error rate.
+        min_samples (int): Calls a backend needs before it can be drained.
+        max_error_rate (float): Error rate above which a backend is drained.
+        slow_factor (float): A backend is drained when its latency exceeds this
+            multiple of the median latency of the other backends...
+        slow_margin (float): ...and exceeds it by at least this many seconds, so
+            tiny absolute differences never drain a backend.
+        drain_seconds (float): How long a drained backend receives no traffic.
+        failover (bool): Retry a failed call once on another backend.
+        health_check (callable, optional): ``health_check(service) -> bool`` used by
+            ``check_health()`` to re-admit drained backends early.
+    """
+    def __init__(
+        self,
+        backends: List[Backend],
+        alpha: float = 0.2,
+        min_samples: int = 5,
+        max_error_rate: float = 0.5,
+        slow_factor: float = 3.0,
+        slow_margin: float = 0.25,
+        drain_seconds: float = 30.0,
+        failover: bool = True,
+        health_check: Callable[[Any], bool] = None,
+    ):
+        if not backends:
+            raise ValueError("RouterService needs at least one backend.")
+        self.backends = list(backends)
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.slow_factor = slow_factor
+        self.slow_margin = slow_margin
+        self.drain_seconds = drain_seconds
+        self.failover = failover
+        self.health_check = health_check
+        self._lock = threading.Lock()
+        self._health_thread = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "RouterService":
+        """
+        Build a router from a full llm_config dict with a ``router`` section.
+
+        Each pool entry names a ``provider`` whose config section is used, with
+        any other keys of the entry (``model``, ``temperature``, ...) overriding
+        it; ``weight`` and ``name`` are router settings.
+        """
+        from .llm_factory import create_service
+        options = dict(config.get("router") or {})
+        pool = options.pop("pool", None)
+        if not pool:
+            raise ValueError("The router config needs a non-empty 'pool' list.")
+        backends = []
+        for entry in pool:
+            entry = {"provider": entry} if isinstance(entry, str) else dict(entry)
+            provider = entry.pop("provider")
+            weight = float(entry.pop("weight", 1.0))
+            section = dict(config.get(provider) or {})
+            name = entry.pop("name", None)
+            section.update(entry)
+            name = name or (f"{provider}:{section['model']}" if section.get("model") else provider)
+            backends.append(Backend(name, create_service(provider, section), weight))
+        return cls(backends, **options)
+
+    def __getattr__(self, name):
+        # Attributes such as ``model`` come from the first backend
+        try:
+            backends = self.__dict__["backends"]
+        except KeyError:
+            raise AttributeError(name)
+        return getattr(backends[0].service, name)
+
+    def _score(self, backend: Backend, prior: float) -> float:
+        latency = backend.latency if backend.latency is not None else prior
+        return max(backend.weight * (1.0 - backend.error_rate) ** 2 / max(latency, 1e-3), 1e-9)
+
+    def _pick(self, exclude=()) -> Backend:
+        now = time.monotonic()
+        with self._lock:
+            candidates = [b for b in self.backends if b not in exclude]
+            available = [b for b in candidates if b.available(now)]
+            # If everything is drained or open, keep serving rather than failing every call
+            pool = available or candidates or self.backends
+            known = [b.latency for b in pool if b.latency is not None]
+            prior = statistics.median(known) if known else 1.0
+            backend = random.choices(pool, weights=[self._score(b, prior) for b in pool])[0]
+            backend.in_flight += 1
+            backend.requests += 1
+        return backend
+
+    def _record(self, backend: Backend, latency: float, ok: bool):
+        now = time.monotonic()
+        with self._lock:
+            backend.in_flight -= 1
+            backend.samples += 1
+            backend.error_rate += self.alpha * ((0.0 if ok else 1.0) - backend.error_rate)
+            if not ok:
+                backend.failures += 1
+            else:
+                backend.latency = latency if backend.latency is None else backend.latency + self.alpha * (latency - backend.latency)
+            if backend.samples < self.min_samples or backend.draining(now):
+                return
+            if not ok and backend.error_rate > self.max_error_rate:
+                self._drain(backend, now, f"error rate {backend.error_rate:.0%}")
+            elif ok:
+                others = [b.latency for b in self.backends if b is not backend and b.latency is not None and not b.draining(now)]
+                typical = statistics.median(others) if others else None
+                if typical is not None and backend.latency > max(self.slow_factor * typical, typical + self.slow_margin):
+                    self._drain(backend, now, f"latency {backend.latency:.2f}s")
+
+    def _release(self, backend: Backend):
+        # The call ended without an outcome that says anything about the backend
+        with self._lock:
+            backend.in_flight -= 1
+
+    def _drain(self, backend: Backend, now: float, reason: str):
+        backend.drained_until = now + self.drain_seconds
+        backend.drain_reason = reason
+        # Start over on return, so one more failure does not drain it again at once
+        backend.samples = 0
+        backend.error_rate = 0.0
+        backend.latency = None
+
+    def drain(self, name: str, seconds: float = None):
+        """Take the backend ``name`` out of rotation manually."""
+        with self._lock:
+            for backend in self.backends:
+                if backend.name == name:
+                    backend.drained_until = time.monotonic() + (self.drain_seconds if seconds is None else seconds)
+                    backend.drain_reason = "manual"
+
+    def _attempts(self) -> int:
+        return 2 if self.failover and len(self.backends) > 1 else 1
+
+    def generate(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        tried = []
+        for attempt in range(self._attempts()):
+            backend = self._pick(tried)
+            tried.append(backend)
+            started = time.monotonic()
+            try:
+                result = backend.service.generate(prompt, result_object=result_object, **kwargs)
+            except Exception as e:
+                if not _is_failure(e):
+                    self._release(backend)
+                    raise
+                self._record(backend, time.monotonic() - started, False)
+                if attempt + 1 == self._attempts():
+                    raise
+                continue
+            self._record(backend, time.monotonic() - started, True)
+            return result
+
+    async def agenerate(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        tried = []
+        for attempt in range(self._attempts()):
+            backend = self._pick(tried)
+            tried.append(backend)
+            started = time.monotonic()
+            try:
+                result = await backend.service.agenerate(prompt, result_object=result_object, **kwargs)
+            except asyncio.CancelledError:
+                self._release(backend)
+                raise
+            except Exception as e:
+                if not _is_failure(e):
+                    self._release(backend)
+                    raise
+                self._record(backend, time.monotonic() - started, False)
+                if attempt + 1 == self._attempts():
+                    raise
+                continue
+            self._record(backend, time.monotonic() - started, True)
+            return result
+
+    def generate_stream(self, prompt: str, *, result_object: type = None, **kwargs):
+        backend = self._pick()
+        self._release(backend)
+        return backend.service.generate_stream(prompt, result_object=result_object, **kwargs)
+
+    def agenerate_stream(self, prompt: str, *, result_object: type = None, **kwargs):
+        backend = self._pick()
+        self._release(backend)
+        return backend.service.agenerate_stream(prompt, result_object=result_object, **kwargs)
+
+    def check_health(self):
+        """Run ``health_check`` on drained backends and re-admit the ones that pass."""
+        if self.health_check is None:
+            return
+        for backend in self.backends:
+            if not backend.draining():
+                continue
+            try:
+                healthy = bool(self.health_check(backend.service))
+            except Exception:
+                healthy = False
+            with self._lock:
+                if healthy:
+                    backend.drained_until = 0.0
+                    backend.drain_reason = None
+                else:
+                    backend.drained_until = time.monotonic() + self.drain_seconds
+
+    def start_health_checks(self, interval: float = 10.0):
+        """Call ``check_health()`` every ``interval`` seconds in a daemon thread."""
+        if self._health_thread is not None:
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                self.check_health()
+        self._health_thread = threading.Thread(target=loop, name="prompter-router-health", daemon=True)
+        self._health_thread.start()
+
+    def stop_health_checks(self):
+        self._stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join()
+            self._health_thread = None
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Per-backend statistics, for dashboards."""
+        with self._lock:
+            return [b.snapshot() for b in self.backends]
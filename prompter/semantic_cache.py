@@ -0,0 +1,318 @@
+"""
+Semantic response cache: serves a cached answer for prompts that are
+near-duplicates of an earlier one.
+
+Prompts are normalized (case, whitespace, punctuation), embedded with a
+local embedder and compared by cosine similarity against the prompts
+already answered for the same provider, model, settings and
+``result_object``. Requires ``numpy``.
+
+For prompts rendered from a template, pass the variable inputs as
+``semantic_key``: the whole prompt is mostly shared template text, which
+would make different questions look alike.
+
+Example:
+    service = SemanticCachedService(get_llm_service())
+    service.generate(prompt, semantic_key={"template": "faq", "question": "What is your refund policy?"})
+    service.generate(prompt2, semantic_key={"template": "faq", "question": "what is your  refund policy"})   # served from the cache
+"""
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from itertools import chain
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .providers._base import ServiceWrapper
+from .response_cache import MISSING, make_cache_key
+
+# Numbers such as "3.5" or "1,000" stay one word
+_WORD = re.compile(r"\w+(?:[.,]\d+)*")
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+_SPACE = re.compile(r"\s+")
+
+
+def _numpy():
+    from .providers._import_utils import require_package
+    return require_package('numpy')
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercase, apply NFKC, drop punctuation (except decimal and thousands separators) and collapse whitespace."""
+    text = unicodedata.normalize("NFKC", prompt).casefold()
+    last = len(text) - 1
+    text = "".join(
+        " " if unicodedata.category(ch).startswith("P")
+        and not (ch in ".," and 0 < i < last and text[i - 1].isdigit() and text[i + 1].isdigit())
+        else ch
+        for i, ch in enumerate(text)
+    )
+    return _SPACE.sub(" ", text).strip()
+
+
+def _key_text(key: Union[str, Mapping[str, Any]]) -> str:
+    # Mappings of template variables are embedded as "name: value" lines in a stable order
+    if isinstance(key, Mapping):
+        return "\n".join(f"{name}: {value}" for name, value in sorted(key.items()))
+    return str(key)
+
+
+class HashingEmbedder:
+    """
+    Dependency-free embedder using the hashing trick.
+
+    Words, word bigrams and character trigrams are hashed (with a stable
+    hash, so vectors are identical across processes) into ``dim`` signed
+    buckets, and each vector is L2-normalized.
+
+    Any object with an ``embed(texts) -> ndarray[len(texts), dim]`` method
+    returning unit vectors can be used instead.
+
+    Args:
+        dim (int): Vector size.
+        char_ngrams (int): Character n-gram length; 0 disables them.
+    """
+    def __init__(self, dim: int = 256, char_ngrams: int = 3):
+        self.dim = dim
+        self.char_ngrams = char_ngrams
+
+    def _features(self, text: str) -> List[str]:
+        words = _WORD.findall(text)
+        features = list(words)
+        features += [f"{a} {b}" for a, b in zip(words, words[1:])]
+        n = self.char_ngrams
+        if n:
+            padded = f" {text} "
+            features += [f"#{padded[i:i + n]}" for i in range(len(padded) - n + 1)]
+        return features
+
+    def embed(self, texts: Sequence[str]):
+        np = _numpy()
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+                vectors[row, h % self.dim] += 1.0 if (h >> 63) else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class SemanticIndex:
+    """
+    Growable matrix of unit vectors with a vectorized nearest-neighbour search.
+
+    Up to ``exact_limit`` rows every query is scored against all rows with one
+    matrix-vector product. Beyond that, random-hyperplane LSH tables pick the
+    candidate rows, and only those are scored, which keeps lookups under a
+    millisecond at a million entries.
+
+    With ``max_entries`` set, the index holds at most that many rows; once full,
+    each new row replaces the oldest one (FIFO).
+
+    Args:
+        dim (int): Vector size.
+        exact_limit (int): Row count up to which search is exhaustive.
+        n_tables (int): Number of LSH tables.
+        n_bits (int): Hyperplanes (signature bits) per table.
+        seed (int): Seed for the hyperplanes.
+        max_entries (int, optional): Maximum number of rows; None for no limit.
+    """
+    def __init__(self, dim: int, exact_limit: int = 50000, n_tables: int = 16, n_bits: int = 14, seed: int = 0, max_entries: int = None):
+        np = self._np = _numpy()
+        self.dim = dim
+        self.exact_limit = exact_limit
+        self.max_entries = max_entries
+        # Rows ever added; the next row goes to slot ``_added % max_entries``
+        self._added = 0
+        self.values: List[Any] = []
+        self._matrix = np.zeros((1024, dim), dtype=np.float32)
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self._planes = np.random.default_rng(seed).standard_normal((dim, n_tables * n_bits)).astype(np.float32)
+        self._weights = 1 << np.arange(n_bits, dtype=np.int64)
+        self._signatures = np.zeros((1024, n_tables), dtype=np.int64)
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(n_tables)]
+
+    def __len__(self):
+        return len(self.values)
+
+    def _signature(self, vectors):
+        # (n, dim) -> (n, tables) integer bucket ids, one sign bit per hyperplane
+        bits = (vectors @ self._planes).reshape(len(vectors), self.n_tables, self.n_bits) > 0
+        return bits.astype(self._np.int64) @ self._weights
+
+    def add(self, vector, value: Any):
+        """Append a unit ``vector`` with its cached ``value``."""
+        self.extend(vector[None, :], [value])
+
+    def extend(self, vectors, values: Sequence[Any]):
+        """Append a batch of unit ``vectors`` (one row per value), evicting the oldest rows if full."""
+        np = self._np
+        values = list(values)
+        if self.max_entries is not None and len(values) > self.max_entries:
+            vectors, values = vectors[-self.max_entries:], values[-self.max_entries:]
+        slots = self._added + np.arange(len(values))
+        if self.max_entries is not None:
+            slots %= self.max_entries
+        n = len(self.values)
+        self._unindex(slots[slots < n])
+        stop = int(slots.max()) + 1 if len(slots) else 0
+        if stop > len(self._matrix):
+            size = max(stop, 2 * len(self._matrix))
+            if self.max_entries is not None:
+                size = min(size, self.max_entries)
+            self._matrix = np.concatenate([self._matrix, np.zeros((size - len(self._matrix), self.dim), dtype=np.float32)])
+            self._signatures = np.concatenate([self._signatures, np.zeros((size - len(self._signatures), self._signatures.shape[1]), dtype=np.int64)])
+        self._matrix[slots] = vectors
+        signatures = self._signature(self._matrix[slots])
+        self._signatures[slots] = signatures
+        for table, buckets in enumerate(self._buckets):
+            # Group the new rows by bucket so each bucket list is extended once
+            order = np.argsort(signatures[:, table], kind="stable")
+            keys, starts = np.unique(signatures[order, table], return_index=True)
+            rows = slots[order].tolist()
+            bounds = starts.tolist() + [len(rows)]
+            for i, bucket in enumerate(keys.tolist()):
+                buckets.setdefault(bucket, []).extend(rows[bounds[i]:bounds[i + 1]])
+        for slot, value in zip(slots.tolist(), values):
+            if slot < len(self.values):
+                self.values[slot] = value
+            else:
+                self.values.append(value)
+        self._added += len(values)
+
+    def _unindex(self, rows):
+        # Drop evicted rows from the LSH buckets before their slots are reused
+        for table, buckets in enumerate(self._buckets):
+            for row, bucket in zip(rows.tolist(), self._signatures[rows, table].tolist()):
+                members = buckets[bucket]
+                members.remove(row)
+                if not members:
+                    del buckets[bucket]
+
+    def search(self, vector) -> Tuple[int, float]:
+        """Return ``(row, cosine similarity)`` of the closest vector, or ``(-1, -1.0)`` if the index is empty."""
+        np = self._np
+        n = len(self.values)
+        if n == 0:
+            return -1, -1.0
+        if n <= self.exact_limit:
+            scores = self._matrix[:n] @ vector
+            row = int(np.argmax(scores))
+            return row, float(scores[row])
+        signature = self._signature(vector[None, :])[0].tolist()
+        # A row may appear in several tables; duplicates do not change the argmax
+        rows = np.fromiter(chain.from_iterable(self._buckets[t].get(b, ()) for t, b in enumerate(signature)), dtype=np.int64)
+        if not len(rows):
+            return -1, -1.0
+        scores = self._matrix[rows] @ vector
+        best = int(np.argmax(scores))
+        return int(rows[best]), float(scores[best])
+
+
+class SemanticCachedService(ServiceWrapper):
+    """
+    Wraps a provider with a semantic cache tier.
+
+    A call is answered from the cache when an earlier prompt for the same
+    provider, model, settings and ``result_object`` has a cosine similarity of
+    at least ``threshold`` after normalization and contains the same numbers.
+
+    Calls may pass ``semantic_key`` (a string, or a mapping such as the
+    template variables) to be embedded instead of the prompt; it is not
+    forwarded to the provider. A key must identify the whole request, so
+    include the template name in it when several templates share variables.
+
+    Args:
+        service: The provider (or another wrapper, e.g. ``CachedService``) to call on a miss.
+        embedder (optional): Object with ``embed(texts)``; defaults to ``HashingEmbedder()``.
+        threshold (float): Minimum cosine similarity for a hit. With the default
+            embedder, texts that differ by a single word already score
+            around 0.9, so lower values trade correctness for hit rate.
+        normalize (callable): Prompt normalization applied before embedding.
+        max_entries (int, optional): Answers kept per scope (provider, model,
+            settings and schema); the oldest are evicted first. None for no limit.
+        max_scopes (int, optional): Scopes kept; the least recently used scope is
+            dropped first. None for no limit.
+    """
+    def __init__(
+        self,
+        service,
+        embedder=None,
+        threshold: float = 0.97,
+        normalize=normalize_prompt,
+        max_entries: Optional[int] = 100000,
+        max_scopes: Optional[int] = 64,
+    ):
+        super().__init__(service)
+        self.embedder = embedder if embedder is not None else HashingEmbedder()
+        self.threshold = threshold
+        self.normalize = normalize
+        self.max_entries = max_entries
+        self.max_scopes = max_scopes
+        self.hits = 0
+        self.misses = 0
+        self._indexes: "OrderedDict[str, SemanticIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, prompt: str, result_object: type, kwargs: dict):
+        # Taken out of kwargs, so it is neither forwarded to the provider nor part of the scope
+        key = kwargs.pop("semantic_key", None)
+        # Similar prompts only match within the same provider/model/settings/schema
+        scope = make_cache_key(self.service, "", result_object, kwargs)
+        text = self.normalize(prompt if key is None else _key_text(key))
+        vector = self.embedder.embed([text])[0]
+        # Embeddings barely separate "under 5" from "under 12", so numbers must match exactly
+        entry = (tuple(_NUMBER.findall(text)), vector)
+        with self._lock:
+            index = self._indexes.get(scope)
+            if index is not None:
+                self._indexes.move_to_end(scope)
+                row, score = index.search(vector)
+                if row >= 0 and score >= self.threshold and index.values[row][0] == entry[0]:
+                    self.hits += 1
+                    return scope, entry, index.values[row][1], True
+            self.misses += 1
+        return scope, entry, MISSING, False
+
+    def _store(self, scope: str, entry, value: Any):
+        numbers, vector = entry
+        with self._lock:
+            index = self._indexes.get(scope)
+            if index is None:
+                index = self._indexes[scope] = SemanticIndex(len(vector), max_entries=self.max_entries)
+                while self.max_scopes is not None and len(self._indexes) > self.max_scopes:
+                    self._indexes.popitem(last=False)
+            else:
+                self._indexes.move_to_end(scope)
+            index.add(vector, (numbers, value))
+
+    def lookup(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        """
+        Return the cached answer for ``prompt`` (or ``semantic_key``, if passed)
+        without calling the provider, or ``MISSING`` on a miss (a cached answer
+        may itself be None).
+        """
+        return self._lookup(prompt, result_object, kwargs)[2]
+
+    def generate(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        scope, entry, value, hit = self._lookup(prompt, result_object, kwargs)
+        if hit:
+            return value
+        value = self.service.generate(prompt, result_object=result_object, **kwargs)
+        self._store(scope, entry, value)
+        return value
+
+    async def agenerate(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        scope, entry, value, hit = self._lookup(prompt, result_object, kwargs)
+        if hit:
+            return value
+        value = await self.service.agenerate(prompt, result_object=result_object, **kwargs)
+        self._store(scope, entry, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
@@ -0,0 +1,113 @@
+"""
+In-flight request coalescing ("single-flight").
+
+While a call for a key is running, identical calls wait for it instead of
+starting their own, and every caller receives the same result or exception.
+Nothing is kept once the call finishes, so this complements rather than
+replaces ``CachedService``.
+
+Example:
+    service = SingleFlightService(get_llm_service())
+    # 50 threads asking the same FAQ prompt at once -> one upstream request
+"""
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from .providers._base import ServiceWrapper
+from .response_cache import make_cache_key
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key, across threads and asyncio tasks.
+
+    Threads and tasks are grouped separately: ``do`` for threads, ``ado`` for
+    tasks of one event loop.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Future]]" = weakref.WeakKeyDictionary()
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run ``fn()`` unless a call for ``key`` is already running, in which case wait for its outcome."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        else:
+            call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async version of ``do``; ``fn`` returns an awaitable.
+
+        The upstream call runs as its own task, so cancelling one waiter
+        (even the first) does not cancel it for the others.
+        """
+        loop = asyncio.get_running_loop()
+        tasks = self._tasks.get(loop)
+        if tasks is None:
+            tasks = self._tasks[loop] = {}
+        task = tasks.get(key)
+        if task is None:
+            task = tasks[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda t: tasks.pop(key, None) if tasks.get(key) is t else None)
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def __len__(self):
+        return len(self._calls) + sum(len(t) for t in self._tasks.values())
+
+
+class SingleFlightService(ServiceWrapper):
+    """
+    Wraps a provider so that concurrent identical calls share one upstream request.
+
+    Calls are matched with the response-cache key (provider, model, prompt,
+    settings, kwargs and ``result_object`` schema). Every caller receives the
+    same result object, or the same exception.
+
+    Args:
+        service: The provider (or another wrapper) to call.
+        group (SingleFlight, optional): Share a group between several wrappers.
+    """
+    def __init__(self, service, group: SingleFlight = None):
+        super().__init__(service)
+        self.group = group if group is not None else SingleFlight()
+
+    def generate(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        key = make_cache_key(self.service, prompt, result_object, kwargs)
+        return self.group.do(key, lambda: self.service.generate(prompt, result_object=result_object, **kwargs))
+
+    async def agenerate(self, prompt: str, *, result_object: type = None, **kwargs) -> Any:
+        key = make_cache_key(self.service, prompt, result_object, kwargs)
+        return await self.group.ado(key, lambda: self.service.agenerate(prompt, result_object=result_object, **kwargs))
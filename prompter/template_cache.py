@@ -0,0 +1,143 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from .prompt import ParsedTemplate, parse_template
+
+
+class _Entry:
+    __slots__ = ('value', 'mtime_ns', 'size', 'checked_at')
+
+    def __init__(self, value, mtime_ns, size, checked_at):
+        self.value = value
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.checked_at = checked_at
+
+
+class TemplateCache:
+    """
+    Bounded LRU cache of parsed prompt templates, keyed by resolved path.
+
+    By default a template is read and parsed once and then served from memory
+    for the life of the process. With ``hot_reload`` enabled, a cached entry is
+    re-validated against the file's mtime and size at most once every
+    ``check_interval`` seconds, so long-running servers pick up edits without
+    a restart and without a stat() on every request.
+
+    Args:
+        maxsize (int): Maximum number of templates kept in memory.
+        hot_reload (bool): Re-validate cached templates against the filesystem.
+        check_interval (float): Minimum seconds between two checks of the same path.
+
+    Example:
+        cache = TemplateCache(maxsize=128, hot_reload=True, check_interval=2.0)
+        parsed = cache.get('/srv/templates/qa/qa.prompt')
+    """
+    def __init__(self, maxsize: int = 256, hot_reload: bool = False, check_interval: float = 1.0):
+        self.maxsize = maxsize
+        self.hot_reload = hot_reload
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._dirs = {}
+        self._lock = threading.Lock()
+
+    def set_hot_reload(self, enabled: bool = True, check_interval: float = None):
+        """Turn hot-reload mode on or off, optionally changing the check interval."""
+        self.hot_reload = enabled
+        if check_interval is not None:
+            self.check_interval = check_interval
+
+    def _is_fresh(self, entry: _Entry, path: str, now: float) -> bool:
+        if not self.hot_reload or now - entry.checked_at < self.check_interval:
+            return True
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        entry.checked_at = now
+        return st.st_mtime_ns == entry.mtime_ns and st.st_size == entry.size
+
+    def get(self, path: str) -> ParsedTemplate:
+        """
+        Return the parsed template stored at ``path``, reading it only on a miss.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        key = os.path.realpath(path)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_fresh(entry, key, now):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value
+            self.misses += 1
+        with open(key, 'r', encoding='utf-8') as f:
+            st = os.fstat(f.fileno())
+            parsed = parse_template(f.read())
+        with self._lock:
+            self._entries[key] = _Entry(parsed, st.st_mtime_ns, st.st_size, now)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return parsed
+
+    def find(self, directory: str, suffix: str = '.prompt') -> Optional[str]:
+        """
+        Return the path of the first file in ``directory`` ending with ``suffix``.
+
+        The directory listing is cached the same way as templates, keyed on the
+        directory's mtime in hot-reload mode. Returns ``None`` if no file matches.
+        """
+        key = (os.path.realpath(directory), suffix)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._dirs.get(key)
+            if entry is not None and self._is_fresh(entry, key[0], now):
+                return entry.value
+        st = os.stat(key[0])
+        found = None
+        for fname in os.listdir(key[0]):
+            if fname.endswith(suffix):
+                found = os.path.join(directory, fname)
+                break
+        with self._lock:
+            self._dirs[key] = _Entry(found, st.st_mtime_ns, st.st_size, now)
+        return found
+
+    def invalidate(self, path: str = None):
+        """Drop one cached path (template or directory), or everything if ``path`` is None."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._dirs.clear()
+                return
+            key = os.path.realpath(path)
+            self._entries.pop(key, None)
+            for dir_key in [k for k in self._dirs if k[0] == key]:
+                del self._dirs[dir_key]
+
+    clear = invalidate
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Process-wide cache used by Prompt.load_template and Prompt.from_type
+default_cache = TemplateCache()
+
+
+def enable_hot_reload(check_interval: float = 1.0):
+    """Enable hot-reload mode on the process-wide template cache."""
+    default_cache.set_hot_reload(True, check_interval)
+
+
+def disable_hot_reload():
+    """Disable hot-reload mode on the process-wide template cache."""
+    default_cache.set_hot_reload(False)
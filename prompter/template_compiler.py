@@ -0,0 +1,173 @@
+import re
+import codecs
+from typing import Any, Dict, Iterator, List, Mapping, NamedTuple, Tuple
+
+PLACEHOLDER_PATTERN = re.compile(r'{{\s*(\w+)\s*}}')
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def is_stream(value: Any) -> bool:
+    """True for file-like objects and iterators, which are streamed rather than str()-ed."""
+    return hasattr(value, 'read') or hasattr(value, '__next__')
+
+
+def iter_value_chunks(value: Any, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Yield the text of a placeholder value in pieces of at most ``chunk_size`` characters.
+
+    File-like values are read ``chunk_size`` at a time (bytes are decoded as
+    UTF-8), iterators are consumed item by item, and anything else is
+    converted with ``str`` and sliced.
+    """
+    if hasattr(value, 'read'):
+        decoder = None
+        while True:
+            data = value.read(chunk_size)
+            if not data:
+                break
+            if isinstance(data, bytes):
+                decoder = decoder or codecs.getincrementaldecoder('utf-8')()
+                data = decoder.decode(data)
+            if data:
+                yield data
+        if decoder is not None:
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                yield tail
+        return
+    if hasattr(value, '__next__'):
+        for item in value:
+            yield from iter_value_chunks(item, chunk_size)
+        return
+    if isinstance(value, bytes):
+        value = value.decode('utf-8')
+    elif not isinstance(value, str):
+        value = str(value)
+    if len(value) <= chunk_size:
+        if value:
+            yield value
+        return
+    for start in range(0, len(value), chunk_size):
+        yield value[start:start + chunk_size]
+
+
+class Placeholder(NamedTuple):
+    """
+    A ``{{name}}`` slot found in a template.
+
+    Attributes:
+        name (str): The placeholder name, e.g. 'question'.
+        start (int): Offset of the opening braces in the template source.
+        end (int): Offset just past the closing braces.
+        raw (str): The placeholder text as written, e.g. '{{ question }}'.
+        index (int): Position of the slot in ``CompiledTemplate.parts``.
+    """
+    name: str
+    start: int
+    end: int
+    raw: str
+    index: int
+
+
+class CompiledTemplate:
+    """
+    A template split once into literal segments and placeholder slots.
+
+    ``parts`` is a flat list in which literal text and placeholder slots
+    follow each other in template order. Slots hold the raw placeholder text,
+    so a placeholder without a value renders unchanged. Rendering copies the
+    list, fills the slots and joins it; no regex runs at render time.
+
+    Example:
+        compiled = CompiledTemplate("Question: {{question}}")
+        compiled.names          # ('question',)
+        compiled.render({"question": "Why?"})
+    """
+    __slots__ = ('source', 'parts', 'placeholders', 'names', '_slots')
+
+    def __init__(self, source: str):
+        parts: List[str] = []
+        placeholders: List[Placeholder] = []
+        slots: Dict[str, List[int]] = {}
+        pos = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            if match.start() > pos:
+                parts.append(source[pos:match.start()])
+            name = match.group(1)
+            placeholders.append(Placeholder(name, match.start(), match.end(), match.group(0), len(parts)))
+            slots.setdefault(name, []).append(len(parts))
+            parts.append(match.group(0))
+            pos = match.end()
+        if pos < len(source):
+            parts.append(source[pos:])
+        self.source = source
+        self.parts: Tuple[str, ...] = tuple(parts)
+        self.placeholders: Tuple[Placeholder, ...] = tuple(placeholders)
+        self.names: Tuple[str, ...] = tuple(slots)
+        self._slots: Tuple[Tuple[str, Tuple[int, ...]], ...] = tuple((k, tuple(v)) for k, v in slots.items())
+
+    def __repr__(self):
+        return f"CompiledTemplate(names={self.names!r})"
+
+    def positions(self, name: str) -> List[Tuple[int, int]]:
+        """Return the (start, end) source offsets of every occurrence of ``name``."""
+        return [(p.start, p.end) for p in self.placeholders if p.name == name]
+
+    def missing(self, values: Mapping[str, Any]) -> List[str]:
+        """Return the placeholder names that have no value in ``values``."""
+        return [name for name in self.names if values.get(name) is None]
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        """
+        Fill the placeholder slots from ``values`` and join the result.
+
+        Values are converted with ``str`` (file-like and iterator values are
+        read to the end); names that are missing or map to ``None`` keep their
+        raw placeholder text.
+        """
+        out = list(self.parts)
+        for name, indexes in self._slots:
+            value = values.get(name)
+            if value is not None:
+                value = ''.join(iter_value_chunks(value)) if is_stream(value) else str(value)
+                for i in indexes:
+                    out[i] = value
+        return ''.join(out)
+
+    def iter_render(self, values: Mapping[str, Any], chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: str = None) -> Iterator:
+        """
+        Yield the rendered text piece by piece instead of building one string.
+
+        Literal segments are yielded as they are and values via
+        ``iter_value_chunks``, so file-like and iterator values are never held
+        in memory whole. A stream value used by several placeholders can only
+        be consumed once; the later slots receive whatever is left.
+
+        Args:
+            values: Placeholder values, as for ``render``.
+            chunk_size (int): Maximum characters per yielded value chunk.
+            encoding (str, optional): If set, yield bytes encoded with it.
+        """
+        slot_names = {p.index: p.name for p in self.placeholders}
+        for i, part in enumerate(self.parts):
+            name = slot_names.get(i)
+            value = None if name is None else values.get(name)
+            if value is None:
+                chunks = (part,)
+            else:
+                chunks = iter_value_chunks(value, chunk_size)
+            for chunk in chunks:
+                yield chunk.encode(encoding) if encoding else chunk
+
+    def render_to(self, writer, values: Mapping[str, Any], chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: str = None) -> int:
+        """
+        Write the rendered text to ``writer`` (anything with ``write``) chunk by chunk.
+
+        Returns the number of characters (or bytes, with ``encoding``) written.
+        """
+        written = 0
+        for chunk in self.iter_render(values, chunk_size, encoding):
+            writer.write(chunk)
+            written += len(chunk)
+        return written
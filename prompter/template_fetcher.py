@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Optional
+
+
+def _default_cache_dir() -> str:
+    base = os.environ.get('PROMPTER_CACHE_DIR')
+    if not base:
+        # XDG says relative paths in XDG_CACHE_HOME are invalid and must be ignored
+        xdg = os.environ.get('XDG_CACHE_HOME')
+        if not xdg or not os.path.isabs(xdg):
+            xdg = os.path.join(os.path.expanduser('~'), '.cache')
+        base = os.path.join(xdg, 'prompter')
+    return os.path.join(base, 'templates')
+
+
+def _is_unavailable(exc: Exception) -> bool:
+    """True if ``exc`` means the server could not answer (network error, timeout or 5xx)."""
+    try:
+        import requests
+    except ImportError:
+        return False
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+        return True
+    response = getattr(exc, 'response', None)
+    return isinstance(exc, requests.HTTPError) and response is not None and response.status_code >= 500
+
+
+class TemplateFetcher:
+    """
+    Fetch URL-hosted templates through a pooled session and an on-disk cache.
+
+    Responses are stored on disk together with their ETag and Last-Modified
+    validators. A cached template younger than ``max_age`` is served without
+    touching the network. Past that, it is still served immediately for up to
+    ``stale_while_revalidate`` seconds while a background conditional GET
+    refreshes it; older entries are revalidated before being returned. If the
+    server cannot be reached, times out or answers 5xx, a stale copy is served
+    rather than failing; any other error (e.g. 404 or 410 for a removed
+    template) is raised, and a background refresh that hits one expires the
+    cached copy so the next fetch raises it.
+
+    Args:
+        cache_dir (str, optional): Directory for cached templates. Defaults to
+            ``$PROMPTER_CACHE_DIR/templates``, else
+            ``$XDG_CACHE_HOME/prompter/templates`` (``~/.cache`` if unset).
+        max_age (float): Seconds a cached template is considered fresh.
+        stale_while_revalidate (float): Extra seconds a stale template may be served
+            while it is refreshed in the background.
+        timeout (float): Connect/read timeout for HTTP requests, in seconds.
+        session (requests.Session, optional): Session to use instead of a new one.
+
+    Example:
+        fetcher = TemplateFetcher(max_age=60)
+        text = fetcher.fetch("https://templates.internal/qa.prompt")
+    """
+    def __init__(self, cache_dir: str = None, max_age: float = 300.0, stale_while_revalidate: float = 86400.0,
+                 timeout: float = 10.0, session=None):
+        self.cache_dir = cache_dir or _default_cache_dir()
+        self.max_age = max_age
+        self.stale_while_revalidate = stale_while_revalidate
+        self.timeout = timeout
+        self._session = session
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+    @property
+    def session(self):
+        if self._session is None:
+            from .providers._import_utils import require_package
+            requests = require_package('requests', extra='requests')
+            with self._lock:
+                if self._session is None:
+                    self._session = requests.Session()
+        return self._session
+
+    def _paths(self, url: str):
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, digest)
+        return base + '.prompt', base + '.json'
+
+    def _load(self, url: str):
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'r', encoding='utf-8') as f:
+                return f.read(), meta
+        except (OSError, ValueError):
+            return None, None
+
+    def _write(self, path: str, data: str):
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _store(self, url: str, body: Optional[str], meta: Dict):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        body_path, meta_path = self._paths(url)
+        if body is not None:
+            self._write(body_path, body)
+        self._write(meta_path, json.dumps(meta))
+
+    def _revalidate(self, url: str, body: Optional[str], meta: Optional[Dict]) -> str:
+        headers = {}
+        if body is not None and meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and body is not None:
+            meta = dict(meta, fetched_at=time.time())
+            self._store(url, None, meta)
+            return body
+        response.raise_for_status()
+        meta = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+        }
+        self._store(url, response.text, meta)
+        return response.text
+
+    def _refresh_in_background(self, url: str, body: str, meta: Dict):
+        with self._lock:
+            if url in self._refreshing:
+                return
+            self._refreshing.add(url)
+
+        def run():
+            try:
+                self._revalidate(url, body, meta)
+            except Exception as exc:
+                # The stale copy stays in place; the next fetch retries.
+                # Other errors expire it so that fetch() revalidates and raises.
+                if not _is_unavailable(exc):
+                    try:
+                        self._store(url, None, dict(meta, fetched_at=0))
+                    except OSError:
+                        pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(url)
+
+        threading.Thread(target=run, name='prompter-template-refresh', daemon=True).start()
+
+    def fetch(self, url: str) -> str:
+        """
+        Return the template text at ``url``, using the on-disk cache when possible.
+
+        Raises:
+            requests.HTTPError: If the server answers with a 4xx error, or with a
+                5xx error and nothing is cached.
+            requests.ConnectionError: If the server cannot be reached and
+                nothing is cached.
+        """
+        body, meta = self._load(url)
+        if body is None:
+            return self._revalidate(url, None, None)
+        age = time.time() - meta.get('fetched_at', 0)
+        if age < self.max_age:
+            return body
+        if age < self.max_age + self.stale_while_revalidate:
+            self._refresh_in_background(url, body, meta)
+            return body
+        try:
+            return self._revalidate(url, body, meta)
+        except Exception as exc:
+            if _is_unavailable(exc):
+                return body
+            raise
+
+
+_default_fetcher = None
+_default_fetcher_lock = threading.Lock()
+
+
+def get_default_fetcher() -> TemplateFetcher:
+    """Return the process-wide TemplateFetcher used by PromptTemplateProcessor."""
+    global _default_fetcher
+    if _default_fetcher is None:
+        with _default_fetcher_lock:
+            if _default_fetcher is None:
+                _default_fetcher = TemplateFetcher()
+    return _default_fetcher
@@ -0,0 +1,137 @@
+from typing import Callable, List, Mapping
+
+from .template_compiler import CompiledTemplate
+from .prompt_context_builder import FormattedItems, LazyValue
+from .evaluation_plan import EvaluationPlan
+
+# Sections whose oldest items come first and should be dropped first
+DEFAULT_TRIM_FROM = {'history': 'head'}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token) used when no tokenizer is given."""
+    return (len(text) + 3) // 4
+
+
+class _Section:
+    __slots__ = ('name', 'items', 'costs', 'formatter', 'start', 'stop', 'head')
+
+    def __init__(self, name, items, costs, formatter, head):
+        self.name = name
+        self.items = items
+        self.costs = costs
+        self.formatter = formatter
+        self.start = 0
+        self.stop = len(items)
+        self.head = head
+
+    def drop_one(self) -> int:
+        if self.head:
+            self.start += 1
+            return self.costs[self.start - 1]
+        self.stop -= 1
+        return self.costs[self.stop]
+
+    @property
+    def empty(self) -> bool:
+        return self.start >= self.stop
+
+    def value(self):
+        return self.formatter(self.items[self.start:self.stop])
+
+
+def _sequence_formatter(kind):
+    # Renders a trimmed list or tuple the way the untrimmed one would render
+    return lambda items: str(kind(items))
+
+
+def render_within_budget(
+    compiled: CompiledTemplate,
+    context: Mapping[str, object],
+    budget: int,
+    priorities: Mapping[str, int],
+    count_tokens: Callable[[str], int] = None,
+    trim_from: Mapping[str, str] = None,
+) -> str:
+    """
+    Render ``compiled`` so that the prompt fits in ``budget`` tokens.
+
+    Only sections listed in ``priorities`` may be trimmed; everything else is
+    kept intact. Sections are trimmed in ascending priority order, one item at
+    a time. Item lists stored by ``PromptContextBuilder`` (``retrieved_docs``,
+    ``history``, ...), from ``build()`` or ``build_lazy()``, and plain list or
+    tuple values lose items from the tail, or from the head for sections
+    marked 'head' in ``trim_from`` (by default the oldest ``history`` items);
+    any other value is treated as a single item and dropped whole.
+
+    Every literal segment, value and item is tokenized once and the costs are
+    summed, so trimming only subtracts precomputed counts instead of
+    re-tokenizing the prompt.
+
+    Args:
+        compiled (CompiledTemplate): The compiled template.
+        context: The render context, typically from ``PromptContextBuilder.build()``.
+        budget (int): Maximum number of tokens for the rendered prompt.
+        priorities (dict): Section name -> priority; lower values are trimmed first.
+        count_tokens (callable, optional): Tokenizer returning a token count for a
+            string. Defaults to ``estimate_tokens``.
+        trim_from (dict, optional): Section name -> 'head' or 'tail'.
+
+    Returns:
+        str: The rendered prompt.
+
+    Raises:
+        ValueError: If the prompt cannot fit even after trimming every listed section.
+    """
+    count = count_tokens or estimate_tokens
+    trim_from = dict(DEFAULT_TRIM_FROM, **(trim_from or {}))
+    slot_indexes = {p.index for p in compiled.placeholders}
+    raw_text = {p.name: p.raw for p in compiled.placeholders}
+    occurrences = {}
+    for p in compiled.placeholders:
+        occurrences[p.name] = occurrences.get(p.name, 0) + 1
+
+    total = sum(count(part) for i, part in enumerate(compiled.parts) if i not in slot_indexes)
+    plan = EvaluationPlan(context)
+    values = {}
+    sections: List[_Section] = []
+    for name in compiled.names:
+        raw = context.raw(name) if hasattr(context, 'raw') and name in context else None
+        if name in priorities and isinstance(raw, LazyValue):
+            # Trimmed before formatting, so dropped items are never formatted
+            value = raw
+        else:
+            value = plan.value(name)
+        if name in priorities and isinstance(value, (LazyValue, FormattedItems)):
+            items, formatter = list(value.items), value.formatter
+            # Each item is costed with its bullet and line break
+            costs = [count(formatter([item]) + '\n') * occurrences[name] for item in items]
+        elif name in priorities and isinstance(value, (list, tuple)):
+            items, formatter = list(value), _sequence_formatter(tuple if isinstance(value, tuple) else list)
+            # Each item is costed with its separator
+            costs = [count(repr(item) + ', ') * occurrences[name] for item in items]
+        else:
+            items = None
+        if items is not None:
+            sections.append(_Section(name, items, costs, formatter, trim_from.get(name) == 'head'))
+            total += sum(costs)
+            continue
+        values[name] = value
+        text = raw_text[name] if value is None else str(value)
+        cost = count(text) * occurrences[name]
+        total += cost
+        if name in priorities and value is not None:
+            sections.append(_Section(name, [text], [cost], ''.join, False))
+
+    sections.sort(key=lambda s: priorities[s.name])
+    for section in sections:
+        while total > budget and not section.empty:
+            total -= section.drop_one()
+        if total <= budget:
+            break
+    if total > budget:
+        raise ValueError(f"Prompt needs about {total} tokens after trimming {', '.join(sorted(priorities))}; budget is {budget}.")
+
+    for section in sections:
+        values[section.name] = section.value()
+    return compiled.render(values)
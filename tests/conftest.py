@@ -0,0 +1,11 @@
+import pytest
+
+from prompter import llm_factory
+
+
+@pytest.fixture(autouse=True)
+def _fresh_llm_factory():
+    # Tests patch importlib/env vars, so cached classes and services must not leak between them
+    llm_factory.clear_cache()
+    yield
+    llm_factory.clear_cache()
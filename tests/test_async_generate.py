@@ -0,0 +1,74 @@
+import asyncio
+import json
+from dataclasses import dataclass
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from prompter.providers import _transport
+from prompter.providers.local_service import LocalLLMService
+from prompter.providers.ai21_service import AI21Service
+
+
+@dataclass
+class Answer:
+    answer: str
+    confidence: float
+
+
+@pytest.fixture
+def mock_http(monkeypatch):
+    requests = []
+    def install(handler):
+        def factory(provider):
+            clients = _transport._loop_clients()
+            key = ("http", provider)
+            if key not in clients:
+                clients[key] = httpx.AsyncClient(transport=httpx.MockTransport(lambda r: (requests.append(r), handler(r))[1]))
+            return clients[key]
+        monkeypatch.setattr(_transport, "get_async_http_client", factory)
+        return requests
+    yield install
+    _transport.reset()
+
+
+def test_local_agenerate(mock_http):
+    requests = mock_http(lambda r: httpx.Response(200, json={"text": "async output"}))
+    svc = LocalLLMService(endpoint_url="http://localhost:8000/generate", model="llama-test")
+
+    async def main():
+        return await asyncio.gather(*(svc.agenerate(f"p{i}") for i in range(5)))
+
+    assert asyncio.run(main()) == ["async output"] * 5
+    assert json.loads(requests[0].content)["model"] == "llama-test"
+
+
+def test_agenerate_result_object(mock_http):
+    body = {"completions": [{"data": {"text": '{"answer": "Paris", "confidence": 0.9}'}}]}
+    requests = mock_http(lambda r: httpx.Response(200, json=body))
+    svc = AI21Service(api_key="key")
+    result = asyncio.run(svc.agenerate("capital?", result_object=Answer))
+    assert result == Answer(answer="Paris", confidence=0.9)
+    assert "schema" in json.loads(requests[0].content)["prompt"]
+    assert requests[0].headers["Authorization"] == "Bearer key"
+
+
+def test_agenerate_http_error(mock_http):
+    mock_http(lambda r: httpx.Response(500, json={}))
+    svc = LocalLLMService(endpoint_url="http://localhost:8000/generate")
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(svc.agenerate("hello"))
+
+
+def test_async_http_client_shared_per_loop():
+    async def get():
+        return _transport.get_async_http_client("local"), _transport.get_async_http_client("local")
+
+    async def main():
+        a, b = await get()
+        await _transport.aclose()
+        return a, b
+
+    a, b = asyncio.run(main())
+    assert a is b
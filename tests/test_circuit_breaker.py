@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+
+from prompter.circuit_breaker import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakerService, CircuitOpenError, get_breaker, snapshot_all,
+)
+from prompter.router import Backend, RouterService
+
+
+class Unavailable(Exception):
+    status_code = 503
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+class FlakyService:
+    def __init__(self):
+        self.error = None
+        self.calls = 0
+
+    def generate(self, prompt, *, result_object=None, **kwargs):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return "ok"
+
+    async def agenerate(self, prompt, *, result_object=None, **kwargs):
+        return self.generate(prompt)
+
+
+def fail_n(service, n):
+    for _ in range(n):
+        with pytest.raises(Exception):
+            service.generate("q")
+
+
+def test_opens_on_failure_rate_and_fails_fast():
+    flaky = FlakyService()
+    svc = CircuitBreakerService(flaky, CircuitBreaker("t", window=10, min_calls=4, failure_rate=0.5))
+    svc.generate("q")
+    svc.generate("q")
+    flaky.error = Unavailable()
+    fail_n(svc, 1)
+    assert svc.breaker.state == CLOSED
+    fail_n(svc, 1)
+    assert svc.breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as excinfo:
+        svc.generate("q")
+    assert excinfo.value.retry_in > 0
+    assert flaky.calls == 4
+    assert svc.breaker.snapshot()["rejected"] == 1
+
+
+def test_client_errors_do_not_open():
+    flaky = FlakyService()
+    flaky.error = BadRequest()
+    svc = CircuitBreakerService(flaky, CircuitBreaker("t", min_calls=2))
+    fail_n(svc, 10)
+    assert svc.breaker.state == CLOSED
+
+
+def test_half_open_probes_close_or_reopen():
+    flaky = FlakyService()
+    flaky.error = Unavailable()
+    breaker = CircuitBreaker("t", min_calls=1, open_seconds=0.0, half_open_probes=2)
+    transitions = []
+    breaker.listeners.append(lambda b, old, new: transitions.append(new))
+    svc = CircuitBreakerService(flaky, breaker)
+    fail_n(svc, 1)
+    assert breaker._state == OPEN
+    assert breaker.state == HALF_OPEN
+    fail_n(svc, 1)  # failed probe reopens
+    flaky.error = None
+    svc.generate("q")
+    svc.generate("q")
+    assert breaker.state == CLOSED
+    assert transitions == [OPEN, HALF_OPEN, OPEN, HALF_OPEN, CLOSED]
+
+
+def test_half_open_limits_concurrent_probes():
+    breaker = CircuitBreaker("t", min_calls=1, open_seconds=0.0, half_open_probes=1)
+    breaker.before_call()
+    breaker.on_failure(Unavailable())
+    breaker.before_call()  # the single probe
+    assert not breaker.available
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.on_success()
+    assert breaker.state == CLOSED
+
+
+def test_cancelled_probe_frees_slot():
+    breaker = CircuitBreaker("t", min_calls=1, open_seconds=0.0, half_open_probes=1)
+    breaker.before_call()
+    breaker.on_failure(Unavailable())
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def main():
+        task = asyncio.ensure_future(breaker.acall(hang))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert breaker.available
+
+
+def test_registry_and_snapshot():
+    breaker = get_breaker("registry-test", min_calls=3)
+    assert get_breaker("registry-test") is breaker
+    assert any(s["name"] == "registry-test" and s["state"] == CLOSED for s in snapshot_all())
+
+
+def test_registry_warns_on_conflicting_options():
+    import warnings
+    breaker = get_breaker("conflict-test", min_calls=3)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert get_breaker("conflict-test", min_calls=3, failure_rate=0.5) is breaker
+    with pytest.warns(RuntimeWarning, match="min_calls=5"):
+        assert get_breaker("conflict-test", min_calls=5) is breaker
+    assert breaker.min_calls == 3
+
+
+def test_router_skips_open_circuit():
+    down, up = FlakyService(), FlakyService()
+    down.error = Unavailable()
+    breaker = CircuitBreaker("down", min_calls=1, open_seconds=60)
+    breaker.before_call()
+    breaker.on_failure(Unavailable())
+    router = RouterService([Backend("down", CircuitBreakerService(down, breaker)), Backend("up", up)])
+    for _ in range(20):
+        assert router.generate("q") == "ok"
+    assert down.calls == 0
+    assert {s["name"]: s["circuit"] for s in router.snapshot()} == {"down": OPEN, "up": None}
@@ -0,0 +1,130 @@
+import pytest
+from prompter.prompt_template_processor import PromptTemplateProcessor
+
+
+@pytest.fixture
+def processor(tmp_path):
+    path = tmp_path / 'qa.prompt'
+    path.write_text('{{role}}\nContext: {{context}}\nQuestion: {{question}} ({{context}})')
+    return PromptTemplateProcessor(str(path))
+
+
+def expected(role, contexts, questions):
+    return [f'{role}\nContext: {c}\nQuestion: {q} ({c})' for c, q in zip(contexts, questions)]
+
+
+def test_dict_of_lists(processor):
+    result = processor.render_columns(
+        {'ctx': ['a', 'b'], 'question': ['q1', 'q2']},
+        mapping={'context': 'ctx'},
+        constants={'role': 'Expert'},
+    )
+    assert result == expected('Expert', ['a', 'b'], ['q1', 'q2'])
+
+
+def test_missing_column_raises(processor):
+    with pytest.raises(ValueError) as excinfo:
+        processor.render_columns({'question': ['q1']}, constants={'role': 'r'})
+    assert 'context' in str(excinfo.value)
+
+
+def test_numpy_arrays(processor):
+    np = pytest.importorskip('numpy')
+    result = processor.render_columns(
+        {'role': np.array(['r1', 'r2']), 'context': np.array([1, 2]), 'question': np.array(['q1', 'q2'])}
+    )
+    assert result == ['r1\nContext: 1\nQuestion: q1 (1)', 'r2\nContext: 2\nQuestion: q2 (2)']
+
+
+def test_pandas_dataframe(processor):
+    pd = pytest.importorskip('pandas')
+    df = pd.DataFrame({'context': ['a', 'b'], 'question': ['q1', 'q2']}, index=[10, 20])
+    result = processor.render_columns(df, constants={'role': 'R'}, output='prompt')
+    assert list(result.index) == [10, 20]
+    assert result.tolist() == expected('R', ['a', 'b'], ['q1', 'q2'])
+
+
+def test_arrow_table(processor):
+    pa = pytest.importorskip('pyarrow')
+    table = pa.table({'context': ['a', None], 'question': ['q1', 'q2']})
+    result = processor.render_columns(table, constants={'role': 'R'})
+    assert result.type == pa.string()
+    assert result.to_pylist() == expected('R', ['a', ''], ['q1', 'q2'])
+
+
+def test_missing_values_render_empty(processor):
+    np = pytest.importorskip('numpy')
+    pd = pytest.importorskip('pandas')
+    pa = pytest.importorskip('pyarrow')
+    want = ['R\nContext: 1.5\nQuestion: q1 (1.5)', 'R\nContext: \nQuestion: q2 ()']
+    contexts = [1.5, float('nan')]
+    assert processor.render_columns({'context': contexts, 'question': ['q1', 'q2']}, constants={'role': 'R'}) == want
+    assert processor.render_columns({'context': [1.5, None], 'question': ['q1', 'q2']}, constants={'role': 'R'}) == want
+    assert processor.render_columns({'context': np.array(contexts), 'question': np.array(['q1', 'q2'])}, constants={'role': 'R'}) == want
+    df = pd.DataFrame({'context': [1.5, None], 'question': ['q1', None]})
+    assert processor.render_columns(df, constants={'role': 'R'}).tolist() == [want[0], 'R\nContext: \nQuestion:  ()']
+    table = pa.table({'context': pa.array(contexts, from_pandas=False), 'question': ['q1', 'q2']})
+    assert processor.render_columns(table, constants={'role': 'R'}).to_pylist() == want
+
+
+def test_dtypes_render_like_row_path(tmp_path):
+    np = pytest.importorskip('numpy')
+    pd = pytest.importorskip('pandas')
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'x.prompt'
+    path.write_text('x={{x}}')
+    processor = PromptTemplateProcessor(str(path))
+    columns = [
+        np.array([0.1, 2.5, 1e20], dtype='float32'),
+        pd.Series(np.array([0.1, 1.0, 3.25], dtype='float32')),
+        pd.Series(pd.to_datetime(['2024-01-02 00:00:00.0', None, '2024-03-04 05:06:07.5'])),
+        pd.Series(pd.to_datetime(['2024-01-02 03:04:05', None, None]).tz_localize('UTC')),
+        np.array(['2024-01-02', 'NaT', '2024-03-04'], dtype='datetime64[s]'),
+    ]
+    for column in columns:
+        rows = [processor.render({'x': column[i]}) for i in range(len(column))]
+        assert processor.render_columns({'x': column}) == rows
+    assert processor.render_columns({'x': columns[0]})[0] == 'x=0.1'
+    assert processor.render_columns({'x': columns[2]})[1] == 'x=NaT'
+
+
+def test_array_like_values_are_not_missing(tmp_path):
+    np = pytest.importorskip('numpy')
+    path = tmp_path / 'x.prompt'
+    path.write_text('x={{x}}')
+    processor = PromptTemplateProcessor(str(path))
+    column = np.empty(2, dtype=object)
+    column[0], column[1] = np.array([1, 2]), None
+    assert processor.render_columns({'x': column}) == ['x=[1 2]', 'x=']
+
+
+def test_parquet_batches(processor, tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    pq = pytest.importorskip('pyarrow.parquet')
+    n = 1000
+    table = pa.table({
+        'context': [f'c{i}' for i in range(n)],
+        'question': [f'q{i}' for i in range(n)],
+        'unused': list(range(n)),
+    })
+    path = tmp_path / 'rows.parquet'
+    pq.write_table(table, str(path))
+    batches = list(processor.iter_render_batches(str(path), batch_size=300, constants={'role': 'R'}))
+    assert [len(b) for b in batches] == [300, 300, 300, 100]
+    rendered = [s for b in batches for s in b.to_pylist()]
+    assert rendered == expected('R', [f'c{i}' for i in range(n)], [f'q{i}' for i in range(n)])
+
+
+def test_arrow_ipc_file(processor, tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    table = pa.table({'role': ['r'] * 4, 'context': list('abcd'), 'question': list('wxyz')})
+    path = tmp_path / 'rows.arrow'
+    with pa.OSFile(str(path), 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            for batch in table.to_batches(max_chunksize=2):
+                writer.write_batch(batch)
+    batches = list(processor.iter_render_batches(str(path)))
+    assert len(batches) == 2
+    assert [s for b in batches for s in b.to_pylist()] == [
+        f'r\nContext: {c}\nQuestion: {q} ({c})' for c, q in zip('abcd', 'wxyz')
+    ]
@@ -0,0 +1,58 @@
+import pytest
+from prompter.evaluation_plan import EvaluationPlan, get_parameters
+from prompter.prompt import Prompt
+from prompter.prompt_template_processor import PromptTemplateProcessor
+
+
+def test_callable_evaluated_once_per_render(tmp_path):
+    path = tmp_path / 'rag.prompt'
+    path.write_text('{{docs}}\n---\n{{docs}}\n{{summary}}')
+    processor = PromptTemplateProcessor(str(path))
+    calls = []
+    def docs(query):
+        calls.append(query)
+        return f'docs for {query}'
+    result = processor.render({'docs': docs, 'summary': lambda docs: docs.upper(), 'query': 'q'})
+    assert result == 'docs for q\n---\ndocs for q\nDOCS FOR Q'
+    assert calls == ['q']
+
+
+def test_dependency_order():
+    context = {'c': lambda b: b + 'c', 'b': lambda a: a + 'b', 'a': lambda: 'a'}
+    plan = EvaluationPlan(context)
+    assert plan.value('c') == 'abc'
+    assert plan.order == ['a', 'b', 'c']
+
+
+def test_cycle_detected():
+    context = {'a': lambda b: b, 'b': lambda a: a}
+    with pytest.raises(ValueError) as excinfo:
+        EvaluationPlan(context).value('a')
+    assert 'a -> b -> a' in str(excinfo.value)
+
+
+def test_signature_cached_per_function(monkeypatch):
+    import inspect
+    def f(a, b=1):
+        return a
+    assert get_parameters(f) == (('a', True), ('b', False))
+    monkeypatch.setattr(inspect, 'signature', lambda *a, **k: pytest.fail('signature recomputed'))
+    assert get_parameters(f) == (('a', True), ('b', False))
+
+
+def test_bound_method_parameters():
+    class Retriever:
+        def fetch(self, query):
+            return query
+    assert get_parameters(Retriever().fetch) == (('query', True),)
+    assert get_parameters(Retriever().fetch) == (('query', True),)
+
+
+def test_prompt_callable_evaluated_once():
+    calls = []
+    def context():
+        calls.append(1)
+        return 'ctx'
+    prompt = Prompt('{{context}} / {{question}}').context(context).question(lambda context: context + '?')
+    assert prompt.render() == 'ctx / ctx?'
+    assert calls == [1]
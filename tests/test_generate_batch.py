@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+
+import pytest
+
+from prompter.providers._base import BaseLLMService, BatchResult, ServiceWrapper
+
+
+@dataclass
+class Answer:
+    answer: str
+
+
+class EchoService(BaseLLMService):
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, *, result_object=None, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            # Later prompts finish first, so completion order differs from input order
+            time.sleep(self.delay / (1 + int(prompt.split()[-1])))
+            if prompt.startswith("fail"):
+                raise RuntimeError(prompt)
+            if result_object is not None:
+                return result_object(answer=prompt)
+            return prompt.upper()
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def test_generate_batch_keeps_input_order_and_captures_errors():
+    svc = EchoService(delay=0.02)
+    prompts = [f"p {i}" for i in range(10)] + ["fail 10"]
+    results = svc.generate_batch(prompts, concurrency=4)
+    assert [r.index for r in results] == list(range(11))
+    assert [r.result for r in results[:10]] == [f"P {i}" for i in range(10)]
+    assert not results[10].ok
+    assert isinstance(results[10].error, RuntimeError)
+    assert svc.peak <= 4
+
+
+def test_generate_batch_per_item_result_object():
+    svc = EchoService()
+    results = svc.generate_batch(["a 0", "b 1"], result_object=[Answer, None])
+    assert results[0].result == Answer(answer="a 0")
+    assert results[1].result == "B 1"
+    with pytest.raises(ValueError):
+        svc.generate_batch(["a 0", "b 1"], result_object=[Answer])
+
+
+def test_generate_as_completed_yields_every_item():
+    svc = EchoService(delay=0.05)
+    results = list(svc.generate_as_completed([f"p {i}" for i in range(6)], concurrency=6))
+    assert sorted(r.index for r in results) == list(range(6))
+    assert all(isinstance(r, BatchResult) and r.ok for r in results)
+    assert results[0].index != 0
+
+
+def test_agenerate_batch_bounds_concurrency():
+    class AsyncEcho(BaseLLMService):
+        active = peak = 0
+
+        async def agenerate(self, prompt, *, result_object=None, **kwargs):
+            AsyncEcho.active += 1
+            AsyncEcho.peak = max(AsyncEcho.peak, AsyncEcho.active)
+            await asyncio.sleep(0.001)
+            AsyncEcho.active -= 1
+            if prompt == "bad":
+                raise ValueError(prompt)
+            return prompt * 2
+
+    results = asyncio.run(AsyncEcho().agenerate_batch(["a", "bad", "c"] * 5, concurrency=3))
+    assert [r.result for r in results[:3]] == ["aa", None, "cc"]
+    assert isinstance(results[1].error, ValueError)
+    assert AsyncEcho.peak <= 3
+
+
+def test_agenerate_falls_back_to_generate():
+    assert asyncio.run(EchoService().agenerate("x 0")) == "X 0"
+
+
+def test_service_wrapper_forwards_calls_and_attributes():
+    import copy
+    from prompter.response_cache import CachedService
+    from prompter.retry import RetryingService
+    service = EchoService(delay=0.25)
+    wrapped = CachedService(RetryingService(ServiceWrapper(service)))
+    assert wrapped.generate("x 0") == "X 0"
+    assert asyncio.run(wrapped.agenerate("x 1")) == "X 1"
+    assert wrapped.delay == 0.25
+    with pytest.raises(NotImplementedError):
+        wrapped.generate_stream("x 0")
+    # A wrapper whose __init__ has not run does not recurse looking for ``service``
+    assert copy.copy(ServiceWrapper(service)).service is service
+    with pytest.raises(AttributeError):
+        ServiceWrapper.__new__(ServiceWrapper).model
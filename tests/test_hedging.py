@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+from prompter.hedging import HedgedService, LatencyTracker
+
+
+class SlowFirstService:
+    """The first call is slow; later calls are fast."""
+    def __init__(self, slow=0.5, fast=0.01):
+        self.slow = slow
+        self.fast = fast
+        self.calls = 0
+        self.cancelled = 0
+
+    def _delay(self):
+        self.calls += 1
+        return self.slow if self.calls == 1 else self.fast
+
+    def generate(self, prompt, *, result_object=None, **kwargs):
+        delay = self._delay()
+        time.sleep(delay)
+        return f"{prompt}@{delay}"
+
+    async def agenerate(self, prompt, *, result_object=None, **kwargs):
+        delay = self._delay()
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return f"{prompt}@{delay}"
+
+
+def test_latency_percentile():
+    tracker = LatencyTracker(window=100)
+    assert tracker.percentile(95) is None
+    for i in range(1, 101):
+        tracker.record(i / 100)
+    assert tracker.percentile(50) == 0.5
+    assert tracker.percentile(95) == 0.95
+
+
+def test_sync_hedge_wins_over_slow_primary():
+    svc = SlowFirstService()
+    hedged = HedgedService(svc, initial_delay=0.05, budget=1.0)
+    started = time.monotonic()
+    assert hedged.generate("q") == "q@0.01"
+    assert time.monotonic() - started < 0.4
+    assert hedged.hedged == 1 and hedged.hedge_wins == 1
+
+
+def test_primary_latency_recorded_when_hedge_wins():
+    svc = SlowFirstService(slow=0.3)
+    hedged = HedgedService(svc, initial_delay=0.05, budget=1.0)
+    assert hedged.generate("q") == "q@0.01"
+    # The hedge answered, but the window gets the slow primary once it finishes
+    deadline = time.monotonic() + 2
+    while len(hedged.latency) < 1:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert len(hedged.latency) == 1
+    assert hedged.latency.percentile(100) >= 0.3
+
+
+def test_async_loser_is_cancelled_and_alternate_used():
+    svc = SlowFirstService()
+    alternate = SlowFirstService(slow=0.01)
+    hedged = HedgedService(svc, alternate=alternate, initial_delay=0.05, budget=1.0)
+
+    async def main():
+        result = await hedged.agenerate("q")
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(main()) == "q@0.01"
+    assert alternate.calls == 1
+    assert svc.cancelled == 1
+
+
+def test_budget_limits_hedges():
+    svc = SlowFirstService(slow=0.1, fast=0.1)
+    hedged = HedgedService(svc, initial_delay=0.01, budget=0.25)
+
+    async def main():
+        for _ in range(8):
+            await hedged.agenerate("q")
+
+    asyncio.run(main())
+    assert hedged.calls == 8
+    assert hedged.hedged == 2
+
+
+def test_no_hedge_without_latency_data():
+    svc = SlowFirstService(slow=0.05)
+    hedged = HedgedService(svc, min_samples=5)
+    assert hedged.hedge_delay() is None
+    for _ in range(5):
+        hedged.generate("q")
+    assert hedged.hedged == 0
+    assert hedged.hedge_delay() is not None
+
+
+def test_concurrent_callers_do_not_queue():
+    import threading
+
+    class SteadyService:
+        def generate(self, prompt, *, result_object=None, **kwargs):
+            time.sleep(0.2)
+            return prompt
+
+    # A known hedge delay, longer than the calls, so no hedge is needed
+    hedged = HedgedService(SteadyService(), initial_delay=1.0, budget=1.0)
+    results = []
+    threads = [threading.Thread(target=lambda i=i: results.append(hedged.generate(i))) for i in range(64)]
+    started = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert time.monotonic() - started < 0.6
+    assert sorted(results) == list(range(64))
+    assert hedged.hedged == 0
+    # Recorded latencies are the provider's, without any queueing
+    assert hedged.latency.percentile(100) < 0.35
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import prompter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _loaded_after(code, *modules):
+    check = f"import sys; print(','.join(m for m in {modules!r} if m in sys.modules))"
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    out = subprocess.run(
+        [sys.executable, "-c", f"{code}\n{check}"],
+        capture_output=True, text=True, env=env, cwd=ROOT, check=True,
+    ).stdout.strip()
+    return [m for m in out.split(",") if m]
+
+
+def test_local_render_does_not_import_heavy_modules(tmp_path):
+    template = tmp_path / "t.txt"
+    template.write_text("Hello {{ name }}")
+    code = (
+        "import prompter\n"
+        f"assert prompter.PromptTemplateProcessor({str(template)!r}).render({{'name': 'x'}}) == 'Hello x'"
+    )
+    assert _loaded_after(code, "requests", "yaml") == []
+
+
+def test_llm_factory_does_not_import_yaml():
+    assert _loaded_after("import prompter.llm_factory", "yaml", "requests") == []
+
+
+def test_lazy_package_attributes():
+    assert "PromptTemplateProcessor" in dir(prompter)
+    from prompter.prompt_template_processor import PromptTemplateProcessor
+    assert prompter.PromptTemplateProcessor is PromptTemplateProcessor
+    with pytest.raises(AttributeError):
+        prompter.DoesNotExist
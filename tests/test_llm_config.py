@@ -0,0 +1,113 @@
+import os
+import signal
+
+import pytest
+
+from prompter import llm_config_loader
+from prompter.llm_config_loader import LLMConfig, get_config, install_sighup_handler
+from prompter.llm_factory import get_llm_service
+
+
+class DummyService:
+    def __init__(self, api_key, model):
+        self.api_key = api_key
+        self.model = model
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        return f"{self.api_key}:{prompt}"
+
+
+def _write(path, api_key, mtime=None):
+    path.write_text(f"provider: openai\nopenai:\n  api_key: {api_key}\n  model: m\n")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    for key in list(os.environ):
+        if key.startswith("LLM_"):
+            monkeypatch.delenv(key)
+    path = tmp_path / "llm.yaml"
+    _write(path, "key1", mtime=1_000_000)
+    return path
+
+
+def test_config_is_parsed_once(config_file, monkeypatch):
+    config = LLMConfig(str(config_file), check_interval=0)
+    calls = []
+    monkeypatch.setattr(llm_config_loader, "load_llm_config", lambda path: calls.append(path))
+    for _ in range(100):
+        assert config.get()["openai"]["api_key"] == "key1"
+    assert calls == []
+    assert get_config(str(config_file)) is get_config(str(config_file))
+
+
+def test_reload_on_mtime_change(config_file):
+    config = LLMConfig(str(config_file), check_interval=0)
+    seen = []
+    config.listeners.append(lambda old, new: seen.append((old["openai"]["api_key"], new["openai"]["api_key"])))
+    _write(config_file, "key2", mtime=1_000_001)
+    assert config.get()["openai"]["api_key"] == "key2"
+    assert config.version == 2
+    assert seen == [("key1", "key2")]
+
+
+def test_rewrite_hidden_by_coarse_mtime_is_detected(config_file):
+    _write(config_file, "key1")
+    mtime_ns = os.stat(config_file).st_mtime_ns
+    config = LLMConfig(str(config_file))
+    # Same size, inode and mtime: only the content tells the files apart
+    _write(config_file, "key2")
+    os.utime(config_file, ns=(mtime_ns, mtime_ns))
+    assert config.get()["openai"]["api_key"] == "key2"
+
+
+def test_check_interval_throttles_stat(config_file):
+    config = LLMConfig(str(config_file), check_interval=3600)
+    _write(config_file, "key2", mtime=1_000_001)
+    assert config.get()["openai"]["api_key"] == "key1"
+    config.mark_stale()
+    assert config.get()["openai"]["api_key"] == "key2"
+
+
+def test_failed_reload_keeps_previous_config(config_file):
+    config = LLMConfig(str(config_file), check_interval=0)
+    config_file.write_text("provider: [unclosed")
+    os.utime(config_file, (1_000_001, 1_000_001))
+    assert config.get()["openai"]["api_key"] == "key1"
+    assert config.last_error is not None
+    _write(config_file, "key3", mtime=1_000_002)
+    assert config.get()["openai"]["api_key"] == "key3"
+    assert config.last_error is None
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="no SIGHUP on this platform")
+def test_sighup_marks_configs_stale(config_file):
+    previous = signal.getsignal(signal.SIGHUP)
+    try:
+        assert install_sighup_handler()
+        config = get_config(str(config_file))
+        config.check_interval = 3600
+        _write(config_file, "key2", mtime=1_000_001)
+        os.kill(os.getpid(), signal.SIGHUP)
+        assert config.get()["openai"]["api_key"] == "key2"
+    finally:
+        signal.signal(signal.SIGHUP, previous)
+
+
+def test_live_service_follows_rotated_key(config_file, monkeypatch):
+    import importlib
+    monkeypatch.setattr(importlib, "import_module", lambda name: type('M', (), {"OpenAIService": DummyService}))
+    get_config(str(config_file)).check_interval = 0
+    service = get_llm_service(str(config_file), live=True)
+    assert service.generate("hi") == "key1:hi"
+    first = service.service
+    assert service.service is first
+    _write(config_file, "key2", mtime=1_000_001)
+    assert service.generate("hi") == "key2:hi"
+    assert service.api_key == "key2"
+    # The superseded instance was released, so switching back builds a new one
+    _write(config_file, "key1", mtime=1_000_002)
+    assert service.service is not first
+    assert service.api_key == "key1"
@@ -1,6 +1,5 @@
 import os
 import tempfile
-import pytest
 from prompter.llm_factory import get_llm_service
 
 # Dummy provider for test
@@ -44,3 +43,71 @@ def test_env_priority(monkeypatch):
     assert svc.api_key == "envkey"
     assert svc.model == "envmodel"
     assert svc.generate("hi") == "envkey:envmodel:hi"
+
+
+def _write_config(tmp_path, model):
+    path = tmp_path / "llm.yaml"
+    path.write_text(f"provider: openai\nopenai:\n  api_key: k\n  model: {model}\n")
+    return str(path)
+
+
+def test_service_instances_are_cached_by_config(monkeypatch, tmp_path):
+    import importlib
+    imports = []
+
+    def import_module(name):
+        imports.append(name)
+        return type('M', (), {"OpenAIService": DummyService})
+    monkeypatch.setattr(importlib, "import_module", import_module)
+    first = get_llm_service(_write_config(tmp_path, "a"))
+    assert get_llm_service(_write_config(tmp_path, "a")) is first
+    other = get_llm_service(_write_config(tmp_path, "b"))
+    assert other is not first and other.model == "b"
+    assert get_llm_service(_write_config(tmp_path, "a"), cached=False) is not first
+    # The provider class is resolved once
+    assert imports == ["prompter.providers.openai_service"]
+
+
+def test_entry_point_provider(monkeypatch):
+    from prompter import llm_factory
+
+    class EntryPoint:
+        name = "acme"
+        def load(self):
+            return DummyService
+    monkeypatch.setattr(llm_factory, "_entry_points", lambda group: [EntryPoint()])
+    monkeypatch.setenv("LLM_PROVIDER", "acme")
+    monkeypatch.setenv("LLM_ACME_API_KEY", "k")
+    monkeypatch.setenv("LLM_ACME_MODEL", "m")
+    svc = get_llm_service(None)
+    assert isinstance(svc, DummyService)
+    assert "acme" in llm_factory.registry.names()
+
+
+def test_registered_provider_takes_precedence(monkeypatch):
+    from prompter import llm_factory
+
+    class Custom(DummyService):
+        pass
+    llm_factory.registry.register("openai", Custom)
+    try:
+        svc = llm_factory.create_service("openai", {"api_key": "k", "model": "m"})
+        assert isinstance(svc, Custom)
+    finally:
+        llm_factory.registry.unregister("openai")
+
+
+def test_reload_releases_previous_instance(monkeypatch, tmp_path):
+    import importlib
+    from prompter import llm_factory
+    monkeypatch.setattr(importlib, "import_module", lambda name: type('M', (), {"OpenAIService": DummyService}))
+    path = _write_config(tmp_path, "a")
+    live = get_llm_service(path, live=True)
+    assert live.model == "a"
+    for model in ["b", "c", "d"]:
+        _write_config(tmp_path, model)
+        llm_factory.get_config(path).mark_stale()
+        assert get_llm_service(path).model == model
+        assert live.model == model
+        # Only the current version's instance stays cached
+        assert len(llm_factory._instances) == 1
@@ -27,7 +27,7 @@ def test_local_service_no_api_call(monkeypatch):
             pass
         def json(self):
             return {"text": "dummy output"}
-    monkeypatch.setattr(requests, "post", lambda url, json: DummyResponse())
+    monkeypatch.setattr(requests.Session, "post", lambda self, url, json, **kwargs: DummyResponse())
 
     svc = LocalLLMService(endpoint_url="http://localhost:8000/generate", model="llama-test")
     result = svc.generate("hello world")
@@ -0,0 +1,45 @@
+import pytest
+from prompter.prompt import Prompt, parse_template
+
+TEMPLATE = 'Context: {{context}}\nQuestion: {{question}}\nAnswer:'
+
+def test_render_single_pass():
+    prompt = Prompt(TEMPLATE).context('ctx').question('why?')
+    assert prompt.render() == 'Context: ctx\nQuestion: why?\nAnswer:'
+
+def test_value_containing_placeholder_is_not_expanded():
+    prompt = Prompt(TEMPLATE).context('{{question}}').question('why?')
+    assert prompt.render() == 'Context: {{question}}\nQuestion: why?\nAnswer:'
+
+def test_callable_value_receives_other_values():
+    prompt = Prompt(TEMPLATE).context('ctx').question(lambda context: f'about {context}?')
+    assert prompt.render() == 'Context: ctx\nQuestion: about ctx?\nAnswer:'
+
+def test_unset_placeholder_is_left_in_place():
+    prompt = Prompt(TEMPLATE).context('ctx')
+    assert '{{question}}' in prompt.render()
+
+def test_parsed_template_is_shared_and_immutable():
+    a = Prompt(TEMPLATE)
+    b = Prompt(TEMPLATE)
+    assert a.parsed is b.parsed
+    assert a.parsed is parse_template(TEMPLATE)
+    assert a.sections['question'] == '{{question}}'
+    with pytest.raises(AttributeError):
+        a.parsed.source = 'x'
+    with pytest.raises(TypeError):
+        a.sections['question'] = 'x'
+
+def test_prompt_instances_hold_only_values():
+    prompt = Prompt(TEMPLATE)
+    assert not hasattr(prompt, '__dict__')
+    prompt.context('ctx')
+    assert Prompt(TEMPLATE).values == {}
+
+def test_prompt_render_to_streams_values():
+    import io
+    prompt = Prompt(TEMPLATE).context(io.StringIO('big context')).question('why?')
+    out = io.StringIO()
+    prompt.render_to(out, chunk_size=3)
+    assert out.getvalue() == 'Context: big context\nQuestion: why?\nAnswer:'
+    assert ''.join(Prompt(TEMPLATE).context('c').question(iter(['a', 'b'])).iter_render()) == 'Context: c\nQuestion: ab\nAnswer:'
@@ -39,3 +39,62 @@ def test_duplicate_key_raises():
     builder.text('a')
     with pytest.raises(ValueError):
         builder.text('b')
+
+def test_generator_items_bulleted():
+    builder = PromptContextBuilder()
+    ctx = builder.retrieved_docs(f'doc{i}' for i in range(3)).build()
+    assert ctx['retrieved_docs'] == '- doc0\n- doc1\n- doc2'
+
+def test_unreferenced_values_are_not_formatted(tmp_path):
+    from prompter.prompt_template_processor import PromptTemplateProcessor
+    calls = []
+    class Builder(PromptContextBuilder):
+        def _format_bullets(self, items):
+            calls.append(list(items))
+            return super()._format_bullets(items)
+    ctx = Builder().examples(['e1']).history(['h1', 'h2']).question('q').build_lazy()
+    path = tmp_path / 'chat.prompt'
+    path.write_text('History:\n{{history}}\nQ: {{question}}')
+    processor = PromptTemplateProcessor(str(path))
+    assert processor.render(ctx) == 'History:\n- h1\n- h2\nQ: q'
+    assert processor.render(ctx) == 'History:\n- h1\n- h2\nQ: q'
+    # examples never referenced; history formatted once across both renders
+    assert calls == [['h1', 'h2']]
+
+def test_build_returns_plain_dict():
+    import copy
+    import json
+    import pickle
+    ctx = PromptContextBuilder().text('t').examples(['a']).build()
+    assert type(ctx) is dict
+    assert json.loads(json.dumps(ctx)) == {'text': 't', 'examples': '- a'}
+    assert pickle.loads(pickle.dumps(ctx)) == ctx
+    assert copy.deepcopy(ctx) == ctx
+
+def test_build_lazy_behaves_like_dict():
+    import pickle
+    ctx = PromptContextBuilder().text('t').examples(x for x in 'a').build_lazy()
+    assert ctx == {'text': 't', 'examples': '- a'}
+    assert dict(ctx) == {'text': 't', 'examples': '- a'}
+    assert ctx.get('missing') is None
+    assert ctx.raw('examples').items == ['a']
+    assert pickle.loads(pickle.dumps(ctx)) == ctx
+
+def test_lazy_value_formats_once_across_threads():
+    import threading
+    import time
+    from prompter.prompt_context_builder import LazyValue
+    calls = []
+    def slow(items):
+        calls.append(1)
+        time.sleep(0.05)
+        return ','.join(items)
+    value = LazyValue(iter(['a', 'b']), slow)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(value.get())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ['a,b'] * 8
+    assert len(calls) == 1
@@ -48,3 +48,94 @@ def test_template_file_not_found():
     with pytest.raises(FileNotFoundError) as excinfo:
         PromptTemplateProcessor('non_existent_template_file.txt')
     assert "Prompt template file not found" in str(excinfo.value)
+
+def test_missing_value_keeps_placeholder():
+    with tempfile.NamedTemporaryFile('w+', delete=False) as tf:
+        tf.write('Hello, {{ name }} and {{other}}!')
+        tf.flush()
+        processor = PromptTemplateProcessor(tf.name)
+        result = processor.render({'name': 'World'})
+        assert result == 'Hello, World and {{other}}!'
+    os.unlink(tf.name)
+
+def test_compiled_placeholders():
+    with tempfile.NamedTemporaryFile('w+', delete=False) as tf:
+        tf.write('{{a}} then {{ b }} then {{a}}')
+        tf.flush()
+        processor = PromptTemplateProcessor(tf.name)
+        assert processor.placeholder_names == ('a', 'b')
+        assert [p.name for p in processor.placeholders] == ['a', 'b', 'a']
+        assert processor.compiled.positions('b') == [(11, 18)]
+        assert processor.compiled.parts[processor.placeholders[1].index] == '{{ b }}'
+        assert processor.render({'a': 1, 'b': 2}) == '1 then 2 then 1'
+    os.unlink(tf.name)
+
+def test_validate_without_rendering():
+    with tempfile.NamedTemporaryFile('w+', delete=False) as tf:
+        tf.write('{{name}}: {{add}}')
+        tf.flush()
+        processor = PromptTemplateProcessor(tf.name)
+        calls = []
+        def add(a, b):
+            calls.append((a, b))
+            return str(a + b)
+        with pytest.raises(ValueError) as excinfo:
+            processor.validate({'add': add, 'a': 1, 'b': 2})
+        assert 'name' in str(excinfo.value)
+        with pytest.raises(ValueError) as excinfo:
+            processor.validate({'name': 'x', 'add': add, 'a': 1})
+        assert 'Missing required parameters' in str(excinfo.value)
+        processor.validate({'name': 'x', 'add': add, 'a': 1, 'b': 2})
+        assert calls == []
+    os.unlink(tf.name)
+
+def _many_processor(tmp_path):
+    path = tmp_path / 'many.prompt'
+    path.write_text('Q{{i}}: {{question}}')
+    return PromptTemplateProcessor(str(path))
+
+@pytest.mark.parametrize('mode,workers', [('serial', None), ('thread', 3), ('process', 2)])
+def test_render_many_modes_keep_order(tmp_path, mode, workers):
+    processor = _many_processor(tmp_path)
+    contexts = ({'i': i, 'question': f'q{i}'} for i in range(100))
+    results = list(processor.render_many(contexts, workers=workers, chunksize=7, mode=mode))
+    assert results == [f'Q{i}: q{i}' for i in range(100)]
+
+def test_render_many_streams_unbounded_input(tmp_path):
+    import itertools
+    processor = _many_processor(tmp_path)
+    consumed = []
+    def contexts():
+        for i in itertools.count():
+            consumed.append(i)
+            yield {'i': i, 'question': 'x'}
+    results = processor.render_many(contexts(), workers=2, chunksize=5, mode='thread')
+    assert list(itertools.islice(results, 12)) == [f'Q{i}: x' for i in range(12)]
+    results.close()
+    assert len(consumed) <= 12 + 2 * 2 * 5 + 1
+
+def test_render_many_rejects_unknown_mode(tmp_path):
+    with pytest.raises(ValueError):
+        _many_processor(tmp_path).render_many([], mode='gpu')
+
+def test_iter_render_streams_file_and_iterator_values(tmp_path):
+    import io
+    path = tmp_path / 'rag.prompt'
+    path.write_text('Docs:\n{{retrieved_docs}}\nQ: {{question}}\n{{text}}')
+    processor = PromptTemplateProcessor(str(path))
+    docs = io.StringIO('x' * 10)
+    text = (f'p{i};' for i in range(3))
+    chunks = list(processor.iter_render({'retrieved_docs': docs, 'question': 'why', 'text': text}, chunk_size=4))
+    assert ''.join(chunks) == 'Docs:\nxxxxxxxxxx\nQ: why\np0;p1;p2;'
+    assert max(len(c) for c in chunks) <= 6
+    assert chunks[1:4] == ['xxxx', 'xxxx', 'xx']
+
+def test_render_to_binary_writer(tmp_path):
+    import io
+    path = tmp_path / 'qa.prompt'
+    path.write_text('Q: {{question}} {{text}}')
+    processor = PromptTemplateProcessor(str(path))
+    out = io.BytesIO()
+    written = processor.render_to(out, {'question': 'café', 'text': io.BytesIO('naïve'.encode('utf-8'))}, chunk_size=1, encoding='utf-8')
+    assert out.getvalue().decode('utf-8') == 'Q: café naïve'
+    assert written == len(out.getvalue())
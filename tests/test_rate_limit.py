@@ -0,0 +1,204 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+from prompter.providers import _transport
+from prompter.rate_limit import (
+    FileTokenBucket, RateLimitedService, RateLimiter, TokenBucket, configure_rate_limit, get_limiter,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+
+def make_bucket(cls, clock, *args, **kwargs):
+    bucket = cls(*args, **kwargs)
+    bucket._now = lambda: clock.now
+    bucket._store(bucket.capacity, clock.now)
+    return bucket
+
+
+def test_token_bucket_spaces_out_reservations():
+    clock = FakeClock()
+    bucket = make_bucket(TokenBucket, clock, 60)  # one per second, burst of 60
+    assert all(bucket.reserve(1) == 0 for _ in range(60))
+    # Debt accumulates, so queued callers wait 1s, 2s, 3s...
+    assert [bucket.reserve(1) for _ in range(3)] == pytest.approx([1.0, 2.0, 3.0])
+    clock.now += 10
+    assert bucket.reserve(1) == pytest.approx(0.0)
+
+
+def test_bucket_adopts_server_headers():
+    limiter = RateLimiter(rpm=100, tpm=1000)
+    limiter.observe_headers({
+        "x-ratelimit-limit-requests": "50",
+        "x-ratelimit-remaining-requests": "0",
+        "X-RateLimit-Remaining-Tokens": "200",
+        "content-type": "application/json",
+    })
+    assert limiter.requests.rate == 50
+    assert limiter.requests.available < 1
+    assert limiter.tokens.rate == 1000
+    assert limiter.tokens.available <= 201
+    limiter.observe_headers({"anthropic-ratelimit-tokens-limit": "4000"})
+    assert limiter.tokens.rate == 4000
+
+
+def test_limiter_reserves_requests_and_tokens():
+    limiter = RateLimiter(rpm=600, tpm=6000)
+    assert limiter.reserve(5000) == 0
+    assert limiter.reserve(2000) == pytest.approx(10.0, rel=0.01)
+
+
+def test_file_bucket_shared_between_instances():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "rl", "local.tokens")
+        clock = FakeClock()
+        a = make_bucket(FileTokenBucket, clock, path, 60)
+        b = FileTokenBucket(path, 60)
+        b._now = lambda: clock.now
+        a.reserve(60)
+        assert b.reserve(1) == pytest.approx(1.0)
+        a.close()
+        b.close()
+
+
+class EchoService:
+    max_tokens = 100
+
+    def generate(self, prompt, *, result_object=None, **kwargs):
+        return prompt
+
+    async def agenerate(self, prompt, *, result_object=None, **kwargs):
+        return prompt
+
+
+def test_rate_limited_service_charges_estimated_tokens(monkeypatch):
+    limiter = RateLimiter(rpm=1000, tpm=100000)
+    reserved = []
+    original = limiter.reserve
+    monkeypatch.setattr(limiter, "reserve", lambda tokens=0: (reserved.append(tokens), original(tokens))[1])
+    svc = RateLimitedService(EchoService(), limiter)
+    assert svc.generate("x" * 40) == "x" * 40
+    assert asyncio.run(svc.agenerate("hi", max_tokens=10)) == "hi"
+    assert reserved == [110, 11]
+
+
+def test_configure_hooks_into_transport():
+    limiter = configure_rate_limit("unit-test", rpm=100)
+    try:
+        assert get_limiter("unit-test") is limiter
+
+        class Response:
+            headers = {"x-ratelimit-limit-requests": "30"}
+        _transport._run_hooks("unit-test", Response())
+        assert limiter.requests.rate == 30
+    finally:
+        from prompter import rate_limit
+        rate_limit._limiters.pop("unit-test", None)
+        _transport.remove_response_hook("unit-test", limiter.observe_response)
+
+
+def test_services_of_one_provider_share_the_limiter(tmp_path):
+    from prompter import llm_factory, rate_limit
+    llm_factory.registry.register("unit-shared", EchoService)
+    settings = {"rpm": 60, "tpm": 1000, "shared_dir": str(tmp_path)}
+    try:
+        first = llm_factory.create_service("unit-shared", {"rate_limit": settings})
+        second = llm_factory.create_service("unit-shared", {"rate_limit": dict(settings)})
+        limiter = first.limiter
+        assert second.limiter is limiter is get_limiter("unit-shared")
+        bucket = limiter.requests
+        # Changed settings are applied to the same limiter and buckets
+        third = llm_factory.create_service("unit-shared", {"rate_limit": dict(settings, rpm=30)})
+        assert third.limiter is limiter
+        assert limiter.requests is bucket and bucket.rate == 30
+        # Moving the shared files closes the old ones
+        llm_factory.create_service("unit-shared", {"rate_limit": dict(settings, shared_dir=str(tmp_path / "other"))})
+        assert bucket._fd is None
+        assert limiter.requests.path == str(tmp_path / "other" / "unit-shared.requests")
+    finally:
+        llm_factory.registry.unregister("unit-shared")
+        limiter = rate_limit._limiters.pop("unit-shared", None)
+        if limiter is not None:
+            _transport.remove_response_hook("unit-shared", limiter.observe_response)
+            limiter.close()
+
+
+class HeaderAdapter:
+    def __init__(self, headers):
+        self.headers = headers
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        import requests
+        self.requests.append(request)
+        response = requests.Response()
+        response.status_code = 200
+        response.headers.update(self.headers)
+        response._content = b'{"text": "ok"}'
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def hooked_limiter(provider, **settings):
+    from prompter import rate_limit
+    rate_limit._limiters.pop(provider, None)
+    return configure_rate_limit(provider, **settings)
+
+
+def unhook(*limiters):
+    from prompter import rate_limit
+    for limiter in limiters:
+        rate_limit._limiters.pop(limiter.name, None)
+        _transport.remove_response_hook(limiter.name, limiter.observe_response)
+    _transport.reset()
+
+
+def test_groq_responses_update_limiter_per_window():
+    pytest.importorskip("requests")
+    from prompter.providers.groq_service import GroqService
+    _transport.reset()
+    adapter = HeaderAdapter({
+        # Groq: requests per day, tokens per minute
+        "x-ratelimit-limit-requests": "14400",
+        "x-ratelimit-remaining-requests": "14399",
+        "x-ratelimit-limit-tokens": "5000",
+        "x-ratelimit-remaining-tokens": "100",
+    })
+    _transport.get_session("groq").mount("https://", adapter)
+    limiter = hooked_limiter("groq", rpm=30, tpm=6000)
+    try:
+        assert GroqService(api_key="k").generate("hi") == "ok"
+        assert len(adapter.requests) == 1
+        assert limiter.requests.rate == 30
+        assert limiter.tokens.rate == 5000
+        assert limiter.tokens.available <= 101
+    finally:
+        unhook(limiter)
+
+
+def test_shared_openai_session_routes_azure_responses():
+    pytest.importorskip("requests")
+    from prompter.providers.openai_service import _response_provider
+    _transport.reset()
+    session = _transport.get_session("openai", route=_response_provider)
+    session.mount("https://", HeaderAdapter({"x-ratelimit-limit-requests": "40"}))
+    openai_limiter = hooked_limiter("openai", rpm=100)
+    azure_limiter = hooked_limiter("azure", rpm=100)
+    try:
+        session.post("https://example.openai.azure.com/x", headers={"api-key": "k"}, json={})
+        assert azure_limiter.requests.rate == 40
+        assert openai_limiter.requests.rate == 100
+        session.post("https://api.openai.com/v1/x", headers={"Authorization": "Bearer k"}, json={})
+        assert openai_limiter.requests.rate == 40
+    finally:
+        unhook(openai_limiter, azure_limiter)
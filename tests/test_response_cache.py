@@ -0,0 +1,192 @@
+import asyncio
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+
+import pytest
+
+from prompter.response_cache import MISSING, CachedService, MemoryCache, SQLiteCache, make_cache_key
+
+
+@dataclass
+class Answer:
+    answer: str
+
+
+class CountingService:
+    def __init__(self, model="m", temperature=0.0, max_tokens=100):
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.calls = 0
+
+    def generate(self, prompt, *, result_object=None, **kwargs):
+        self.calls += 1
+        return Answer(prompt) if result_object else f"{prompt}#{self.calls}"
+
+    async def agenerate(self, prompt, *, result_object=None, **kwargs):
+        return self.generate(prompt, result_object=result_object, **kwargs)
+
+
+def test_cache_key_components():
+    svc = CountingService()
+    base = make_cache_key(svc, "p")
+    assert make_cache_key(svc, "p", kwargs={"temperature": 0.0, "max_tokens": 100}) == base
+    assert make_cache_key(svc, "p", kwargs={"temperature": 0.5}) != base
+    assert make_cache_key(svc, "p", kwargs={"top_p": 0.9}) != base
+    assert make_cache_key(svc, "p", Answer) != base
+    assert make_cache_key(CountingService(model="other"), "p") != base
+    assert make_cache_key(CachedService(svc), "p") == base
+
+
+def test_cache_key_includes_endpoint():
+    first, second = CountingService(), CountingService()
+    first.base_url, second.base_url = "http://gpu-1:8000", "http://gpu-2:8000"
+    assert make_cache_key(first, "p") != make_cache_key(second, "p")
+    second.base_url = first.base_url
+    assert make_cache_key(first, "p") == make_cache_key(second, "p")
+    second.deployment = "other"
+    assert make_cache_key(first, "p") != make_cache_key(second, "p")
+
+
+def test_cached_service_hits():
+    svc = CountingService()
+    cached = CachedService(svc)
+    assert cached.generate("hi") == "hi#1"
+    assert cached.generate("hi") == "hi#1"
+    assert cached.generate("hi", result_object=Answer) == Answer("hi")
+    assert asyncio.run(cached.agenerate("hi")) == "hi#1"
+    assert svc.calls == 2
+    assert cached.model == "m"
+
+
+def test_bypass_nondeterministic_is_opt_in():
+    svc = CountingService(temperature=0.7)
+    cached = CachedService(svc)
+    assert cached.generate("x") == cached.generate("x")
+    assert svc.calls == 1
+    bypass = CachedService(svc, bypass_nondeterministic=True)
+    calls = svc.calls
+    bypass.generate("y")
+    bypass.generate("y")
+    assert svc.calls == calls + 2
+    bypass.generate("y", temperature=0)
+    bypass.generate("y", temperature=0)
+    assert svc.calls == calls + 3
+
+
+def test_memory_cache_lru_and_ttl():
+    cache = MemoryCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    cache = MemoryCache(ttl=0.01)
+    cache.set("a", None)
+    assert cache.get("a") is None
+    time.sleep(0.02)
+    assert cache.get("a") is MISSING
+
+
+def test_sqlite_cache_persists_and_evicts():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "sub", "responses.db")
+        cache = SQLiteCache(path, max_entries=2)
+        cache.set("a", {"text": "x" * 1000})
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert len(cache) == 2
+        assert cache.get("b") is MISSING
+        cache.close()
+
+        reopened = SQLiteCache(path, ttl=60)
+        assert reopened.get("a") == {"text": "x" * 1000}
+        # Values are stored compressed
+        size = reopened._conn.execute("SELECT size FROM responses WHERE key = 'a'").fetchone()[0]
+        assert size < 200
+        reopened.close()
+
+
+def test_sqlite_cache_tracks_totals_without_scanning():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "responses.db")
+        cache = SQLiteCache(path, max_entries=None, max_bytes=300)
+        for i in range(5):
+            cache.set(str(i), os.urandom(60).hex())
+        cache.set("4", "short")
+        entries, total = cache._totals()
+        assert entries == len(cache) == cache._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        assert total == cache._conn.execute("SELECT SUM(size) FROM responses").fetchone()[0] <= 300
+        assert cache.get("4") == "short"
+        assert cache.get("0") is MISSING
+        cache.clear()
+        assert cache._totals() == (0, 0)
+        cache.close()
+
+
+def test_sqlite_cache_skips_values_json_would_change():
+    with tempfile.TemporaryDirectory() as d:
+        cache = SQLiteCache(os.path.join(d, "responses.db"))
+        cache.set("tuple", ("a", "b"))
+        cache.set("keys", {1: "one"})
+        cache.set("list", ["a", {"b": 1.5}])
+        assert cache.get("tuple") is MISSING
+        assert cache.get("keys") is MISSING
+        assert cache.get("list") == ["a", {"b": 1.5}]
+        cache.close()
+
+
+def test_sqlite_cache_stores_json_unless_told_to_pickle():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "responses.db")
+        cache = SQLiteCache(path)
+        cache.set("text", "hello")
+        cache.set("answer", Answer("x"))
+        assert cache.get("text") == "hello"
+        assert cache.get("answer") is MISSING
+        cache.close()
+
+        pickled = SQLiteCache(path, serializer="pickle")
+        pickled.set("answer", Answer("x"))
+        assert pickled.get("answer") == Answer("x")
+        pickled.close()
+
+        # A pickled row is never unpickled by a JSON cache
+        reopened = SQLiteCache(path)
+        assert reopened.get("answer") is MISSING
+        assert reopened.get("text") == "hello"
+        reopened.close()
+        with pytest.raises(ValueError):
+            SQLiteCache(path, serializer="marshal")
+
+
+def test_factory_wraps_with_cache(monkeypatch):
+    import importlib
+    from prompter.llm_factory import get_llm_service
+
+    class DummyService(CountingService):
+        def __init__(self, api_key, model):
+            super().__init__(model=model)
+
+    monkeypatch.setattr(importlib, "import_module", lambda name: type('M', (), {"OpenAIService": DummyService}))
+    config = '''
+provider: openai
+openai:
+  api_key: testkey
+  model: testmodel
+  cache:
+    backend: memory
+    maxsize: 10
+'''
+    with tempfile.NamedTemporaryFile("w+", suffix=".yaml", delete=False) as f:
+        f.write(config)
+    try:
+        svc = get_llm_service(f.name)
+    finally:
+        os.unlink(f.name)
+    assert isinstance(svc, CachedService)
+    assert svc.generate("hi") == svc.generate("hi") == "hi#1"
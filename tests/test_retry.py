@@ -0,0 +1,115 @@
+import asyncio
+import email.utils
+import time
+
+import pytest
+
+from prompter import retry as retry_module
+from prompter.retry import RetryingService, RetryPolicy, is_transient, retry_after
+
+
+class Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.response = Response(status, headers)
+
+
+class ReadTimeout(OSError):
+    pass
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    waits = []
+    monkeypatch.setattr(retry_module.time, "sleep", waits.append)
+
+    async def fake_sleep(delay):
+        waits.append(delay)
+    monkeypatch.setattr(retry_module.asyncio, "sleep", fake_sleep)
+    return waits
+
+
+def test_classification():
+    assert is_transient(HTTPError(429))
+    assert is_transient(HTTPError(503))
+    assert not is_transient(HTTPError(400))
+    assert not is_transient(HTTPError(401))
+    assert is_transient(ReadTimeout())
+    assert is_transient(ConnectionResetError())
+    assert not is_transient(ValueError("bad json"))
+
+
+def test_retry_after_parsing():
+    assert retry_after(HTTPError(429, {"retry-after": "7"})) == 7
+    assert retry_after(HTTPError(429, {"retry-after-ms": "250"})) == 0.25
+    date = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 25 < retry_after(HTTPError(503, {"retry-after": date})) <= 30
+    assert retry_after(HTTPError(500)) is None
+
+
+def test_retries_transient_then_succeeds(no_sleep):
+    outcomes = [HTTPError(503), HTTPError(429, {"retry-after": "2"}), "ok"]
+
+    def flaky():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    policy = RetryPolicy(base_delay=0.1, max_delay=1)
+    assert policy.call(flaky) == "ok"
+    assert 0.1 <= no_sleep[0] <= 1
+    assert no_sleep[1] == 2
+    assert policy.metrics["retries"] == 2
+    assert policy.metrics["retry:429"] == 1
+    assert policy.metrics["succeeded_after_retry"] == 1
+
+
+def test_non_transient_raised_immediately(no_sleep):
+    policy = RetryPolicy()
+    with pytest.raises(HTTPError):
+        policy.call(lambda: (_ for _ in ()).throw(HTTPError(400)))
+    assert no_sleep == []
+    assert policy.metrics["gave_up"] == 1
+
+
+def test_gives_up_on_attempts_and_elapsed_budget(no_sleep):
+    policy = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.01)
+    with pytest.raises(HTTPError):
+        policy.call(lambda: (_ for _ in ()).throw(HTTPError(502)))
+    assert len(no_sleep) == 2
+    policy = RetryPolicy(max_elapsed=5)
+    with pytest.raises(HTTPError):
+        policy.call(lambda: (_ for _ in ()).throw(HTTPError(429, {"retry-after": "60"})))
+    assert len(no_sleep) == 2
+
+
+def test_decorrelated_jitter_bounds():
+    policy = RetryPolicy(base_delay=1, max_delay=10)
+    previous = 1
+    for _ in range(100):
+        delay = policy.next_delay(previous)
+        assert 1 <= delay <= min(10, previous * 3)
+        previous = delay
+
+
+def test_retrying_service_async(no_sleep):
+    class Flaky:
+        calls = 0
+
+        async def agenerate(self, prompt, *, result_object=None, **kwargs):
+            Flaky.calls += 1
+            if Flaky.calls < 3:
+                raise ConnectionResetError()
+            return prompt
+
+    svc = RetryingService(Flaky(), RetryPolicy(base_delay=0.01))
+    assert asyncio.run(svc.agenerate("hi")) == "hi"
+    assert Flaky.calls == 3
+    assert svc.policy.metrics["retry:ConnectionResetError"] == 2
@@ -0,0 +1,140 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+from prompter.router import Backend, RouterService
+
+
+class FakeService:
+    def __init__(self, name, latency=0.0, fail=False):
+        self.name = name
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+
+    def generate(self, prompt, *, result_object=None, **kwargs):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError(self.name)
+        return self.name
+
+    async def agenerate(self, prompt, *, result_object=None, **kwargs):
+        return self.generate(prompt, result_object=result_object, **kwargs)
+
+
+def make_router(*services, **options):
+    return RouterService([Backend(s.name, s) for s in services], **options)
+
+
+def test_failing_backend_is_drained_and_failed_over():
+    good, bad = FakeService("good"), FakeService("bad", fail=True)
+    router = make_router(good, bad, min_samples=3)
+    results = [router.generate("q") for _ in range(50)]
+    assert set(results) == {"good"}
+    snapshot = {s["name"]: s for s in router.snapshot()}
+    assert snapshot["bad"]["draining"]
+    assert "error rate" in snapshot["bad"]["drain_reason"]
+    assert bad.calls < 10
+
+
+def test_slow_backend_is_drained():
+    router = make_router(FakeService("fast"), FakeService("slow"), min_samples=3)
+    fast, slow = router.backends
+    # Feed latencies directly, as if calls had completed
+    for _ in range(5):
+        for backend, latency in ((fast, 0.1), (slow, 1.0)):
+            backend.in_flight += 1
+            router._record(backend, latency, True)
+    assert slow.draining()
+    assert "latency" in slow.drain_reason
+    assert not fast.draining()
+
+
+def test_weights_bias_traffic():
+    a, b = FakeService("a"), FakeService("b")
+    router = RouterService([Backend("a", a, weight=9), Backend("b", b, weight=1)])
+    for _ in range(1000):
+        router.generate("q")
+    assert a.calls > 3 * b.calls
+
+
+def test_all_failing_raises_last_error():
+    router = make_router(FakeService("x", fail=True), FakeService("y", fail=True))
+    with pytest.raises(ConnectionError):
+        router.generate("q")
+
+
+def test_client_errors_do_not_fail_over_or_count():
+    class BadRequest(Exception):
+        status_code = 400
+
+    class Rejecting(FakeService):
+        def generate(self, prompt, *, result_object=None, **kwargs):
+            self.calls += 1
+            raise BadRequest(self.name)
+
+    x, y = Rejecting("x"), Rejecting("y")
+    router = make_router(x, y, min_samples=1)
+    for _ in range(5):
+        with pytest.raises(BadRequest):
+            router.generate("q")
+    assert x.calls + y.calls == 5
+    for backend in router.backends:
+        assert backend.failures == 0 and backend.in_flight == 0
+        assert not backend.draining()
+
+
+def test_health_check_readmits():
+    svc = FakeService("a")
+    router = make_router(svc, FakeService("b"), health_check=lambda s: not s.fail)
+    router.drain("a", seconds=60)
+    assert router.backends[0].draining()
+    router.check_health()
+    assert not router.backends[0].draining()
+
+
+def test_agenerate_routes():
+    router = make_router(FakeService("a"), FakeService("b", fail=True), min_samples=1)
+
+    async def main():
+        return await asyncio.gather(*(router.agenerate("q") for _ in range(10)))
+
+    assert set(asyncio.run(main())) == {"a"}
+
+
+def test_from_config(monkeypatch):
+    import importlib
+    from prompter.llm_factory import get_llm_service
+
+    class DummyService(FakeService):
+        def __init__(self, api_key, model="default"):
+            super().__init__(f"{api_key}:{model}")
+            self.model = model
+
+    monkeypatch.setattr(importlib, "import_module", lambda name: type('M', (), {"OpenAIService": DummyService, "GroqService": DummyService}))
+    config = '''
+provider: router
+router:
+  pool:
+    - {provider: openai, model: big, weight: 2}
+    - {provider: groq, name: fast}
+  drain_seconds: 5
+openai:
+  api_key: k1
+  model: small
+groq:
+  api_key: k2
+'''
+    with tempfile.NamedTemporaryFile("w+", suffix=".yaml", delete=False) as f:
+        f.write(config)
+    try:
+        router = get_llm_service(f.name)
+    finally:
+        os.unlink(f.name)
+    assert isinstance(router, RouterService)
+    assert [b.name for b in router.backends] == ["openai:big", "fast"]
+    assert [b.weight for b in router.backends] == [2.0, 1.0]
+    assert router.drain_seconds == 5
+    assert router.generate("q") in {"k1:big", "k2:default"}
@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from prompter.response_cache import MISSING
+from prompter.semantic_cache import HashingEmbedder, SemanticCachedService, SemanticIndex, normalize_prompt
+
+
+class CountingService:
+    model = "m"
+    temperature = 0.0
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt, *, result_object=None, **kwargs):
+        self.calls += 1
+        return f"answer {self.calls}"
+
+    async def agenerate(self, prompt, *, result_object=None, **kwargs):
+        return self.generate(prompt, result_object=result_object, **kwargs)
+
+
+def test_normalize_prompt():
+    assert normalize_prompt("  What is   your Refund policy?? ") == "what is your refund policy"
+
+
+def test_hashing_embedder_is_stable_and_unit_length():
+    embedder = HashingEmbedder(dim=128)
+    a = embedder.embed(["refund policy", "refund policy", "reset my password"])
+    assert a.shape == (3, 128)
+    assert np.allclose(np.linalg.norm(a, axis=1), 1.0)
+    assert a[0] @ a[1] == pytest.approx(1.0)
+    assert a[0] @ a[2] < 0.5
+
+
+def test_index_exact_and_lsh_search():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((5000, 64)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    for exact_limit in (10000, 100):
+        index = SemanticIndex(64, exact_limit=exact_limit, n_bits=8)
+        index.extend(vectors[:3000], list(range(3000)))
+        for i in range(3000, 5000):
+            index.add(vectors[i], i)
+        assert len(index) == 5000
+        query = vectors[4321] + 0.01 * rng.standard_normal(64).astype(np.float32)
+        row, score = index.search(query / np.linalg.norm(query))
+        assert index.values[row] == 4321
+        assert score > 0.99
+
+
+def test_semantic_hits_near_duplicates():
+    svc = CountingService()
+    cached = SemanticCachedService(svc, threshold=0.9)
+    assert cached.generate("What is your refund policy?") == "answer 1"
+    assert cached.generate("what is your   refund policy") == "answer 1"
+    assert cached.generate("How do I reset my password?") == "answer 2"
+    assert svc.calls == 2
+    assert cached.hits == 1
+    # Different settings or schema never share answers
+    assert cached.generate("What is your refund policy?", max_tokens=5) == "answer 3"
+    assert cached.lookup("What is your refund policy") == "answer 1"
+    assert cached.lookup("Completely unrelated question about shipping") is MISSING
+
+
+def test_semantic_agenerate():
+    svc = CountingService()
+    cached = SemanticCachedService(svc)
+
+    async def main():
+        return await cached.agenerate("Hello there!"), await cached.agenerate("hello there")
+
+    assert asyncio.run(main()) == ("answer 1", "answer 1")
+    assert svc.calls == 1
+
+
+def test_index_evicts_oldest_rows():
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((500, 64)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    for exact_limit in (10000, 10):
+        index = SemanticIndex(64, exact_limit=exact_limit, n_bits=6, max_entries=100)
+        index.extend(vectors[:150], list(range(150)))
+        for i in range(150, 500):
+            index.add(vectors[i], i)
+        assert len(index) == 100
+        assert sorted(index.values) == list(range(400, 500))
+        # Evicted rows are gone from every LSH bucket
+        assert sum(len(rows) for rows in index._buckets[0].values()) == 100
+        row, score = index.search(vectors[450])
+        assert index.values[row] == 450 and score == pytest.approx(1.0)
+        assert index.values[index.search(vectors[10])[0]] != 10
+
+
+def test_scopes_are_limited_and_none_is_cacheable():
+    class NoneService(CountingService):
+        def generate(self, prompt, *, result_object=None, **kwargs):
+            self.calls += 1
+            return None
+
+    svc = NoneService()
+    cached = SemanticCachedService(svc, max_scopes=2)
+    for max_tokens in (1, 2, 3):
+        cached.generate("hello", max_tokens=max_tokens)
+    assert len(cached._indexes) == 2
+    assert cached.lookup("hello", max_tokens=3) is None
+    assert cached.lookup("hello", max_tokens=1) is MISSING
+    cached.generate("hello", max_tokens=3)
+    assert svc.calls == 3
+
+
+def test_normalize_keeps_numbers():
+    assert normalize_prompt("Is 3.5 more than 1,000.25?") == "is 3.5 more than 1,000.25"
+    assert normalize_prompt("Items 1, 2.") == "items 1 2"
+
+
+def test_similar_but_different_prompts_miss():
+    svc = CountingService()
+    cached = SemanticCachedService(svc)
+    for a, b in [
+        ("The quick brown fox jumps over the lazy dog", "The quick brown fox jumps over the lazy cat"),
+        ("Is this toy safe for children under 5?", "Is this toy safe for children under 12?"),
+        ("Version 3.5 release notes", "Version 3.6 release notes"),
+    ]:
+        cached.generate(a)
+        assert cached.lookup(b) is MISSING
+
+
+def test_semantic_key_ignores_shared_template_text():
+    svc = CountingService()
+    cached = SemanticCachedService(svc)
+    context = "Answer from the policy below.\n" + "Refunds are issued to the original payment method. " * 20
+
+    def ask(question):
+        prompt = f"{context}\nQuestion: {question}"
+        return cached.generate(prompt, semantic_key={"template": "refund", "question": question})
+
+    assert ask("What is your refund policy?") == "answer 1"
+    assert ask("what is your refund policy") == "answer 1"
+    assert ask("What is your 60-day refund policy?") == "answer 2"
+    assert ask("Do you ship to Canada?") == "answer 3"
+    assert cached.lookup("anything", semantic_key={"question": "what is your refund policy", "template": "refund"}) == "answer 1"
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+
+from prompter.singleflight import SingleFlight, SingleFlightService
+
+
+class SlowService:
+    model = "m"
+
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, *, result_object=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(0.05)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return {"text": prompt}
+
+    async def agenerate(self, prompt, *, result_object=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return {"text": prompt}
+
+
+def run_threads(fn, n=10):
+    results = [None] * n
+    barrier = threading.Barrier(n)
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = fn(i)
+        except Exception as e:
+            results[i] = e
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_threads_share_one_call():
+    svc = SlowService()
+    sf = SingleFlightService(svc)
+    results = run_threads(lambda i: sf.generate("faq"))
+    assert svc.calls == 1
+    assert all(r is results[0] for r in results)
+    assert sf.generate("faq") is not results[0]  # nothing is kept afterwards
+    assert svc.calls == 2
+
+
+def test_threads_share_exception():
+    svc = SlowService(fail=True)
+    sf = SingleFlightService(svc)
+    results = run_threads(lambda i: sf.generate("faq"))
+    assert svc.calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_different_keys_run_separately():
+    svc = SlowService()
+    sf = SingleFlightService(svc)
+    results = run_threads(lambda i: sf.generate("a", temperature=i % 2), n=4)
+    assert svc.calls == 2
+    assert results[0] is results[2] and results[0] is not results[1]
+
+
+def test_asyncio_tasks_share_one_call():
+    svc = SlowService()
+    sf = SingleFlightService(svc)
+
+    async def main():
+        return await asyncio.gather(*(sf.agenerate("faq") for _ in range(20)))
+
+    results = asyncio.run(main())
+    assert svc.calls == 1
+    assert all(r is results[0] for r in results)
+    assert sf.group.shared == 19
+    assert len(sf.group) == 0
+
+
+def test_cancelled_waiter_does_not_cancel_others():
+    group = SingleFlight()
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def main():
+        first = asyncio.ensure_future(group.ado("k", upstream))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(group.ado("k", upstream))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "ok"
+    assert calls == [1]
+
+
+def test_asyncio_exception_propagates():
+    sf = SingleFlightService(SlowService(fail=True))
+
+    async def main():
+        return await asyncio.gather(*(sf.agenerate("x") for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(main()))
@@ -0,0 +1,123 @@
+import asyncio
+import json
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import pytest
+
+from prompter.providers import _transport
+from prompter.providers._streaming import TextStream, extract_delta, iter_deltas
+from prompter.providers.local_service import LocalLLMService
+from prompter.providers.groq_service import GroqService
+
+
+@dataclass
+class Answer:
+    answer: str
+    confidence: float
+
+
+SSE_LINES = [
+    ': keep-alive',
+    'event: message',
+    'data: {"choices": [{"delta": {"role": "assistant"}}]}',
+    '',
+    'data: {"choices": [{"delta": {"content": "Hel"}}]}',
+    'data: {"choices": [{"delta": {"content": "lo"}}]}',
+    'data: [DONE]',
+    'data: {"choices": [{"delta": {"content": "ignored"}}]}',
+]
+
+
+def test_iter_deltas_sse():
+    assert list(iter_deltas(SSE_LINES)) == ["Hel", "lo"]
+
+
+def test_iter_deltas_ndjson():
+    lines = [b'{"response": "a", "done": false}', b'{"response": "b", "done": false}', b'{"response": "", "done": true}']
+    assert list(iter_deltas(lines)) == ["a", "b"]
+
+
+def test_extract_delta_sdk_events():
+    assert extract_delta(SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(type="text_delta", text="hi"))) == "hi"
+    assert extract_delta(SimpleNamespace(type="message_delta", delta=SimpleNamespace(stop_reason="end_turn"))) == ""
+    assert extract_delta({"type": "content_block_delta", "delta": {"text": "x"}}) == "x"
+    assert extract_delta({"token": {"text": "t"}}) == "t"
+
+
+def test_text_stream_aggregates_and_maps():
+    stream = TextStream(iter(['{"answer": "4", ', '"confidence": 0.9}']), Answer)
+    assert stream.time_to_first_token is None
+    assert next(stream) == '{"answer": "4", '
+    assert stream.time_to_first_token is not None
+    assert stream.result() == Answer(answer="4", confidence=0.9)
+    assert stream.finished
+
+
+def test_time_to_first_token_starts_on_iteration():
+    import time
+    stream = TextStream(iter(["a"]))
+    time.sleep(0.2)
+    next(stream)
+    assert stream.time_to_first_token < 0.1
+
+
+def test_local_generate_stream(monkeypatch):
+    requests = pytest.importorskip("requests")
+    seen = {}
+
+    class DummyResponse:
+        def __enter__(self):
+            return self
+        def __exit__(self, *exc):
+            seen["closed"] = True
+        def raise_for_status(self):
+            pass
+        def iter_lines(self, decode_unicode=False):
+            # Raw bytes, as a text/event-stream without a charset arrives
+            yield from [b'{"text": "d\xc3\xbcmmy "}', '{"text": "output \u2713"}'.encode("utf-8")]
+
+    def fake_post(self, url, json=None, stream=False, **kwargs):
+        seen["payload"], seen["stream"] = json, stream
+        return DummyResponse()
+    monkeypatch.setattr(requests.Session, "post", fake_post)
+
+    svc = LocalLLMService(endpoint_url="http://localhost:8000/generate", model="llama-test")
+    stream = svc.generate_stream("hello world")
+    assert "payload" not in seen  # the request is sent on first iteration
+    assert list(stream) == ["dümmy ", "output ✓"]
+    assert stream.text == "dümmy output ✓"
+    assert seen["payload"]["stream"] is True and seen["stream"] is True
+    assert seen["closed"]
+    _transport.reset()
+
+
+def test_groq_agenerate_stream(monkeypatch):
+    httpx = pytest.importorskip("httpx")
+    body = "".join(f"data: {json.dumps({'choices': [{'delta': {'content': t}}]})}\n\n" for t in ['{"answer": ', '"4", "confidence": 1.0}'])
+    body += "data: [DONE]\n\n"
+
+    def factory(provider):
+        clients = _transport._loop_clients()
+        if ("http", provider) not in clients:
+            transport = httpx.MockTransport(lambda r: httpx.Response(200, text=body, headers={"content-type": "text/event-stream"}))
+            clients[("http", provider)] = httpx.AsyncClient(transport=transport)
+        return clients[("http", provider)]
+    monkeypatch.setattr(_transport, "get_async_http_client", factory)
+
+    async def main():
+        stream = GroqService(api_key="key").agenerate_stream("2+2?", result_object=Answer)
+        deltas = [d async for d in stream]
+        return deltas, await stream.result(), stream.time_to_first_token
+
+    deltas, result, ttft = asyncio.run(main())
+    assert deltas == ['{"answer": ', '"4", "confidence": 1.0}']
+    assert result == Answer(answer="4", confidence=1.0)
+    assert ttft is not None
+    _transport.reset()
+
+
+def test_unsupported_provider_raises():
+    from prompter.providers.ai21_service import AI21Service
+    with pytest.raises(NotImplementedError):
+        AI21Service(api_key="key").generate_stream("hi")
@@ -0,0 +1,67 @@
+import os
+import pytest
+from prompter.prompt import Prompt
+from prompter.template_cache import TemplateCache
+
+
+def write(path, text, mtime=None):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_load_template_reads_file_once(tmp_path, monkeypatch):
+    write(tmp_path / 'qa.prompt', 'Question: {{question}}')
+    cache = TemplateCache()
+    first = Prompt.load_template('qa', base_dir=str(tmp_path), cache=cache)
+    import builtins
+    monkeypatch.setattr(builtins, 'open', lambda *a, **k: pytest.fail('template reread'))
+    second = Prompt.load_template('qa', base_dir=str(tmp_path), cache=cache)
+    assert first.parsed is second.parsed
+    assert second.question('why?').render() == 'Question: why?'
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_edits_ignored_without_hot_reload(tmp_path):
+    path = tmp_path / 'qa.prompt'
+    write(path, 'v1 {{question}}', mtime=1000)
+    cache = TemplateCache()
+    assert cache.get(str(path)).source == 'v1 {{question}}'
+    write(path, 'v2 {{question}}', mtime=2000)
+    assert cache.get(str(path)).source == 'v1 {{question}}'
+
+
+def test_hot_reload_picks_up_edits(tmp_path):
+    path = tmp_path / 'qa.prompt'
+    write(path, 'v1 {{question}}', mtime=1000)
+    cache = TemplateCache(hot_reload=True, check_interval=0)
+    assert cache.get(str(path)).source == 'v1 {{question}}'
+    write(path, 'v2 {{question}}', mtime=2000)
+    assert cache.get(str(path)).source == 'v2 {{question}}'
+
+
+def test_lru_bound(tmp_path):
+    cache = TemplateCache(maxsize=2)
+    for name in ('a', 'b', 'c'):
+        write(tmp_path / f'{name}.prompt', name)
+        cache.get(str(tmp_path / f'{name}.prompt'))
+    assert len(cache) == 2
+    cache.get(str(tmp_path / 'a.prompt'))
+    assert cache.misses == 4
+
+
+def test_from_type_caches_directory_listing(tmp_path, monkeypatch):
+    (tmp_path / 'qa').mkdir()
+    write(tmp_path / 'qa' / 'qa.prompt', 'Q: {{question}}')
+    cache = TemplateCache()
+    Prompt.from_type('qa', base_dir=str(tmp_path), cache=cache)
+    monkeypatch.setattr(os, 'listdir', lambda *a: pytest.fail('directory relisted'))
+    prompt = Prompt.from_type('qa', base_dir=str(tmp_path), cache=cache)
+    assert prompt.question('x').render() == 'Q: x'
+
+
+def test_from_type_missing_prompt_file(tmp_path):
+    (tmp_path / 'empty').mkdir()
+    with pytest.raises(FileNotFoundError):
+        Prompt.from_type('empty', base_dir=str(tmp_path), cache=TemplateCache())
@@ -0,0 +1,140 @@
+import os
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+
+from prompter.prompt_template_processor import PromptTemplateProcessor
+from prompter.template_fetcher import TemplateFetcher
+
+
+class TemplateServer:
+    """Local HTTP stand-in serving one template with an ETag."""
+    def __init__(self):
+        self.body = 'Hello, {{name}}!'
+        self.etag = '"v1"'
+        self.status = 200
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(dict(self.headers))
+                if server.status != 200:
+                    self.send_response(server.status)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if self.headers.get('If-None-Match') == server.etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                data = server.body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('ETag', server.etag)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = HTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_port}/qa.prompt'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    srv = TemplateServer()
+    yield srv
+    srv.close()
+
+
+def test_fresh_template_served_from_disk(server, tmp_path):
+    fetcher = TemplateFetcher(cache_dir=str(tmp_path), max_age=60)
+    assert fetcher.fetch(server.url) == 'Hello, {{name}}!'
+    assert fetcher.fetch(server.url) == 'Hello, {{name}}!'
+    # A new fetcher (e.g. a new worker) reuses the on-disk copy
+    assert TemplateFetcher(cache_dir=str(tmp_path), max_age=60).fetch(server.url) == 'Hello, {{name}}!'
+    assert len(server.requests) == 1
+
+
+def test_expired_template_revalidated_with_etag(server, tmp_path):
+    fetcher = TemplateFetcher(cache_dir=str(tmp_path), max_age=0, stale_while_revalidate=0)
+    fetcher.fetch(server.url)
+    assert fetcher.fetch(server.url) == 'Hello, {{name}}!'
+    assert len(server.requests) == 2
+    assert server.requests[1].get('If-None-Match') == '"v1"'
+
+
+def test_stale_while_revalidate(server, tmp_path):
+    fetcher = TemplateFetcher(cache_dir=str(tmp_path), max_age=0, stale_while_revalidate=3600)
+    fetcher.fetch(server.url)
+    server.body, server.etag = 'Bye, {{name}}!', '"v2"'
+    assert fetcher.fetch(server.url) == 'Hello, {{name}}!'
+    deadline = time.time() + 5
+    while fetcher._refreshing or len(server.requests) < 2:
+        assert time.time() < deadline
+        time.sleep(0.01)
+    assert fetcher.fetch(server.url) == 'Bye, {{name}}!'
+
+
+def test_stale_copy_served_when_server_down(server, tmp_path):
+    fetcher = TemplateFetcher(cache_dir=str(tmp_path), max_age=0, stale_while_revalidate=0, timeout=1)
+    fetcher.fetch(server.url)
+    server.close()
+    assert fetcher.fetch(server.url) == 'Hello, {{name}}!'
+    server.close = lambda: None
+
+
+def test_stale_copy_served_on_server_error(server, tmp_path):
+    fetcher = TemplateFetcher(cache_dir=str(tmp_path), max_age=0, stale_while_revalidate=0)
+    fetcher.fetch(server.url)
+    server.status = 503
+    assert fetcher.fetch(server.url) == 'Hello, {{name}}!'
+
+
+def test_removed_template_raises(server, tmp_path):
+    import requests
+    fetcher = TemplateFetcher(cache_dir=str(tmp_path), max_age=0, stale_while_revalidate=0)
+    fetcher.fetch(server.url)
+    server.status = 404
+    with pytest.raises(requests.HTTPError):
+        fetcher.fetch(server.url)
+
+
+def test_background_client_error_expires_copy(server, tmp_path):
+    import requests
+    fetcher = TemplateFetcher(cache_dir=str(tmp_path), max_age=0, stale_while_revalidate=3600)
+    fetcher.fetch(server.url)
+    server.status = 410
+    assert fetcher.fetch(server.url) == 'Hello, {{name}}!'
+    deadline = time.time() + 5
+    while fetcher._refreshing or len(server.requests) < 2:
+        assert time.time() < deadline
+        time.sleep(0.01)
+    with pytest.raises(requests.HTTPError):
+        fetcher.fetch(server.url)
+
+
+def test_default_cache_dir_respects_xdg(monkeypatch, tmp_path):
+    from prompter.template_fetcher import _default_cache_dir
+    monkeypatch.delenv('PROMPTER_CACHE_DIR', raising=False)
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    assert _default_cache_dir() == os.path.join(str(tmp_path), 'prompter', 'templates')
+    monkeypatch.setenv('XDG_CACHE_HOME', 'relative')
+    assert _default_cache_dir() == os.path.join(os.path.expanduser('~'), '.cache', 'prompter', 'templates')
+
+
+def test_processor_uses_fetcher(server, tmp_path):
+    fetcher = TemplateFetcher(cache_dir=str(tmp_path))
+    processor = PromptTemplateProcessor('qa.prompt', url=server.url, fetcher=fetcher)
+    assert processor.render({'name': 'World'}) == 'Hello, World!'
@@ -0,0 +1,79 @@
+import pytest
+from prompter.prompt_context_builder import PromptContextBuilder
+from prompter.prompt_template_processor import PromptTemplateProcessor
+
+
+def words(text):
+    return len(text.split())
+
+
+@pytest.fixture
+def processor(tmp_path):
+    path = tmp_path / 'rag.prompt'
+    path.write_text('Instruction: {{instruction}}\nDocs:\n{{retrieved_docs}}\nHistory:\n{{history}}\nQ: {{question}}')
+    return PromptTemplateProcessor(str(path))
+
+
+def build(docs, history, lazy=True):
+    builder = (PromptContextBuilder()
+               .instruction('answer briefly')
+               .retrieved_docs(docs)
+               .history(history)
+               .question('what now'))
+    return builder.build_lazy() if lazy else builder.build()
+
+
+def test_fits_without_trimming(processor):
+    ctx = build(['d1', 'd2'], ['h1'])
+    assert processor.render_within_budget(ctx, 1000, {'retrieved_docs': 0}) == processor.render(ctx)
+
+
+def test_trims_lowest_priority_first(processor):
+    ctx = build([f'doc {i}' for i in range(100)], ['old turn', 'new turn'])
+    # Fixed text is 8 words, each doc 3, each history item 3
+    result = processor.render_within_budget(ctx, 8 + 6 + 6, {'retrieved_docs': 0, 'history': 1}, count_tokens=words)
+    assert '- doc 0\n- doc 1\n' in result
+    assert 'doc 2' not in result
+    assert '- old turn\n- new turn' in result
+    assert 'Instruction: answer briefly' in result and 'Q: what now' in result
+
+
+def test_history_drops_oldest_items(processor):
+    ctx = build(['d'], ['t1', 't2', 't3'])
+    result = processor.render_within_budget(ctx, 8 + 2 + 4, {'history': 0}, count_tokens=words)
+    assert 'History:\n- t2\n- t3\n' in result
+    assert '- d' in result
+
+
+def test_each_item_counted_once(processor):
+    calls = []
+    def counter(text):
+        calls.append(text)
+        return words(text)
+    ctx = build([f'doc {i}' for i in range(200)], ['h'])
+    processor.render_within_budget(ctx, 20, {'retrieved_docs': 0}, count_tokens=counter)
+    assert len(calls) < 220
+
+
+def test_impossible_budget_raises(processor):
+    ctx = build(['d1'], ['h1'])
+    with pytest.raises(ValueError):
+        processor.render_within_budget(ctx, 5, {'retrieved_docs': 0}, count_tokens=words)
+
+
+def test_plain_dict_from_build_is_trimmed_by_item(processor):
+    ctx = build([f'doc {i}' for i in range(100)], ['old turn', 'new turn'], lazy=False)
+    assert isinstance(ctx, dict)
+    result = processor.render_within_budget(ctx, 8 + 6 + 6, {'retrieved_docs': 0, 'history': 1}, count_tokens=words)
+    assert result == processor.render_within_budget(
+        build([f'doc {i}' for i in range(100)], ['old turn', 'new turn']),
+        8 + 6 + 6, {'retrieved_docs': 0, 'history': 1}, count_tokens=words)
+    assert '- doc 0\n- doc 1\n' in result and 'doc 2' not in result
+
+
+def test_plain_list_is_trimmed_by_item(processor):
+    ctx = {'instruction': 'i', 'retrieved_docs': ['d1', 'd2', 'd3'], 'history': 'h', 'question': 'q'}
+    full = processor.render(ctx)
+    assert "['d1', 'd2', 'd3']" in full
+    result = processor.render_within_budget(ctx, len(full.split()) - 2, {'retrieved_docs': 0}, count_tokens=words)
+    assert "['d1']" in result
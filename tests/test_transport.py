@@ -0,0 +1,105 @@
+import os
+import threading
+import pytest
+
+pytest.importorskip("requests")
+
+from prompter.providers import _transport
+
+
+@pytest.fixture(autouse=True)
+def clean_transport():
+    _transport.reset()
+    yield
+    _transport.reset()
+    _transport._settings.clear()
+
+
+def test_session_reused_per_provider():
+    a = _transport.get_session('local')
+    assert _transport.get_session('local') is a
+    assert _transport.get_session('groq') is not a
+
+
+def test_pool_size_configurable():
+    _transport.configure('local', pool_maxsize=32, timeout=5)
+    adapter = _transport.get_session('local').get_adapter('http://localhost')
+    assert adapter._pool_maxsize == 32
+    assert _transport.get_settings('local')['timeout'] == 5
+    assert _transport.get_settings('groq')['timeout'] == _transport.DEFAULT_SETTINGS['timeout']
+
+
+def test_client_built_once_across_threads():
+    built = []
+    def factory():
+        built.append(1)
+        return object()
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(_transport.get_client('anthropic', 'key', factory))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(built) == 1
+    assert all(c is clients[0] for c in clients)
+    assert _transport.get_client('anthropic', 'other-key', object) is not clients[0]
+
+
+def test_clients_dropped_after_fork(monkeypatch):
+    session = _transport.get_session('local')
+    monkeypatch.setattr(os, 'getpid', lambda: -1)
+    assert _transport.get_session('local') is not session
+
+
+def test_post_json_uses_pooled_session(monkeypatch):
+    import requests
+    seen = []
+    class DummyResponse:
+        def raise_for_status(self):
+            pass
+        def json(self):
+            return {"text": "ok"}
+    def fake_post(self, url, **kwargs):
+        seen.append((self, kwargs['timeout']))
+        return DummyResponse()
+    monkeypatch.setattr(requests.Session, 'post', fake_post)
+    from prompter.providers.local_service import LocalLLMService
+    svc = LocalLLMService(endpoint_url="http://localhost:8000/generate")
+    assert svc.generate("a") == "ok"
+    assert svc.generate("b") == "ok"
+    assert seen[0][0] is seen[1][0] is _transport.get_session('local')
+    assert seen[0][1] == _transport.DEFAULT_SETTINGS['timeout']
+
+
+def test_openai_and_azure_pass_settings_per_request(monkeypatch):
+    import sys
+    import time
+    import types
+    from prompter.providers.azure_service import AzureOpenAIService
+    from prompter.providers.openai_service import OpenAIService
+    calls = []
+
+    class ChatCompletion:
+        @staticmethod
+        def create(**params):
+            time.sleep(0.001)
+            calls.append(params)
+            return {"choices": [{"message": {"content": params["api_key"]}}]}
+    openai = types.SimpleNamespace(ChatCompletion=ChatCompletion, requestssession=None, api_key=None, api_type="open_ai")
+    monkeypatch.setitem(sys.modules, "openai", openai)
+    services = [OpenAIService("sk-openai", base_url="http://gateway/v1"), AzureOpenAIService("az-key", "https://x.openai.azure.com", "gpt4", api_version="2024-02-01")]
+    results = []
+    threads = [threading.Thread(target=lambda s=s: results.append(s.generate("hi"))) for s in services * 20]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(results) == ["az-key"] * 20 + ["sk-openai"] * 20
+    for params in calls:
+        if params["api_type"] == "azure":
+            assert (params["api_key"], params["api_base"], params["engine"]) == ("az-key", "https://x.openai.azure.com", "gpt4")
+        else:
+            assert (params["api_key"], params["api_base"], params["model"]) == ("sk-openai", "http://gateway/v1", "gpt-4")
+    # Module-wide settings are left alone; the pooled session is installed once
+    assert openai.api_key is None and openai.api_type == "open_ai"
+    assert openai.requestssession() is _transport.get_session("openai")